@@ -10,6 +10,9 @@ History
 N. Liu, 10 Feb 2018: change the input parameters of function
                      'catalog_transfor', replacing variable 'datafile'
                      with 'DiffData'
+N. Liu, 18 Oct 2026: function 'tran_fitting' takes the rows of the cached
+                     Jacobian matrices of all sources (see 'jac_cache')
+                     instead of computing them for every subset.
 """
 
 import numpy as np
@@ -17,7 +20,9 @@ import time
 from os import path
 # from post_trans import tran01_01, tran01_02, \
 #     tran01_03, tran02_fitting, tran03_fitting
-from post_trans import tran02_fitting, tran03_fitting
+from post_trans import tran02_fitting, tran03_fitting, \
+    Jac_mat_tran02, Jac_mat_tran03
+from jac_cache import jac_mat_cache
 from tex_table import write_result_deg1
 
 
@@ -44,11 +49,17 @@ def tran_fitting(Condition, RA, DC, dRA, dDC,
     ddc_err = np.extract(Condition, dDC_err)
     cov = np.extract(Condition, COV)
 
+    # Rows of the Jacobian matrices of all sources, which are computed
+    # only once for all the conditions.
+    ind = np.nonzero(Condition)[0]
+    JacMat3, _ = jac_mat_cache(Jac_mat_tran03, RA, DC, ind=ind)
+    JacMat2, _ = jac_mat_cache(Jac_mat_tran02, RA, DC, ind=ind)
+
     print('## Number of the Sample: %d' % ra.size, file=Flog)
 
 # Only rigid rotation => tran03_fitting.
     w, sig, cormat, _ = tran03_fitting(dra, ddc, dra_err, ddc_err,
-                                       cov, ra, dc)
+                                       cov, ra, dc, JacMat3)
 
     [wx,  wy,  wz] = w
     [ewx, ewy, ewz] = sig
@@ -69,7 +80,7 @@ def tran_fitting(Condition, RA, DC, dRA, dDC,
 
 # consider a possible bias in declination => tran02_fitting.
     w, sig, cormat, _ = tran02_fitting(dra, ddc, dra_err, ddc_err,
-                                       cov, ra, dc)
+                                       cov, ra, dc, JacMat2)
     [wx, wy, z, b] = w
     [ewx, ewy, ewz, eb] = sig
     wtol, ewtol = mod_calc(w[:3]), sig_calc(w[:3], sig[:3])
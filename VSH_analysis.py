@@ -15,13 +15,24 @@ N. Liu, 12 Feb 2018: add three parameters 'X_a', 'X_d', 'X' to the input
                      'VSH_analysis', 'apply_condition';
                      modified function 'print_outlier' to print the
                      normalized seperation information.
+N. Liu, 18 Oct 2026: the Jacobian matrices of all sources are taken from
+                     the cache (see 'jac_cache') and function
+                     'apply_condition' only passes their rows of the
+                     subset to 'VSH_analysis';
+                     import 'VSHdeg01_fitting' from 'vsh_deg1_cor';
+N. Liu, 18 Oct 2026: rename the parameter 'cor' to 'cov' in functions
+                     'VSH_analysis', 'apply_condition' and
+                     'catalog_comparison_VSH', since it is the covariance
+                     between dRA and dDE in uas^2 passed to the fittings.
 
 """
 
 import numpy as np
 import time
 from os import path
-from vsh_deg2_cor import VSHdeg01_fitting, VSHdeg02_fitting
+from vsh_deg1_cor import VSHdeg01_fitting, Jac_mat_deg01
+from vsh_deg2_cor import VSHdeg02_fitting, Jac_mat_deg02
+from jac_cache import jac_mat_cache
 from tex_table import write_result_deg1, write_result_deg2
 from vector_direction import vec6_calc
 sin = np.sin
@@ -66,9 +77,12 @@ def print_outlier(source, ang_sep, X_a, X_d, X, ind_outl, flog):
               (outlier, ang_sepi, X_ai, X_di, Xi), file=flog)
 
 
-def VSH_analysis(sou, d_RA, d_DE, e_dRA, e_dDE, cor, RArad, DErad,
-                 flog, ftex, ang_sep, X_a, X_d, X):
-    '''
+def VSH_analysis(sou, d_RA, d_DE, e_dRA, e_dDE, cov, RArad, DErad,
+                 flog, ftex, ang_sep, X_a, X_d, X, JacMat1=None, JacMat2=None):
+    '''VSH fittings of degree 1 and 2.
+
+    Note: cov is the covariance between d_RA and d_DE in uas^2 (element 7
+    of 'DiffData'), not the correlation coefficient.
     '''
 
     # Name of estimated parameters.
@@ -79,7 +93,8 @@ def VSH_analysis(sou, d_RA, d_DE, e_dRA, e_dDE, cor, RArad, DErad,
               'M_{2,1}^{\\rm Re}', 'M_{2,1}^{\\rm Im}', 'M_{2,0}']
 
     x1, sig1, corr1, ind_outl1, RdRA1, RdDE1 = VSHdeg01_fitting(
-        d_RA, d_DE, e_dRA, e_dDE, cor, RArad, DErad, flog)
+        d_RA, d_DE, e_dRA, e_dDE, RArad, DErad, flog, cov=cov,
+        JacMat=JacMat1)
     [gx,  gy,  gz,  wx,  wy,  wz] = x1
     [egx, egy, egz, ewx, ewy, ewz] = sig1
     (r1, alr1, der1, errr1, erralr1, errder1,
@@ -116,7 +131,8 @@ def VSH_analysis(sou, d_RA, d_DE, e_dRA, e_dDE, cor, RArad, DErad,
     write_result_deg1(x1name, x1, sig1, corr1, ftex)
 
     x2, sig2, corr2, ind_outl2, RdRA2, RdDE2 = VSHdeg02_fitting(
-        d_RA, d_DE, e_dRA, e_dDE, cor, RArad, DErad, flog)
+        d_RA, d_DE, e_dRA, e_dDE, cov, RArad, DErad, flog,
+        JacMat=JacMat2)
     [gx,  gy,  gz,  wx,  wy,  wz] = x2[:6]
     [egx, egy, egz, ewx, ewy, ewz] = sig2[:6]
     (r2, alr2, der2, errr2, erralr2, errder2,
@@ -160,7 +176,7 @@ def VSH_analysis(sou, d_RA, d_DE, e_dRA, e_dDE, cor, RArad, DErad,
 
 
 # -----------------------------------
-def apply_condition(sou, d_RA, d_DE, e_dRA, e_dDE, cor,
+def apply_condition(sou, d_RA, d_DE, e_dRA, e_dDE, cov,
                     RArad, DErad, flog, ftex, condition,
                     ang_sep, X_a, X_d, X):
 
@@ -170,7 +186,7 @@ def apply_condition(sou, d_RA, d_DE, e_dRA, e_dDE, cor,
         np.extract(condition, e_dDE)
     RArad1, DErad1 = np.extract(condition, RArad), \
         np.extract(condition, DErad)
-    cor1 = np.extract(condition, cor)
+    cov1 = np.extract(condition, cov)
 
     # Added on 12 Feb 2018
     ang_sep1 = np.extract(condition, ang_sep)
@@ -178,15 +194,21 @@ def apply_condition(sou, d_RA, d_DE, e_dRA, e_dDE, cor,
     X_d1 = np.extract(condition, X_d)
     X1 = np.extract(condition, X)
 
+    # Rows of the Jacobian matrices of all sources, which are computed
+    # only once for all the conditions.
+    ind = np.nonzero(condition)[0]
+    JacMat1, _ = jac_mat_cache(Jac_mat_deg01, RArad, DErad, "full", ind=ind)
+    JacMat2, _ = jac_mat_cache(Jac_mat_deg02, RArad, DErad, ind=ind)
+
     RdRA1, RdDE1, RdRA2, RdDE2 = VSH_analysis(
-        sou, d_RA1, d_DE1, e_dRA1, e_dDE1, cor1,
+        sou, d_RA1, d_DE1, e_dRA1, e_dDE1, cov1,
         RArad1, DErad1, flog, ftex,
-        ang_sep1, X_a1, X_d1, X1)
+        ang_sep1, X_a1, X_d1, X1, JacMat1, JacMat2)
 
     return RdRA1, RdDE1, RdRA2, RdDE2
 
 
-def catalog_comparison_VSH(tag, sou, d_RA, d_DE, e_dRA, e_dDE, cor,
+def catalog_comparison_VSH(tag, sou, d_RA, d_DE, e_dRA, e_dDE, cov,
                            RArad, DErad, flg, FLOG, FTEX,
                            ang_sep, X_a, X_d, X):
 
@@ -197,7 +219,7 @@ def catalog_comparison_VSH(tag, sou, d_RA, d_DE, e_dRA, e_dDE, cor,
     print('##--------- For All sources:', file=FLOG)
     print('##--------- For All sources:', file=FTEX)
     RdRA1a, RdDE1a, RdRA2a, RdDE2a = apply_condition(
-        sou, d_RA, d_DE, e_dRA, e_dDE, cor,
+        sou, d_RA, d_DE, e_dRA, e_dDE, cov,
         RArad, DErad, FLOG, FTEX, np.ones_like(d_RA),
         ang_sep, X_a, X_d, X)
 
@@ -205,7 +227,7 @@ def catalog_comparison_VSH(tag, sou, d_RA, d_DE, e_dRA, e_dDE, cor,
     print('##--------- For Defining sources:', file=FLOG)
     print('##--------- For Defining sources:', file=FTEX)
     RdRA1d, RdDE1d, RdRA2d, RdDE2d = apply_condition(
-        sou, d_RA, d_DE, e_dRA, e_dDE, cor,
+        sou, d_RA, d_DE, e_dRA, e_dDE, cov,
         RArad, DErad, FLOG, FTEX, flg == 'D',
         ang_sep, X_a, X_d, X)
 
@@ -213,7 +235,7 @@ def catalog_comparison_VSH(tag, sou, d_RA, d_DE, e_dRA, e_dDE, cor,
     print('##--------- For Non-defining sources:', file=FLOG)
     print('##--------- For Non-defining sources:', file=FTEX)
     RdRA1n, RdDE1n, RdRA2n, RdDE2n = apply_condition(
-        sou, d_RA, d_DE, e_dRA, e_dDE, cor,
+        sou, d_RA, d_DE, e_dRA, e_dDE, cov,
         RArad, DErad, FLOG, FTEX, flg != 'D',
         ang_sep, X_a, X_d, X)
 
@@ -257,7 +279,7 @@ def vsh_analysis(DiffData, datafile,
     # sou, flg = np.genfromtxt(
     #     datafile, usecols=(0, 8), dtype=str, unpack=True)
 
-    [sou, RAdeg, DEdeg, D_RA, ERR_RA, D_DE, ERR_DE, COR,
+    [sou, RAdeg, DEdeg, D_RA, ERR_RA, D_DE, ERR_DE, COV,
      ang_sep, X_a, X_d, X, flg] = DiffData
 
     ###########################################
@@ -269,7 +291,7 @@ def vsh_analysis(DiffData, datafile,
     # print("# Fitting")
     RdRA1ig, RdDE1ig, RdRA2ig, RdDE2ig = catalog_comparison_VSH(
         '##  %s ' % datafile,
-        sou, D_RA, D_DE, ERR_RA, ERR_DE, COR,
+        sou, D_RA, D_DE, ERR_RA, ERR_DE, COV,
         RArad, DErad, flg, FLOG, FTEX,
         ang_sep, X_a, X_d, X)
 
@@ -8,6 +8,12 @@ Created on Sun Dec 10 18:37:34 2017
 
 Calculate the apriori EOP based C04 series.
 
+History
+N. Liu, 18 Oct 2026: add function 'itpl_c04' which interpolates all the
+                     epochs with one spline on the whole C04 series,
+                     instead of one spline on 20 points for every epoch;
+N. Liu, 18 Oct 2026: write all the lines at once with numpy.savetxt;
+
 """
 
 import numpy as np
@@ -16,7 +22,7 @@ import sys
 from read_c04 import read_c04
 
 
-__all__ = {"cubspl", "itpl_eop", "itpl_nut", "calc_eob"}
+__all__ = ["cubspl", "itpl_eop", "itpl_nut", "itpl_c04", "calc_eob"]
 
 # -----------------------------  FUNCTIONS -----------------------------
 
@@ -111,14 +117,48 @@ def itpl_nut(epo, mjd20, dX20, dY20):
     return dXitpl, dYitpl
 
 
+def itpl_c04(epo, mjd, *series):
+    '''Interpolate C04 series at all epochs using one cubic spline.
+
+    The spline is built only once on the whole series, instead of on the
+    20 points around every epoch. The difference is far below the
+    precision of C04 since the effect of the end conditions of a spline
+    decays quickly away from the ends.
+
+    Parameters
+    ----------
+    epo : array, float
+        epochs to be interpolated, Julian day
+    mjd : array, float
+        epoch of C04 series, Julian day
+    series : array, float
+        C04 series, e.g., Xp, Yp, U
+
+    Returns
+    ----------
+    itpl : list of array, float
+        interpolated values of every series at epo
+    '''
+
+    out = (epo <= mjd[0]) | (epo >= mjd[-1]) | np.isnan(epo)
+    if out.any():
+        # normally it won't happen!!
+        print("The epoch %f was too early or too late"
+              " for the C04 series." % epo[out][0])
+        sys.exit()
+
+    cs = CubicSpline(mjd, np.vstack(series).T)
+
+    return list(cs(epo).T)
+
+
 # def calc_eop(epoitpl, mjd, Xp, Yp, U, XpErr, YpErr, UErr):
 def calc_eob(EOB_file):
     '''Use Cubic Spline Interpolation to calculate the EOP.
 
 
-    For the target eopch, We use the 10 successive points in front of
-    and behind it in the time series (total 20 points) to do the Cubic
-    Spline Interpolation.
+    The Cubic Spline is built only once on the whole C04 series and
+    evaluated at all the target epochs, see function 'itpl_c04'.
 
     Parameters
     ----------
@@ -184,62 +224,18 @@ def calc_eob(EOB_file):
 
     print("\n# Begin to interpolate!")
 
+    # One spline over the whole C04 series for all epochs
     # For EOP
-    epo_ind = np.searchsorted(mjd, teopitpl)
-
-    for i, ind in enumerate(epo_ind):
-        if ind == 0 or ind >= mjd.size:
-            # normally it won't happen!!
-            print("The epoch %f was too early or too late"
-                  " for the C04 series." % teopitpl[i])
-            sys.exit()
-        elif ind < 9 or mjd.size - ind < 10:
-            # In this case we will use less datapoints.
-            pnum = np.min(ind, mjd.size - ind)
-        else:
-            pnum = 10
-
-        mjd20 = mjd[ind - pnum + 1: ind + pnum + 1]
-        Xp20 = Xp[ind - pnum + 1: ind + pnum + 1]
-        Yp20 = Yp[ind - pnum + 1: ind + pnum + 1]
-        U20 = U[ind - pnum + 1: ind + pnum + 1]
-
-        Xpitpl, Ypitpl, Uitpl = itpl_eop(
-            teopitpl[i], mjd20, Xp20, Yp20, U20)
-
-        print("%12.6f  %+8.3f  %+8.3f  %+8.3f" %
-              (teopitpl[i], Xpitpl, Ypitpl, Uitpl),
-              file=fopeop)
+    Xpitpl, Ypitpl, Uitpl = itpl_c04(teopitpl, mjd, Xp, Yp, U)
+
+    np.savetxt(fopeop, np.column_stack((teopitpl, Xpitpl, Ypitpl, Uitpl)),
+               fmt="%12.6f  %+8.3f  %+8.3f  %+8.3f")
 
     # For NUT
-    epo_ind = np.searchsorted(mjd, tnutitpl)
-
-    for i, ind in enumerate(epo_ind):
-        if ind == 0 or ind == mjd.size:
-            # normally it won't happen!!
-            print("The epoch %f was too early or too late"
-                  " for the C04 series." % tnutitpl[i])
-            sys.exit()
-        elif ind < 9 or mjd.size - ind < 10:
-            # In this case we will use less datapoints.
-            pnum = np.min(ind, mjd.size - ind)
-        else:
-            pnum = 10
-
-        indmin, indmax = ind - pnum, ind + pnum
-
-        mjd20 = mjd[indmin: indmax]
-        dX20 = dX[indmin: indmax]
-        dY20 = dY[indmin: indmax]
-
-        dXitpl, dYitpl = itpl_nut(
-            tnutitpl[i], mjd20, dX20, dY20)
-
-        print("%12.6f  %+8.3f  %+8.3f" %
-              (tnutitpl[i], dXitpl, dYitpl),
-              file=fopnut)
-        # print("%12.6f:   %+8.3f mas  %+8.3f mas  %+8.3f ms" %
-        #       (epoitpl[i], Xpitpl, Ypitpl, Uitpl))
+    dXitpl, dYitpl = itpl_c04(tnutitpl, mjd, dX, dY)
+
+    np.savetxt(fopnut, np.column_stack((tnutitpl, dXitpl, dYitpl)),
+               fmt="%12.6f  %+8.3f  %+8.3f")
 
     fopeop.close()
     fopnut.close()
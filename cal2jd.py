@@ -8,6 +8,9 @@ Created on Tue Dec 12 16:45:43 2017
 
 A python script of cal2jd.c
 
+History
+N. Liu, 18 Oct 2026: add function 'Cal2mjd_arr' for arrays of dates.
+
 ----------------------  cal2jd.c  ----------------------
 # include "sofa.h"
 
@@ -285,5 +288,64 @@ def Cal2mjd(iy, im, id):
 
     return djm
 
+
+def Cal2mjd_arr(iy, im, id):
+    '''Gregorian Calendar to Modified Julian Date for arrays of dates.
+
+    Same as function 'Cal2mjd' but element by element, and the invalid
+    dates are reported by the status codes instead of exit.
+
+    Parameters
+    ----------
+    iy/im/id : array of int
+        year, month, day in Gregorian calendar
+
+    Returns
+    ----------
+    djm : array of float
+        Modified Julian Date for 0 hrs, NaN if the status is -1 or -2
+    status : array of int
+        0 = OK
+       -1 = bad year   (MJD not computed)
+       -2 = bad month  (MJD not computed)
+       -3 = bad day    (MJD computed)
+    '''
+
+    iy, im, id = np.broadcast_arrays(np.asarray(iy, dtype=int),
+                                     np.asarray(im, dtype=int),
+                                     np.asarray(id, dtype=int))
+
+    # Earliest year allowed(4800BC)
+    IYMIN = -4799
+
+    # Month lengths in days
+    mtab = np.array([31, 28, 31, 30, 31, 30, 31, 31, 30, 31, 30, 31])
+
+    status = np.zeros(iy.shape, dtype=int)
+
+    # Invalid months are replaced by 1 to look up the table
+    badm = (im < 1) | (im > 12)
+    imc = np.where(badm, 1, im)
+
+    # Validate day, taking into account leap years.
+    ly = (imc == 2) & (iy % 4 == 0) & ((iy % 100 != 0) | (iy % 400 == 0))
+    status[(id < 1) | (id > mtab[imc-1] + ly)] = -3
+
+    # Validate year and month.
+    status[badm] = -2
+    status[iy < IYMIN] = -1
+
+    # Return result.
+    my = np.where(imc <= 2, -1, 0)
+    iypmy = iy + my
+    djm = ((1461 * (iypmy + 4800)) // 4
+           + (367 * (imc - 2 - 12 * my)) // 12
+           - (3 * ((iypmy + 4900) // 100)) // 4
+           + id - 2432076).astype(float)
+    djm = np.where(badm | (iy < IYMIN), np.nan, djm)
+
+    return djm, status
+
+
 # print(Cal2mjd(1979, 2, 27))
 # --------------------------------- END --------------------------------
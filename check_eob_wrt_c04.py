@@ -5,6 +5,10 @@
 Created on Tue Dec 12 16:19:31 2017
 
 @author: Neo(liuniu@smail.nju.edu.cn)
+
+History
+N. Liu, 18 Oct 2026: compute TAI-UTC of all epochs with one call of 'Dat';
+N. Liu, 18 Oct 2026: write the differences at once with numpy.savetxt.
 """
 
 import numpy as np
@@ -35,8 +39,7 @@ def calc_eop_diff(EOB_file):
         exit()
 
     # IAI - UTC
-    dat = [Dat(epoch) for epoch in tag_eop]
-    dat = np.array(dat) * 1000  # unit: ms
+    dat = Dat(np.asarray(tag_eop)) * 1000  # unit: ms
     U = dat + U
 
     # compare
@@ -47,11 +50,11 @@ def calc_eop_diff(EOB_file):
           file=fout)
 
     # difference
-    for (i, mjd) in enumerate(mjdapr):
-        print("%13.6f" % mjd, "  %+10.3f  %7.3f" * 3 %
-              (Xp[i]-Xpapr[i], Xp_err[i],
-               Yp[i]-Ypapr[i], Yp_err[i],
-               U[i]-Uapr[i], U_err[i]), file=fout)
+    np.savetxt(fout, np.column_stack((mjdapr,
+                                      Xp-Xpapr, Xp_err,
+                                      Yp-Ypapr, Yp_err,
+                                      U-Uapr, U_err)),
+               fmt="%13.6f " + "  %+10.3f  %7.3f" * 3)
 
     fout.close()
 
@@ -86,10 +89,10 @@ def calc_nut_diff(EOB_file):
           file=fout)
 
     # difference
-    for (i, mjd) in enumerate(mjdapr):
-        print("%13.6f" % mjd, "  %+10.3f  %7.3f" * 2 %
-              (dX[i] - dXapr[i], dX_err[i],
-               dY[i] - dYapr[i], dY_err[i]), file=fout)
+    np.savetxt(fout, np.column_stack((mjdapr,
+                                      dX - dXapr, dX_err,
+                                      dY - dYapr, dY_err)),
+               fmt="%13.6f " + "  %+10.3f  %7.3f" * 2)
 
     fout.close()
 
@@ -266,7 +266,8 @@ def comparison_with_Gaia(sou, RA, RAc_err, Dec, Dec_err, cor,
         [RAn, RAc_errn, Decn, Dec_errn, corn],
         [RAgn, RAc_errgn, Decgn, Dec_errgn, corgn])
 
-    pos_sep, X_a, X_d, X = nor_sep_calc(dRAc, dRAc_err, dDec, dDec_err, cof)
+    pos_sep, X_a, X_d, X, X2 = nor_sep_calc(dRAc, dRAc_err,
+                                            dDec, dDec_err, cof)
 
     # VSH analysis
     main_dir = "/Users/Neo/Astronomy/Works/201711_GDR2_ICRF3"
@@ -5,56 +5,29 @@
 Created on Fri Apr 27 00:24:29 2018
 
 @author: Neo(liuniu@smail.nju.edu.cn)
+
+History
+N. Liu, 18/10/2026: use the vectorized function 'nor_sep_calc' of module
+                    'nor_sep' instead of a copy of it;
+                    function 'list_crossmatch' is imported from module
+                    'list_crossmatch' and used in 'pos_Xmatch';
+N. Liu, 18/10/2026: add a new function 'sky_crossmatch' to cross-match
+                    two catalogs by positions, which could be used in
+                    'postional_difference_calc' by giving 'max_sep'.
 """
 
 import numpy as np
-from numpy import cos, sqrt
-from functools import reduce
+from numpy import cos, sin, sqrt
+from scipy.spatial import cKDTree
+from nor_sep import nor_sep_calc
+from list_crossmatch import list_crossmatch
 
 
-__all__ = ["list_crossmatch", "pos_Xmatch"
+__all__ = ["list_crossmatch", "pos_Xmatch", "sky_crossmatch",
            'nor_sep_calc', 'postional_difference_calc', "pos_max_calc"]
 
 
 # -----------------------------  FUNCTIONS -----------------------------
-def list_crossmatch(X1, X2):
-    '''Corssmatch between two list.
-
-    Parameters
-    ----------
-    X1 : array_like
-        first dataset, shape(N1, D)
-    X2 : array_like
-        second dataset, shape(N2, D)
-
-    Returns
-    -------
-    '''
-
-    # =======
-    # Add some codes here to eliminate duplicate elemnets
-    # =======
-
-    com_list = []
-    index1 = []
-    index2 = []
-
-    for i, x1 in enumerate(X1):
-        indarr = np.where(X2 == x1)[0]
-
-        if indarr:
-            com_list.append(x1)
-            index1.append(i)
-            j = indarr[0]
-            index2.append(j)
-
-    com_list = np.asarray(com_list, dtype=str)
-    index1 = np.asarray(index1, dtype=int)
-    index2 = np.asarray(index2, dtype=int)
-
-    return com_list, index1, index2
-
-
 def position_taken(index, RA, RAc_err, Dec, Dec_err, cor):
     '''Extract the elements from array at specific index.
 
@@ -115,80 +88,71 @@ def pos_Xmatch(sou1, RA1, RAc_err1, Dec1, Dec_err1, cor1,
         correlation coeffient between RA and Dec for common sources.
     '''
 
-    soucom = []
-    index1 = []
-    index2 = []
-
-    for i, soui in enumerate(sou1):
-        indarr = np.where(sou2 == soui)[0]
-
-        if indarr:
-            soucom.append(soui)
-            index1.append(i)
-            j = indarr[0]
-            index2.append(j)
+    soucom, index1, index2 = list_crossmatch(sou1, sou2)
 
     RA1n, RAc_err1n, Dec1n, Dec_err1n, cor1n = position_taken(
         index1, RA1, RAc_err1, Dec1, Dec_err1, cor1)
     RA2n, RAc_err2n, Dec2n, Dec_err2n, cor2n = position_taken(
         index2, RA2, RAc_err2, Dec2, Dec_err2, cor2)
 
-    # list -> array
-    soucom = np.asarray(soucom)
-
     return [soucom,
             RA1n, RAc_err1n, Dec1n, Dec_err1n, cor1n,
             RA2n, RAc_err2n, Dec2n, Dec_err2n, cor2n]
 
 
-def nor_sep_calc(dRA, dRA_err, dDC, dDC_err, C):
-    '''Calculate the normalized seperation.
+def sky_crossmatch(RA1, DC1, RA2, DC2, max_sep=1000.):
+    '''Crossmatch between two catalogs by positions.
+
+    Positions of the second catalog are put into a KD-tree of unit
+    vectors, in which the nearest neighbour of every source of the
+    first catalog is searched within a chord of 2 * sin(max_sep / 2).
 
     Parameters
     ----------
-    dRA/dDC : Right Ascension / Declination differences in micro-as
-    dRA_err/dDC_err : formal uncertainty of dRA*cos(Dec)/dDC in micro-as
-    C : correlation coeffient between dRA*cos(Dec) and dDC.
+    RA1/DC1 : array of float
+        Right Ascension / Declination of the first catalog, degrees
+    RA2/DC2 : array of float
+        Right Ascension / Declination of the second catalog, degrees
+    max_sep : float
+        maximum angular seperation, mas
 
     Returns
     ----------
-    ang_sep : angular seperation, in micro-as
-    X_a / X_d : normalized coordinate differences in RA / DC, unit-less
-    X : Normalized separations, unit-less.
+    index1/index2 : array of int
+        index of matched sources in the first/second catalog; a source
+        of the second catalog could be matched more than once
+    ang_sep : array of float
+        angular seperation of matched sources, mas
     '''
 
-    # Angular seperations
-    ang_sep = sqrt(dRA**2 + dDC**2)
+    RA1, DC1 = np.deg2rad(RA1), np.deg2rad(DC1)
+    RA2, DC2 = np.deg2rad(RA2), np.deg2rad(DC2)
 
-    # Normalised coordinate difference
-    X_a = dRA / dRA_err
-    X_d = dDC / dDC_err
+    # Unit vectors
+    vec1 = np.column_stack((cos(DC1) * cos(RA1), cos(DC1) * sin(RA1),
+                            sin(DC1)))
+    vec2 = np.column_stack((cos(DC2) * cos(RA2), cos(DC2) * sin(RA2),
+                            sin(DC2)))
 
-    # Normalised separation - Mignard's statistics (considering covariance)
-    X = np.zeros_like(X_a)
+    # mas -> rad -> chord length
+    max_chord = 2 * sin(np.deg2rad(max_sep / 3.6e6) / 2)
 
-    for i, (X_ai, X_di, Ci) in enumerate(zip(X_a, X_d, C)):
-        if Ci == -1.:
-            Ci = -0.99
-        if Ci == 1.0:
-            Ci = 0.99
-        # print(Ci)
+    # Nearest neighbour; those not found are given the index vec2.shape[0]
+    chord, ind = cKDTree(vec2).query(vec1, k=1,
+                                     distance_upper_bound=max_chord)
 
-        wgt = np.linalg.inv(np.mat([[1, Ci],
-                                    [Ci, 1]]))
-        Xmat = np.mat([X_ai, X_di])
-        X[i] = sqrt(reduce(np.dot, (Xmat, wgt, Xmat.T)))
+    index1 = np.nonzero(ind < vec2.shape[0])[0]
+    index2 = ind[index1]
 
-    # # Normalised separation (normal way)
-    X2 = sqrt(X_a**2 + X_d**2)
+    # chord length -> rad -> mas
+    ang_sep = np.rad2deg(2 * np.arcsin(chord[index1] / 2)) * 3.6e6
 
-    # return ang_sep, X_a, X_d, X
-    return ang_sep, X_a, X_d, X, X2
+    return index1, index2, ang_sep
 
 
 def postional_difference_calc(RA1, RA1_err, DC1, DC1_err, Cor1,
                               RA2, RA2_err, DC2, DC2_err, Cor2,
-                              arccof=None):
+                              arccof=None, max_sep=None):
     '''Calculate the normalized seperation between VLBI and Gaia positions.
 
 
@@ -198,6 +162,9 @@ def postional_difference_calc(RA1, RA1_err, DC1, DC1_err, Cor1,
     e_RA / e_DC : formal uncertainty of RA * cos(Dec) / DC, mas
     Cor : correlation coeffient between RA and DC.
     arccof : cos(Dec.)
+    max_sep : maximum angular seperation in mas, default is None for
+              the two catalogs of the same sources; otherwise sources
+              are first cross-matched by 'sky_crossmatch'.
 
     Note: suffix 'G' stands for GaiaDR1 and I for VLBI catalog.
 
@@ -206,8 +173,21 @@ def postional_difference_calc(RA1, RA1_err, DC1, DC1_err, Cor1,
     ang_sep : angular seperation in micro-as
     X_a / X_d : normalized seperation in RA / DC, unit-less
     X : Normalized separations, unit-less.
+    index1/index2 : index of matched sources in the two catalogs,
+                    only if max_sep is given.
     '''
 
+    if max_sep is not None:
+        index1, index2, _ = sky_crossmatch(RA1, DC1, RA2, DC2, max_sep)
+
+        RA1, RA1_err, DC1, DC1_err, Cor1 = position_taken(
+            index1, RA1, RA1_err, DC1, DC1_err, Cor1)
+        RA2, RA2_err, DC2, DC2_err, Cor2 = position_taken(
+            index2, RA2, RA2_err, DC2, DC2_err, Cor2)
+
+        if arccof is not None:
+            arccof = np.take(arccof, index1)
+
     if arccof is None:
         arccof = np.cos(np.deg2rad(DC1))
 
@@ -232,6 +212,10 @@ def postional_difference_calc(RA1, RA1_err, DC1, DC1_err, Cor1,
                                             dDC, dDC_err, corf)
 
     # return ang_sep, X_a, X_d, X
+    if max_sep is not None:
+        return (dRA, dDC, dRA_err, dDC_err, cov, ang_sep, X_a, X_d, X, X2,
+                index1, index2)
+
     return dRA, dDC, dRA_err, dDC_err, cov, ang_sep, X_a, X_d, X, X2
 
 
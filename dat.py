@@ -5,71 +5,98 @@
 Created on Tue Dec 12 18:05:41 2017
 
 @author: Neo(liuniu@smail.nju.edu.cn)
+
+History
+N. Liu, 18 Oct 2026: the table of Delta(AT) is computed only once when
+                     imported; function 'Dat' also takes an array of MJDs;
+                     an epoch at 0h of the date of change now gets the
+                     new Delta(AT), as in iauDat of SOFA;
+N. Liu, 18 Oct 2026: MJDs of the table are given by 'Cal2mjd_arr'.
 """
 
 import numpy as np
-from cal2jd import Cal2mjd
+from cal2jd import Cal2mjd_arr
 
 
-# -----------------------------  FUNCTIONS -----------------------------
+# Dates and Delta(AT)s
+_changes = np.array([
+    [1960,  1,  1.4178180],
+    [1961,  1,  1.4228180],
+    [1961,  8,  1.3728180],
+    [1962,  1,  1.8458580],
+    [1963, 11,  1.9458580],
+    [1964,  1,  3.2401300],
+    [1964,  4,  3.3401300],
+    [1964,  9,  3.4401300],
+    [1965,  1,  3.5401300],
+    [1965,  3,  3.6401300],
+    [1965,  7,  3.7401300],
+    [1965,  9,  3.8401300],
+    [1966,  1,  4.3131700],
+    [1968,  2,  4.2131700],
+    [1972,  1, 10.0],
+    [1972,  7, 11.0],
+    [1973,  1, 12.0],
+    [1974,  1, 13.0],
+    [1975,  1, 14.0],
+    [1976,  1, 15.0],
+    [1977,  1, 16.0],
+    [1978,  1, 17.0],
+    [1979,  1, 18.0],
+    [1980,  1, 19.0],
+    [1981,  7, 20.0],
+    [1982,  7, 21.0],
+    [1983,  7, 22.0],
+    [1985,  7, 23.0],
+    [1988,  1, 24.0],
+    [1990,  1, 25.0],
+    [1991,  1, 26.0],
+    [1992,  7, 27.0],
+    [1993,  7, 28.0],
+    [1994,  7, 29.0],
+    [1996,  1, 30.0],
+    [1997,  7, 31.0],
+    [1999,  1, 32.0],
+    [2006,  1, 33.0],
+    [2009,  1, 34.0],
+    [2012,  7, 35.0],
+    [2015,  7, 36.0],
+    [2017,  1, 37.0]
+])
+
+# MJDs of the changes, computed only once
+_dats = _changes[:, 2]
+_mjds, _ = Cal2mjd_arr(_changes[:, 0], _changes[:, 1], 1)
+
 
+# -----------------------------  FUNCTIONS -----------------------------
 def Dat(mjd):
     '''For a given UTC date (MJD), calculate delta(AT) = TAI-UTC.
+
+    Parameters
+    ----------
+    mjd : float or array of float
+        UTC date in MJD
+
+    Returns
+    ----------
+    dat : float or array of float
+        TAI-UTC in second, NaN (None for a scalar) if the epoch is earlier
+        than 1960 January 1
     '''
 
-    # Dates and Delta(AT)s
-    changes = np.array([
-        [1960,  1,  1.4178180],
-        [1961,  1,  1.4228180],
-        [1961,  8,  1.3728180],
-        [1962,  1,  1.8458580],
-        [1963, 11,  1.9458580],
-        [1964,  1,  3.2401300],
-        [1964,  4,  3.3401300],
-        [1964,  9,  3.4401300],
-        [1965,  1,  3.5401300],
-        [1965,  3,  3.6401300],
-        [1965,  7,  3.7401300],
-        [1965,  9,  3.8401300],
-        [1966,  1,  4.3131700],
-        [1968,  2,  4.2131700],
-        [1972,  1, 10.0],
-        [1972,  7, 11.0],
-        [1973,  1, 12.0],
-        [1974,  1, 13.0],
-        [1975,  1, 14.0],
-        [1976,  1, 15.0],
-        [1977,  1, 16.0],
-        [1978,  1, 17.0],
-        [1979,  1, 18.0],
-        [1980,  1, 19.0],
-        [1981,  7, 20.0],
-        [1982,  7, 21.0],
-        [1983,  7, 22.0],
-        [1985,  7, 23.0],
-        [1988,  1, 24.0],
-        [1990,  1, 25.0],
-        [1991,  1, 26.0],
-        [1992,  7, 27.0],
-        [1993,  7, 28.0],
-        [1994,  7, 29.0],
-        [1996,  1, 30.0],
-        [1997,  7, 31.0],
-        [1999,  1, 32.0],
-        [2006,  1, 33.0],
-        [2009,  1, 34.0],
-        [2012,  7, 35.0],
-        [2015,  7, 36.0],
-        [2017,  1, 37.0]
-    ])
+    # Delta(AT) changes at 0h of the date listed in the table
+    index = np.searchsorted(_mjds, mjd, side="right")
 
-    dats = [change[2] for change in changes]
-    mjds = [Cal2mjd(int(change[0]), int(change[1]), 1) for change in changes]
+    if np.ndim(index):
+        early = index == 0
+        if early.any():
+            print("Epoch too early!")
 
-    index = np.searchsorted(mjds, mjd)
+        return np.where(early, np.nan, _dats[index - 1])
 
     if index:
-        return dats[index - 1]
+        return _dats[index - 1]
     else:
         print("Epoch too early!")
 
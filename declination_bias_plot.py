@@ -10,10 +10,15 @@ Plot the declination differences for ICRF2 defining sources
 to evince the declination bias or regional error in VLBI, or more
 specifically ICRF, system.
 
+History
+N. Liu, 18 Oct 2026: function 'Xmatch' uses 'list_crossmatch' instead of
+                     searching the second list for every source
+
 """
 
 import numpy as np
 import matplotlib.pyplot as plt
+from list_crossmatch import list_crossmatch
 
 
 # -----------------------------  FUNCTIONS -----------------------------
@@ -159,21 +164,9 @@ def Xmatch(sou1, DC1, DC_err1, sou2, DC2, DC_err2):
 
     '''
 
-    soucom = []
-    index1 = []
-    index2 = []
-
-    for i, soui in enumerate(sou1):
-        indarr = np.where(sou2 == soui)[0]
-
-        if indarr:
-            soucom.append(soui)
-            index1.append(i)
-            j = indarr[0]
-            index2.append(j)
+    soucom, index1, index2 = list_crossmatch(sou1, sou2)
 
     # Retieve the data for common sources
-    soucom = np.array(soucom)
     DC1com = np.take(DC1, index1)
     DC2com = np.take(DC2, index2)
     DC_err1com = np.take(DC_err1, index1)
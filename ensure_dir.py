@@ -13,6 +13,7 @@ def ensure_dir(f):
     '''If the directory does not exit, creat it.
     '''
     d = os.path.dirname(f)
-    if not os.path.exists(d):
-        os.mkdirs(d)
+    if d:
+        # It may be created by another process at the same time.
+        os.makedirs(d, exist_ok=True)
 # ------------------------------ END -----------------------------------
@@ -9,6 +9,9 @@ Created on Tue Jan  2 15:09:14 2018
 
 Calculate the CPO position (dX, dY) and EOP (xp, yp, UT1) differences between two VLBI solutions.
 
+History
+N. Liu, 18 Oct 2026: write the differences at once with numpy.savetxt.
+
 """
 
 import numpy as np
@@ -151,19 +154,17 @@ def EOB_diff(eob1, eob2, eopdif, nutdif):
           "# Year   uas uas     uas uas     dXdY\n"
           % (eob1, eob2), file=fnutdif)
 
-    for i in range(dX.size):
-        print("%10.2f  %+8.1f  %8.1f  %+8.1f  %8.1f  %+8.1f  %8.1f  "
-              "%14.1f  %14.1f  %14.1f  " %
-              (tag_eop1[i],
-               dX[i], dX_err[i],
-               dY[i], dY_err[i],
-               dU[i], dU_err[i],
-               covdXdY[i], covdXdU[i], covdYdU[i]),
-              file=feopdif)
-
-        print("%10.2f  %+8.1f  %8.1f  %+8.1f  %8.1f  %14.1f" %
-              (tag_nut1[i], dP[i], dP_err[i], dE[i], dE_err[i], covdPdE[i]),
-              file=fnutdif)
+    np.savetxt(feopdif, np.column_stack((tag_eop1,
+                                         dX, dX_err,
+                                         dY, dY_err,
+                                         dU, dU_err,
+                                         covdXdY, covdXdU, covdYdU)),
+               fmt="%10.2f  %+8.1f  %8.1f  %+8.1f  %8.1f  %+8.1f  %8.1f  "
+               "%14.1f  %14.1f  %14.1f  ")
+
+    np.savetxt(fnutdif, np.column_stack((tag_nut1, dP, dP_err, dE, dE_err,
+                                         covdPdE)),
+               fmt="%10.2f  %+8.1f  %8.1f  %+8.1f  %8.1f  %14.1f")
 
     feopdif.close()
     fnutdif.close()
@@ -4,6 +4,10 @@
 Created on Mon Dec  4 10:19:27 2017
 
 @author: Neo
+
+History
+N. Liu, 18 Oct 2026: add function 'group_by' to split the data of all
+                     sources/stations in one pass.
 """
 
 import numpy as np
@@ -39,4 +43,36 @@ def get_sta_pv(staname, stalist, X, Y, Z, X_err, Y_err, Z_err):
     Zsta_err = get_dat(staname, stalist, Z_err)
 
     return Xsta, Ysta, Zsta, Xsta_err, Ysta_err, Zsta_err
+
+
+def group_by(namelist, *data):
+    '''Split the data into groups of the same name.
+
+    It gives the same result as calling 'get_dat' for every name, but
+    only sorts the names once instead of searching them for every name
+    and every array.
+
+    Parameters
+    ----------
+    namelist : array, string
+        name of source/station of every record
+    data : array
+        data of every record, e.g., epoch, X, Y, Z
+
+    Returns
+    ----------
+    A generator, every item is (name, [data of this name]), in the order
+    of names. The records of one name keep their order in namelist.
+    '''
+
+    names, inv = np.unique(namelist, return_inverse=True)
+
+    # Records of the same name are put together, with their order kept
+    order = np.argsort(inv.ravel(), kind="stable")
+    bounds = np.cumsum(np.bincount(inv.ravel()))[:-1]
+
+    groups = [np.split(np.asarray(dat)[order], bounds) for dat in data]
+
+    for i, name in enumerate(names):
+        yield name, [group[i] for group in groups]
 # ------------------------------ END -----------------------------------
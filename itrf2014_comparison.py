@@ -5,9 +5,14 @@
 Created on Thu Jan 25 17:11:19 2018
 
 @author: Neo(liuniu@smail.nju.edu.cn)
+
+History
+N. Liu, 18 Oct 2026: function 'Xmatch' uses 'list_crossmatch' instead of
+                     searching the second list for every station
 """
 
 import numpy as np
+from list_crossmatch import list_crossmatch
 from read_itrf import read_itrf, find_stable_sta
 from itrf_trans import itrf_trans, trans_fitting
 from read_sta import read_sta
@@ -50,27 +55,14 @@ def Xmatch(sta1, X1, X_err1, Y1, Y_err1, Z1, Z_err1,
     '''Crossmatch
     '''
 
-    stacom = []
-    index1 = []
-    index2 = []
-
-    for i, stai in enumerate(sta1):
-        indarr = np.where(sta2 == stai)[0]
-
-        # print(indarr)
-
-        if indarr:
-            stacom.append(stai)
-            index1.append(i)
-            j = indarr[0]
-            index2.append(j)
+    stacom, index1, index2 = list_crossmatch(sta1, sta2)
 
     X1n, X_err1n, Y1n, Y_err1n, Z1n, Z_err1n = position_taken(
         index1, X1, X_err1, Y1, Y_err1, Z1, Z_err1)
     X2n, X_err2n, Y2n, Y_err2n, Z2n, Z_err2n = position_taken(
         index2, X2, X_err2, Y2, Y_err2, Z2, Z_err2)
 
-    return [np.array(stacom),
+    return [stacom,
             X1n, X_err1n, Y1n, Y_err1n, Z1n, Z_err1n,
             X2n, X_err2n, Y2n, Y_err2n, Z2n, Z_err2n]
 
@@ -5,16 +5,33 @@
 Created on Sun Dec 17 06:21:29 2017
 
 @author: Neo(liuniu@smail.nju.edu.cn)
+
+History
+N. Liu, 18 Oct 2026: add the 14-parameter transformation (7 parameters and
+                     their rates) for positions at different epochs, see
+                     functions 'jacmat14_calc' and 'helmert_jacmat' and
+                     the new parameter 'dt' of 'trans_solve' and
+                     'trans_fitting'; the normal equation is accumulated
+                     from the 3x3 blocks as for the 7 parameters;
+N. Liu, 18 Oct 2026: rename functions 'wgt_blk_calc', 'normal_eqn_calc'
+                     and 'normal_eqn_subset' to 'wgt3d_blk_calc',
+                     'normal_eqn3d_calc' and 'normal_eqn3d_subset', which
+                     differ from those of 'normal_eqn' for 2-D data;
+N. Liu, 18 Oct 2026: the number of iterations of function 'trans_fitting'
+                     is limited by a new parameter 'max_iter'.
 """
 
 import numpy as np
 from functools import reduce
+from normal_eqn import normal_eqn_solve
 
 
 __all__ = [
-    'vecmod_calc', 'vecerr_calc'
+    'vecmod_calc', 'vecerr_calc',
     'array_flatten', 'elim', 'elim3d',
-    'wgt_mat', 'jacmat_calc', 'res_mat',
+    'wgt_mat', 'wgt3d_blk_calc', 'jacmat_calc', 'jacmat14_calc',
+    'helmert_jacmat', 'res_mat',
+    'normal_eqn3d_calc', 'normal_eqn3d_subset',
     'trans_solve', 'trans_fitting',
 ]
 
@@ -98,6 +115,27 @@ def wgt_mat(errX, errY, errZ, corXY, corXZ, corYZ):
 
     return wgt
 
+
+def wgt3d_blk_calc(errX, errY, errZ, corXY, corXZ, corYZ):
+    '''Weight matrix given as the 3x3 block of each station.
+
+    Only the 3x3 blocks on the diagonal of the weight matrix is non-zero,
+    so the blocks are inverted one by one (in a vectorized way).
+    '''
+
+    cov = np.empty((errX.size, 3, 3))
+    cov[:, 0, 0] = errX**2
+    cov[:, 1, 1] = errY**2
+    cov[:, 2, 2] = errZ**2
+    cov[:, 0, 1] = cov[:, 1, 0] = corXY
+    cov[:, 0, 2] = cov[:, 2, 0] = corXZ
+    cov[:, 1, 2] = cov[:, 2, 1] = corYZ
+
+    wgt = np.linalg.inv(cov)
+
+    return wgt
+
+
 # errX = np.array([0.3, 0.2, 0.5])
 # errY = np.array([1.2, 2.3, 0.3])
 # errZ = np.array([0.23, 0.76, .87])
@@ -163,16 +201,88 @@ def jacmat_calc(x, y, z):
     JacMat = np.transpose(JacMatT)
 
     return JacMat, JacMatT
+
+
+def jacmat14_calc(x, y, z, dt):
+    '''Jacobian matrix of the 14-parameter transformation.
+
+    The parameters are (t1, t2, t3, d, r1, r2, r3) at the reference epoch
+    followed by their rates. The partials of the rates are those of the
+    7 parameters multiplied by dt.
+
+    Parameters
+    ----------
+    x/y/z : array of float
+        coordinates of stations
+    dt : array of float
+        epoch of each position minus the reference epoch, usually in year
+
+    Returns
+    ----------
+    JacMat/JacMatT : matrix
+        Jacobian matrix of shape (3N, 14) and its transpose
+    '''
+
+    JacMat7, _ = jacmat_calc(x, y, z)
+
+    # Rows of (dx1, ..., dxN, dy1, ..., dyN, dz1, ..., dzN)
+    JacMat = np.hstack((JacMat7, JacMat7 * np.tile(dt, 3)[:, None]))
+
+    return JacMat, np.transpose(JacMat)
+
+
+def helmert_jacmat(x, y, z, dt=None):
+    '''Jacobian matrix of the 7- (dt is None) or 14-parameter model.
+    '''
+
+    if dt is None:
+        return jacmat_calc(x, y, z)
+    else:
+        return jacmat14_calc(x, y, z, dt)
 # ---------------------------------------------------
 
 
-def res_mat(dx, dy, dz, x, y, z, w):
+def normal_eqn3d_calc(JacMat, dx, dy, dz, wgt):
+    '''Calculate matrix A and b of the normal equation A * w = b.
+
+    JacMat is the Jacobian matrix of shape (3N, M), the rows are in the
+    order of (dx1, ..., dxN, dy1, ..., dyN, dz1, ..., dzN), and wgt is
+    the 3x3 weight blocks from 'wgt3d_blk_calc'.
+    '''
+
+    num = dx.size
+    Jac = JacMat.reshape(3, num, -1)
+    dPos = np.vstack((dx, dy, dz))
+
+    # W * J, computed station by station
+    WJac = np.einsum("nkl,lnm->knm", wgt, Jac)
+
+    A = np.tensordot(Jac, WJac, axes=([0, 1], [0, 1]))
+    b = np.tensordot(WJac, dPos, axes=([0, 1], [0, 1]))
+
+    return A, b
+# ---------------------------------------------------
+
+
+def normal_eqn3d_subset(JacMat, dx, dy, dz, wgt, ind):
+    '''Contribution of the stations of index ind to the normal equation.
+    '''
+
+    num = dx.size
+    JacMati = np.vstack((JacMat[ind], JacMat[ind + num],
+                         JacMat[ind + num * 2]))
+
+    return normal_eqn3d_calc(JacMati, dx[ind], dy[ind], dz[ind], wgt[ind])
+# ---------------------------------------------------
+
+
+def res_mat(dx, dy, dz, x, y, z, w, dt=None):
 
     # Observables
     dPos = np.hstack((dx, dy, dz))
 
     # Jacobian matrix and its transpose.
-    JacMat, _ = jacmat_calc(x, y, z)
+    JacMat, _ = helmert_jacmat(x, y, z, dt)
 
     # Calculate the residual. ( O - C )
     ResArr = dPos - np.dot(JacMat, w)
@@ -185,32 +295,20 @@ def res_mat(dx, dy, dz, x, y, z, w):
 def trans_solve(dx, dy, dz,
                 errX, errY, errZ,
                 corXY, corXZ, corYZ,
-                x, y, z):
+                x, y, z, dt=None):
 
-    # Jacobian matrix and its transpose.
-    JacMat, JacMatT = jacmat_calc(x, y, z)
-    # Weighted matrix.
-    WgtMat = wgt_mat(errX, errY, errZ, corXY, corXZ, corYZ)
+    # Jacobian matrix.
+    JacMat, _ = helmert_jacmat(x, y, z, dt)
+    # Weighted matrix, only the 3x3 blocks.
+    wgt = wgt3d_blk_calc(errX, errY, errZ, corXY, corXZ, corYZ)
 
     # Calculate matrix A and b of matrix equation:
     # A * w = b.
-    tmpMat = np.dot(JacMatT, WgtMat)
-    A = np.dot(tmpMat, JacMat)
-
-    dPos = np.hstack((dx, dy, dz))
-    b = np.dot(tmpMat,  dPos)
+    A, b = normal_eqn3d_calc(JacMat, dx, dy, dz, wgt)
 
     # Solve the equations.
-    # w = (t1, t2, t3, d, r1, r2, r3)
-    w = np.linalg.solve(A, b)
-    # Covariance.
-    cov = np.linalg.inv(A)
-    sig = np.sqrt(cov.diagonal())
-    # Correlation coefficient.
-    corrcoef = np.array([cov[i, j] / sig[i] / sig[j]
-                         for j in range(len(w))
-                         for i in range(len(w))])
-    corrcoef.resize((len(w), len(w)))
+    # w = (t1, t2, t3, d, r1, r2, r3), followed by the rates if dt is given
+    w, sig, corrcoef = normal_eqn_solve(A, b)
 
     return w, sig, corrcoef
 # ----------------------------------------------------
@@ -219,10 +317,19 @@ def trans_solve(dx, dy, dz,
 def trans_fitting(dx, dy, dz,
                   errX, errY, errZ,
                   corXY, corXZ, corYZ,
-                  x, y, z):
-
-    w, sig, cof = trans_solve(dx, dy, dz, errX, errY, errZ,
-                              corXY, corXZ, corYZ, x, y, z)
+                  x, y, z, dt=None, max_iter=100):
+
+    # The normal equation is built only once, then only the
+    # contributions of rejected/re-accepted stations are
+    # subtracted/added at each iteration.
+    # With dt, 14 parameters (7 parameters and their rates) are fitted
+    # to the positions of stations at different epochs.
+    JacMat, _ = helmert_jacmat(x, y, z, dt)
+    wgt = wgt3d_blk_calc(errX, errY, errZ, corXY, corXZ, corYZ)
+    A, b = normal_eqn3d_calc(JacMat, dx, dy, dz, wgt)
+    w, sig, cof = normal_eqn_solve(A, b)
+    dPos = np.hstack((dx, dy, dz))
+    indice = np.arange(dx.size)
 
     # Iteration.
     num1 = 1
@@ -231,41 +338,41 @@ def trans_fitting(dx, dy, dz,
 
     while(num1 != num2):
 
+        # The set of outliers may oscillate, as in
+        # 'normal_eqn.normal_eqn_elim'.
+        if num_it == max_iter:
+            print("Warning: the outlier elimination does not converge "
+                  "after %d iterations." % max_iter)
+            break
+
         num_it += 1
         print("# Iterate %d times." % num_it)
 
         num1 = num2
         # Calculate the residual. ( O - C )
-        rdx, rdy, rdz = res_mat(dx, dy, dz, x, y, z, w)
-        indice = elim3d(rdx, rdy, rdz)
-        num2 = dx.size - indice.size
-
-        dxn, dyn, dzn = [np.take(dx, indice),
-                         np.take(dy, indice),
-                         np.take(dz, indice)]
-
-        xn, yn, zn = [np.take(x, indice),
-                      np.take(y, indice),
-                      np.take(z, indice)]
-
-        errXn, errYn, errZn = [np.take(errX, indice),
-                               np.take(errY, indice),
-                               np.take(errZ, indice)]
-
-        corXYn, corXZn, corYZn = [np.take(corXY, indice),
-                                  np.take(corXZ, indice),
-                                  np.take(corYZ, indice)]
-
-        wn, sign, cofn = trans_solve(dxn, dyn, dzn,
-                                     errXn, errYn, errZn,
-                                     corXYn, corXZn, corYZn,
-                                     xn, yn, zn)
+        rdx, rdy, rdz = np.resize(dPos - np.dot(JacMat, w), (3, dx.size))
+        ind_new = elim3d(rdx, rdy, rdz)
+        num2 = dx.size - ind_new.size
+
+        ind_rej = np.setdiff1d(indice, ind_new)
+        ind_acc = np.setdiff1d(ind_new, indice)
+        indice = ind_new
+
+        if ind_rej.size:
+            Ai, bi = normal_eqn3d_subset(JacMat, dx, dy, dz, wgt, ind_rej)
+            A, b = A - Ai, b - bi
+
+        if ind_acc.size:
+            Ai, bi = normal_eqn3d_subset(JacMat, dx, dy, dz, wgt, ind_acc)
+            A, b = A + Ai, b + bi
+
+        wn, sign, cofn = normal_eqn_solve(A, b)
         w = wn
         print('# Number of sample: %d  %d' %
               (dx.size - num1, dx.size - num2))
         # file=flog)
 
-    rdx, rdy, rdz = res_mat(dx, dy, dz, x, y, z, w)
+    rdx, rdy, rdz = res_mat(dx, dy, dz, x, y, z, w, dt)
     ind_outl = np.setxor1d(np.arange(dx.size), indice)
 
     return wn, sign, cofn, ind_outl, rdx, rdy, rdz
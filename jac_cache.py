@@ -0,0 +1,126 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+# File name: jac_cache.py
+"""
+Created on Sun Oct 18 17:05:12 2026
+
+@author: Neo(liuniu@smail.nju.edu.cn)
+
+A cache of the Jacobian (basis) matrices used in the fittings.
+
+The same source positions are fitted again and again, e.g., with
+different models or different subsets of sources. The Jacobian matrix
+only depends on (RA, DE) and the model, so it is computed once and kept
+in a least-recently-used (LRU) cache keyed by a hash of RA/DE, the
+function and its extra arguments. A fit on a subset of sources then only
+takes the corresponding rows of the cached matrix.
+
+The cache is bounded both by the number of matrices (CACHE_SIZE) and by
+their total size in bytes (CACHE_NBYTES). A matrix larger than
+CACHE_NBYTES, e.g., the degree-2 one of a Gaia-size catalog, is computed
+every time and never kept.
+
+The Jacobian matrix should be of shape (2N, M), rows of dRA before rows
+of dDE, as in the VSH modules and 'post_trans'.
+
+"""
+
+import hashlib
+from collections import OrderedDict
+import numpy as np
+
+__all__ = ["array_hash", "jac_mat_cache", "jac_cache_clear",
+           "jac_cache_info"]
+
+
+# Maximum number of matrices kept in the cache
+CACHE_SIZE = 16
+
+# Maximum total size of the matrices kept in the cache, in bytes
+CACHE_NBYTES = 512 * 1024**2
+
+# key -> Jacobian matrix, the most recently used at the end
+_cache = OrderedDict()
+_stat = {"hits": 0, "misses": 0}
+
+
+# -----------------------------  FUNCTIONS -----------------------------
+def array_hash(x):
+    '''Hash the content of an array.
+    '''
+
+    x = np.ascontiguousarray(x)
+
+    return hashlib.sha1(x.view(np.uint8)).hexdigest() + str(x.shape)
+
+
+def jac_mat_cache(jac_func, RA, DE, *args, ind=None):
+    '''Get the Jacobian matrix from the cache or compute it.
+
+    Parameters
+    ----------
+    jac_func : function
+        jac_func(RA, DE, *args) returns the Jacobian matrix and its
+        transpose, e.g., 'Jac_mat_deg02'
+    RA/DE : array of float
+        Right ascension/Declination in radian of all sources
+    args :
+        other parameters passed to jac_func, e.g., fit_type or degree
+    ind : array of int or boolean
+        index (or mask) of the subset of sources, default is None for all
+
+    Returns
+    ----------
+    JacMat/JacMatT : matrix
+        Jacobian matrix and its transpose matrix (of the subset)
+    '''
+
+    key = (jac_func.__module__, jac_func.__name__, args,
+           array_hash(RA), array_hash(DE))
+
+    if key in _cache:
+        _stat["hits"] += 1
+        _cache.move_to_end(key)
+        JacMat = _cache[key]
+    else:
+        _stat["misses"] += 1
+        JacMat, _ = jac_func(RA, DE, *args)
+
+        if JacMat.nbytes <= CACHE_NBYTES:
+            # It is shared between fittings so should not be modified.
+            JacMat.flags.writeable = False
+            _cache[key] = JacMat
+
+            # Remove the least recently used ones
+            while (len(_cache) > CACHE_SIZE or
+                   _cache_nbytes() > CACHE_NBYTES):
+                _cache.popitem(last=False)
+
+    if ind is not None:
+        ind = np.arange(RA.size)[ind]
+        JacMat = np.vstack((JacMat[ind], JacMat[ind + RA.size]))
+
+    return JacMat, np.transpose(JacMat)
+
+
+def _cache_nbytes():
+    '''Total size of the matrices in the cache in bytes.
+    '''
+
+    return sum(JacMat.nbytes for JacMat in _cache.values())
+
+
+def jac_cache_clear():
+    '''Empty the cache.
+    '''
+
+    _cache.clear()
+    _stat["hits"], _stat["misses"] = 0, 0
+
+
+def jac_cache_info():
+    '''Return the number of hits, misses and matrices in the cache.
+    '''
+
+    return _stat["hits"], _stat["misses"], len(_cache)
+# --------------------------------- END --------------------------------
@@ -10,11 +10,15 @@ y = k * x + y0.
 For data (x_i, y_i), determinate the parameter 'k' and 'y0'.
 
 @author: Neo
+
+History
+N. Liu, 18 Oct 2026: function 'parameter_calc' calls 'normal_eqn.lsq_solve'.
 """
 
 import numpy as np
 import sys
 import matplotlib.pyplot as plt
+from normal_eqn import lsq_solve
 
 
 # ------------------ FUNCTION --------------------------------
@@ -37,30 +41,12 @@ def elimination(x, y, k, y0):
 
 # ----------------------------------------------------
 def parameter_calc(x, y, y_err):
-    # A * par = b
-    # calculate the elements of matrix.
-    # A
-    A00 = np.sum(x**2 / y_err**2)
-    A01 = np.sum(x / y_err**2)
-    # A10 = A01
-    A11 = np.sum(1.0 / y_err**2)
-    A = np.array([[A00, A01], [A01, A11]])
-    # b
-    b00 = np.sum(x*y / y_err**2)
-    b01 = np.sum(y / y_err**2)
-    b = np.array([b00, b01])
-    # Solve the equation. par = A^{-1} * b
-    par = np.linalg.solve(A, b)
-    # formal error for par
-    A_inv = np.linalg.inv(A)
-    err = np.sqrt(np.diag(A_inv))
-
-    # print("Covariance matrix: \n", A_inv)
-
-    # correlation coeffiences
-    corrcoef = np.array([A_inv[i, j] / err[i] / err[j]
-                         for j in range(par.size) for i in range(par.size)])
-    corrcoef.resize((par.size, par.size))
+    # Weighted least squares fitting of y = k * x + y0,
+    # solved by the QR decomposition in 'normal_eqn.lsq_solve'.
+    # par = (k, y0)
+    JacMat = np.column_stack((x, np.ones_like(x)))
+    par, err, corrcoef = lsq_solve(JacMat, y, y_err)
+
     # return thr result.
     return par, err, corrcoef
 
@@ -5,50 +5,84 @@
 Created on Fri Apr 27 00:24:29 2018
 
 @author: Neo(liuniu@smail.nju.edu.cn)
+
+History
+N. Liu, 18 Oct 2026: function 'list_crossmatch' uses a sorted index of
+                     the second list instead of searching it for every
+                     element of the first list, and is shared by all the
+                     cross-matches of source (station) names;
+N. Liu, 18 Oct 2026: add function 'list_index' so that the sorted index of
+                     a reference list could be built once and shared by
+                     the cross-matches with many lists.
 """
 
 import numpy as np
 
+__all__ = ["list_index", "list_crossmatch"]
+
 
 # -----------------------------  FUNCTIONS -----------------------------
-def list_crossmatch(X1, X2):
-    '''Corssmatch between two list.
+def list_index(X2):
+    '''Build the sorted index of a list for the cross-match.
 
     Parameters
     ----------
-    X1 : array_like
-        first dataset, shape(N1, D)
     X2 : array_like
-        second dataset, shape(N2, D)
+        dataset, shape(N2,)
 
     Returns
     -------
+    X2u : array
+        sorted unique elements of X2
+    ind2u : array of int
+        index of their first appearance in X2
     '''
 
-    # =======
-    # Add some codes here to eliminate duplicate elements
-    # =======
+    return np.unique(np.asarray(X2), return_index=True)
 
-    com_list = []
-    index1 = []
-    index2 = []
 
-    for i, x1 in enumerate(X1):
-        indarr = np.where(X2 == x1)[0]
+def list_crossmatch(X1, X2, X2_index=None):
+    '''Corssmatch between two list.
+
+    X2 is sorted once and every element of X1 is found by a binary
+    search, which costs O((N1 + N2) * log(N2)) instead of O(N1 * N2).
+    The first one is taken if an element appears more than once in X2.
+
+    Parameters
+    ----------
+    X1 : array_like
+        first dataset, shape(N1,)
+    X2 : array_like
+        second dataset, shape(N2,)
+    X2_index : tuple
+        sorted index of X2 returned by 'list_index', default is None to
+        build it here
+
+    Returns
+    -------
+    com_list : array of string
+        common elements, in the order of X1
+    index1/index2 : array of int
+        index of common elements in X1/X2
+    '''
 
-        # print(indarr, indarr.size)
+    X1 = np.asarray(X1)
 
-        if indarr.size:
-            com_list.append(x1)
-            index1.append(i)
-            # j = indarr[0]
-            index2.append(indarr[0])
+    # Sorted unique elements of X2 and index of their first appearance
+    if X2_index is None:
+        X2_index = list_index(X2)
+    X2u, ind2u = X2_index
 
-            # print(x1, i, indarr[0])
+    if X1.size and X2u.size:
+        pos = np.searchsorted(X2u, X1)
+        pos[pos == X2u.size] = 0
+        index1 = np.nonzero(X2u[pos] == X1)[0]
+        index2 = ind2u[pos[index1]]
+    else:
+        index1 = np.array([], dtype=int)
+        index2 = np.array([], dtype=int)
 
-    com_list = np.asarray(com_list, dtype=str)
-    index1 = np.asarray(index1, dtype=int)
-    index2 = np.asarray(index2, dtype=int)
+    com_list = np.asarray(X1[index1], dtype=str)
 
     return com_list, index1, index2
 
@@ -0,0 +1,271 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+# File name: multi_solution_comparison.py
+"""
+Created on Sun Oct 18 23:48:05 2026
+
+@author: Neo(liuniu@smail.nju.edu.cn)
+
+Compare many VLBI solutions (e.g., the grid of GA values generated by
+"cnt_batch_linux.py") with one reference catalog, ICRF2 or Gaia DR1.
+
+Unlike 'solution_icrf2_comparison' and 'solution_GaiaDR1_comparison',
+which read and index the reference catalog for every solution, the
+reference catalog is read and its source names are indexed only once
+(see 'list_crossmatch.list_index'). Then the solutions are cross-matched
+with it and fitted by the VSH functions in a process pool, and the VSH
+parameters of all solutions are written into one table.
+
+The VSH functions are those of 'vsh_degl_cor.vsh_fit'. For degree 2 (the
+default), the quadrupole (and dipole) terms in the table are not
+comparable with those given by 'VSH_analysis', which uses
+'vsh_deg2_cor.VSHdeg02_fitting' (see the notice in 'vsh_deg2_cor').
+
+Usage:
+    multi_solution_comparison.py icrf2|gaiadr1 ref_file out_file
+        sol1.cat [sol2.cat ...]
+
+"""
+
+import numpy as np
+import sys
+import time
+from os import path
+from multiprocessing import Pool
+from list_crossmatch import list_index, list_crossmatch
+from nor_sep import nor_sep_calc
+from solution_icrf2_comparison import read_icrf2, position_taken, \
+    position_diff_calc
+from solution_GaiaDR1_comparison import read_gaiadr1
+from vsh_degl_cor import vsh_fit, vsh_par_name
+
+
+__all__ = ["read_sol_cat", "sol_ref_diff", "sol_vsh_calc",
+           "multi_sol_comparison"]
+
+
+# Reference catalog and its index, shared by the workers
+_ref = {}
+
+
+# -----------------------------  FUNCTIONS -----------------------------
+def read_sol_cat(cat, err_scale=1.):
+    '''Read source positions from the .cat file of a VLBI solution.
+
+    Parameters
+    ----------
+    cat : string
+        filename with path of the .cat file of a VLBI solution
+    err_scale : float
+        factor to convert the formal uncertainties into micro-as,
+        e.g., 1.e3 for mas
+
+    Returns
+    ----------
+    sou : array of string
+        source names, IVS designation
+    RA / Dec : array of float
+        Right Ascension / Declination, degreees
+    RAc_err / Dec_err : array of float
+        formal uncertainty of RA*cos(Dec) / Dec, micro-as.
+    cor : array of float
+        correlation coeffient between RA and Dec.
+    '''
+
+    sou = np.genfromtxt(cat, dtype=str, usecols=(0,))
+    RA, Dec, RAc_err, Dec_err, cor = np.genfromtxt(
+        cat, usecols=range(2, 7), unpack=True)
+
+    return sou, RA, Dec, RAc_err * err_scale, Dec_err * err_scale, cor
+
+
+def sol_ref_diff(sol, ref, ref_index=None):
+    '''Calculate the position differences between a solution and reference.
+
+    Parameters
+    ----------
+    sol : tuple
+        (sou, RA, Dec, RAc_err, Dec_err, cor) of a solution,
+        see function 'read_sol_cat'
+    ref : tuple
+        (sou, RA, Dec, RAc_err, Dec_err, cor, flg) of the reference
+        catalog, as returned by 'read_icrf2' or 'read_gaiadr1'
+    ref_index : tuple
+        index of the reference source names, see function
+        'list_crossmatch.list_index'; default is None to build it here
+
+    Returns
+    ----------
+    DiffData : list
+        [soucom, RA1n, Dec1n, dRAc, dRAc_err, dDec, dDec_err, cov,
+         pos_sep, X_a, X_d, X, flgcom], the same as returned by
+        'sol_icrf2_diff_calc'
+    '''
+
+    sou1, RA1, Dec1, RAc_err1, Dec_err1, cor1 = sol
+    sou2, RA2, Dec2, RAc_err2, Dec_err2, cor2, flg = ref
+
+    soucom, index1, index2 = list_crossmatch(sou1, sou2, ref_index)
+    flgcom = np.take(flg, index2)
+
+    dat1 = position_taken(index1, RA1, RAc_err1, Dec1, Dec_err1, cor1)
+    dat2 = position_taken(index2, RA2, RAc_err2, Dec2, Dec_err2, cor2)
+
+    dRAc, dRAc_err, dDec, dDec_err, cov, cof = position_diff_calc(
+        dat1, dat2)
+
+    pos_sep, X_a, X_d, X, X2 = nor_sep_calc(
+        dRAc, dRAc_err, dDec, dDec_err, cof)
+
+    return [soucom, dat1[0], dat1[2],
+            dRAc, dRAc_err, dDec, dDec_err, cov,
+            pos_sep, X_a, X_d, X, flgcom]
+
+
+def sol_vsh_calc(cat, ref, ref_index=None, degree=2, elim_flag="sigma",
+                 N=3.0, err_scale=1.):
+    '''VSH parameters of the differences between a solution and reference.
+
+    Parameters
+    ----------
+    cat : string
+        filename with path of the .cat file of a VLBI solution
+    ref/ref_index :
+        reference catalog and its index, see function 'sol_ref_diff'
+    degree : int
+        maximum degree of the VSH functions, default is 2
+    elim_flag/N :
+        outlier elimination, see function 'vsh_degl_cor.vsh_fit'
+    err_scale : float
+        see function 'read_sol_cat'
+
+    Returns
+    ----------
+    num_com : int
+        number of common sources
+    num_outl : int
+        number of outliers
+    x : array of float
+        estimation of VSH parameters in uas
+    sig : array of float
+        uncertainty of x in uas
+    '''
+
+    DiffData = sol_ref_diff(read_sol_cat(cat, err_scale), ref, ref_index)
+    [soucom, RAdeg, DEdeg, dRA, dRA_err, dDE, dDE_err, cov] = DiffData[:8]
+
+    x, sig, _, ind_outl, _, _ = vsh_fit(
+        dRA, dDE, dRA_err, dDE_err, np.deg2rad(RAdeg), np.deg2rad(DEdeg),
+        cov=cov, degree=degree, elim_flag=elim_flag, N=N)
+
+    return soucom.size, ind_outl.size, x, sig
+
+
+def _init_worker(ref, ref_index, kwargs):
+    '''Keep the reference catalog in a worker.
+    '''
+
+    _ref["ref"], _ref["index"], _ref["kwargs"] = ref, ref_index, kwargs
+
+
+def _sol_worker(cat):
+    '''Compare a solution with the reference in a worker.
+    '''
+
+    return sol_vsh_calc(cat, _ref["ref"], _ref["index"], **_ref["kwargs"])
+
+
+def multi_sol_comparison(cats, ref, labels=None, fout=None, degree=2,
+                         elim_flag="sigma", N=3.0, err_scale=1., nproc=1):
+    '''Compare many VLBI solutions with one reference catalog.
+
+    Parameters
+    ----------
+    cats : list of string
+        filenames with path of the .cat files of the VLBI solutions
+    ref : tuple
+        reference catalog, see function 'sol_ref_diff'
+    labels : list of string
+        labels of the solutions, default is the names of the .cat files
+    fout :
+        handlings of output file for the table, default is None
+    degree/elim_flag/N/err_scale :
+        see function 'sol_vsh_calc'
+    nproc : int
+        number of processes, None for the number of CPUs, default 1
+
+    Returns
+    ----------
+    num : array of int
+        number of common sources and outliers of every solution
+    X : array of float
+        VSH parameters of every solution in uas, of shape (N_sol, M)
+    SIG : array of float
+        uncertainty of X in uas
+    '''
+
+    if labels is None:
+        labels = [path.splitext(path.basename(cat))[0] for cat in cats]
+
+    # The index of reference source names is built only once.
+    ref_index = list_index(ref[0])
+    kwargs = {"degree": degree, "elim_flag": elim_flag, "N": N,
+              "err_scale": err_scale}
+
+    if nproc == 1:
+        results = [sol_vsh_calc(cat, ref, ref_index, **kwargs)
+                   for cat in cats]
+    else:
+        with Pool(nproc, initializer=_init_worker,
+                  initargs=(ref, ref_index, kwargs)) as pool:
+            results = pool.map(_sol_worker, cats)
+
+    num = np.array([res[:2] for res in results], dtype=int)
+    X = np.array([res[2] for res in results])
+    SIG = np.array([res[3] for res in results])
+
+    if fout is not None:
+        parnames = vsh_par_name(degree)
+        print("# VSH parameters (degree %d, elimination '%s') of the "
+              "position differences\n"
+              "# Unit: uas\n"
+              "# Columns: solution, number of common sources, "
+              "number of outliers, then estimate and uncertainty of\n"
+              "# %s\n%s" %
+              (degree, elim_flag, "  ".join(parnames),
+               time.strftime('# %Y-%m-%d %H:%M:%S',
+                             time.localtime(time.time()))),
+              file=fout)
+
+        for labi, numi, xi, sigi in zip(labels, num, X, SIG):
+            print("%-20s  %5d  %5d" % (labi, numi[0], numi[1]) +
+                  "  %+8.1f  %6.1f" * xi.size %
+                  tuple(np.ravel(np.column_stack((xi, sigi)))),
+                  file=fout)
+
+    return num, X, SIG
+
+
+# -------------------------------- MAIN --------------------------------
+if __name__ == "__main__":
+    # Check input parameters
+    if len(sys.argv) < 5 or sys.argv[1] not in ["icrf2", "gaiadr1"]:
+        print("Input error!\n"
+              "Usage: %s icrf2|gaiadr1 ref_file out_file sol1.cat "
+              "[sol2.cat ...]" % sys.argv[0])
+        exit()
+
+    reftype, reffile, outfile = sys.argv[1:4]
+
+    if reftype == "icrf2":
+        ref = read_icrf2(reffile)
+        err_scale = 1.
+    else:
+        ref = read_gaiadr1(reffile)
+        # mas -> uas, as in 'sol_Gaia_diff_calc'
+        err_scale = 1.e3
+
+    with open(outfile, "w") as fout:
+        multi_sol_comparison(sys.argv[4:], ref, fout=fout,
+                             err_scale=err_scale, nproc=None)
+# --------------------------------- END --------------------------------
@@ -9,10 +9,13 @@ Created on Mon Apr  2 16:52:06 2018
 History
 N. Liu 08/05/2018: add a new function 'pos_max_calc' to calculate
                     semi-major axis of the dispersion ellipse;
+N. Liu 18/10/2026: vectorize function 'nor_sep_calc' with the closed form
+                    of the 2x2 quadratic form, which is now shared by
+                    'cross_match' and 'source_position_comparison';
+                    it also returns X2 and takes C = +/-1 as +/-0.99;
 """
 
 import numpy as np
-from functools import reduce
 sqrt = np.sqrt
 
 __all__ = ['nor_sep_calc', 'vlbi_gaia_sep', "pos_max_calc",
@@ -34,6 +37,7 @@ def nor_sep_calc(dRA, dRA_err, dDC, dDC_err, C):
     ang_sep : angular seperation, in micro-as
     X_a / X_d : normalized coordinate differences in RA / DC, unit-less
     X : Normalized separations, unit-less.
+    X2 : Normalized separations without the correlation, unit-less.
     '''
 
     # Angular seperations
@@ -43,21 +47,18 @@ def nor_sep_calc(dRA, dRA_err, dDC, dDC_err, C):
     X_a = dRA / dRA_err
     X_d = dDC / dDC_err
 
-    # Normalised separation - Mignard's statistics (considering covariance)
-    X = np.zeros_like(X_a)
+    # The matrix [[1, C], [C, 1]] is singular for C = +/-1.
+    C = np.asarray(C, dtype=float)
+    C = np.where(C == -1., -0.99, np.where(C == 1., 0.99, C))
 
-    for i, (X_ai, X_di, Ci) in enumerate(zip(X_a, X_d, C)):
-        wgt = np.linalg.inv(np.mat([[1, Ci],
-                                    [Ci, 1]]))
-        Xmat = np.mat([X_ai, X_di])
-        X[i] = sqrt(reduce(np.dot, (Xmat, wgt, Xmat.T)))
+    # Normalised separation - Mignard's statistics (considering covariance)
+    # The inverse of [[1, C], [C, 1]] is [[1, -C], [-C, 1]] / (1 - C^2).
+    X = sqrt((X_a**2 - 2 * C * X_a * X_d + X_d**2) / (1 - C**2))
 
     # # Normalised separation (normal way)
-    # Just for test
-    # X2 = sqrt(X_a**2 + X_d**2)
+    X2 = sqrt(X_a**2 + X_d**2)
 
-    return ang_sep, X_a, X_d, X
-    # return ang_sep, X_a, X_d, X, X2
+    return ang_sep, X_a, X_d, X, X2
 
 
 def vlbi_gaia_sep(RA1, DC1, RA1_err, DC1_err, Cor1,
@@ -166,7 +167,8 @@ def test_code():
                                delimiter="|")
 
     ang_sep, X_a, X_d, X = vlbi_gaia_sep(RA1, DC1, RA1_err, DC1_err, Cor1,
-                                         RA2, DC2, RA2_err, DC2_err, Cor2)
+                                         RA2, DC2, RA2_err, DC2_err,
+                                         Cor2)[5:9]
 
     for (soui, ang_sepi, X_ai, X_di, Xi) in zip(
             sourcename, ang_sep, X_a, X_d, X):
@@ -0,0 +1,636 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+# File name: normal_eqn.py
+"""
+Created on Sun Oct 18 10:12:36 2026
+
+@author: Neo(liuniu@smail.nju.edu.cn)
+
+Build the normal equation of a least squares fitting of 2-D (dRA, dDE)
+data without forming the 2N x 2N weight matrix.
+
+The covariance matrix of (dRA, dDE) is block-diagonal: only the 2 x 2
+block of each source is non-zero. So the weight matrix is block-diagonal
+as well and the normal matrix A = J^T * W * J can be accumulated source
+by source, which costs O(N) memory instead of O(N^2).
+
+The Jacobian matrix follows the layout used in the VSH modules, i.e.,
+the first N rows are the partials of dRA and the last N rows are those
+of dDE.
+
+It is also the common least squares core of the fittings in this
+package: the normal equation is solved by Cholesky decomposition (see
+'normal_eqn_solve'), or the weighted Jacobian matrix is decomposed by QR
+(see 'lsq_solve'), without computing the inverse of the normal matrix.
+
+History
+N. Liu, 18 Oct 2026: solve the normal equation by Cholesky decomposition
+                     and compute the correlation matrix at once; add
+                     functions 'normal_eqn_wgt', 'corr_mat_calc' and
+                     'lsq_solve';
+N. Liu, 18 Oct 2026: add function 'normal_eqn_src' for the contribution of
+                     every source, used by 'vsh_resample';
+N. Liu, 18 Oct 2026: add functions 'robust_wgt_calc' and 'normal_eqn_irls'
+                     for the robust fitting with Huber or Cauchy loss;
+N. Liu, 18 Oct 2026: add function 'normal_eqn_solve_batch' to solve a
+                     batch of normal equations, used by 'vsh_resample';
+N. Liu, 18 Oct 2026: the number of iterations of function
+                     'normal_eqn_elim' is limited by 'max_iter'.
+"""
+
+import numpy as np
+from numpy.linalg import LinAlgError
+from scipy.linalg import cholesky, cho_solve, solve_triangular
+
+__all__ = ["wgt_blk_calc", "normal_eqn_wgt", "normal_eqn_calc",
+           "normal_eqn_subset", "normal_eqn_src", "normal_eqn_update",
+           "normal_eqn_accum", "corr_mat_calc", "normal_eqn_solve",
+           "normal_eqn_solve_batch", "lsq_solve", "normal_eqn_elim",
+           "robust_wgt_calc", "normal_eqn_irls"]
+
+
+# Default tuning constants of the loss functions for the normalized
+# residual X of a source. X is the norm of a 2-D residual, so it follows
+# the chi distribution with 2 degrees of freedom for Gaussian errors,
+# i.e., P(X > c) = exp(-c^2 / 2), and the 1-D constants (1.345/2.385)
+# would downweight about 40% of good sources.
+# For "huber", c is the 95% quantile of chi_2, so 95% of good sources
+# keep the full weight (efficiency of 99.5% for Gaussian errors).
+# For "cauchy", c gives an efficiency of 95% for Gaussian errors in 2-D;
+# all the weights are below 1, so its formal uncertainties, taken from
+# the reweighted normal matrix, are about 10% larger for Gaussian errors.
+ROBUST_C = {"huber": 2.448, "cauchy": 2.549}
+
+
+# -----------------------------  FUNCTIONS -----------------------------
+def wgt_blk_calc(e_dRA, e_dDE, cov=None):
+    '''Calculate the 2x2 blocks of the weight matrix.
+
+    The weight block of each source is the inverse of
+        | e_dRA^2    cov   |
+        |   cov    e_dDE^2 |
+    which is computed in the closed form.
+
+    Parameters
+    ----------
+    e_dRA/e_dDE : array of float
+        formal uncertainty of dRA(*cos(DE))/dDE in uas
+    cov : array of float
+        covariance between dRA and dDE in uas^2, default is None
+
+    Returns
+    ----------
+    w11/w12/w22 : array of float
+        elements (1, 1), (1, 2)(=(2, 1)) and (2, 2) of the weight block
+        of every source
+    '''
+
+    var1, var2 = e_dRA**2, e_dDE**2
+
+    if cov is None:
+        return 1. / var1, np.zeros_like(var1), 1. / var2
+
+    det = var1 * var2 - cov**2
+
+    return var2 / det, -cov / det, var1 / det
+
+
+def normal_eqn_wgt(JacMat, dRA, dDE, w11, w12, w22):
+    '''Calculate matrix A and b of the normal equation for given weights.
+
+    Parameters
+    ----------
+    JacMat : matrix
+        Jacobian matrix of shape (2N, M), rows of dRA before rows of dDE
+    dRA/dDE : array of float
+        R.A.(*cos(Dec.))/Dec. differences in uas
+    w11/w12/w22 : array of float
+        elements (1, 1), (1, 2)(=(2, 1)) and (2, 2) of the weight block
+        of every source, see function 'wgt_blk_calc'
+
+    Returns
+    ----------
+    A : matrix
+        normal matrix of shape (M, M)
+    b : array of float
+        right-hand side of the normal equation
+    '''
+
+    num = dRA.size
+    Jac1, Jac2 = JacMat[:num], JacMat[num:]
+
+    # W * J, computed block by block
+    WJac1 = w11[:, None] * Jac1 + w12[:, None] * Jac2
+    WJac2 = w12[:, None] * Jac1 + w22[:, None] * Jac2
+
+    A = np.dot(Jac1.T, WJac1) + np.dot(Jac2.T, WJac2)
+    b = np.dot(WJac1.T, dRA) + np.dot(WJac2.T, dDE)
+
+    return A, b
+
+
+def normal_eqn_calc(JacMat, dRA, dDE, e_dRA, e_dDE, cov=None):
+    '''Calculate matrix A and b of the normal equation A * x = b.
+
+    A = J^T * W * J and b = J^T * W * y, where W is the block-diagonal
+    weight matrix.
+
+    Parameters
+    ----------
+    JacMat : matrix
+        Jacobian matrix of shape (2N, M), rows of dRA before rows of dDE
+    dRA/dDE : array of float
+        R.A.(*cos(Dec.))/Dec. differences in uas
+    e_dRA/e_dDE : array of float
+        formal uncertainty of dRA(*cos(DE))/dDE in uas
+    cov : array of float
+        covariance between dRA and dDE in uas^2, default is None
+
+    Returns
+    ----------
+    A : matrix
+        normal matrix of shape (M, M)
+    b : array of float
+        right-hand side of the normal equation
+    '''
+
+    w11, w12, w22 = wgt_blk_calc(e_dRA, e_dDE, cov)
+
+    return normal_eqn_wgt(JacMat, dRA, dDE, w11, w12, w22)
+
+
+def normal_eqn_subset(JacMat, dRA, dDE, e_dRA, e_dDE, cov, ind):
+    '''Calculate the contribution of some sources to the normal equation.
+
+    Parameters
+    ----------
+    JacMat : matrix
+        Jacobian matrix of all sources, of shape (2N, M)
+    dRA/dDE : array of float
+        R.A.(*cos(Dec.))/Dec. differences in uas
+    e_dRA/e_dDE : array of float
+        formal uncertainty of dRA(*cos(DE))/dDE in uas
+    cov : array of float
+        covariance between dRA and dDE in uas^2, could be None
+    ind : array of int
+        index of the sources
+
+    Returns
+    ----------
+    A : matrix
+        normal matrix of these sources
+    b : array of float
+        right-hand side of the normal equation of these sources
+    '''
+
+    JacMati = np.vstack((JacMat[ind], JacMat[ind + dRA.size]))
+
+    if cov is None:
+        covi = None
+    else:
+        covi = cov[ind]
+
+    return normal_eqn_calc(JacMati, dRA[ind], dDE[ind],
+                           e_dRA[ind], e_dDE[ind], covi)
+
+
+def normal_eqn_src(JacMat, dRA, dDE, e_dRA, e_dDE, cov=None):
+    '''Calculate the contribution of every source to the normal equation.
+
+    The normal equation of any (weighted) subset of sources is then the
+    (weighted) sum of these contributions, e.g., for resampling.
+
+    Parameters
+    ----------
+    JacMat, dRA, dDE, e_dRA, e_dDE, cov :
+        see function 'normal_eqn_calc'
+
+    Returns
+    ----------
+    Ai : array of float
+        normal matrix of every source, of shape (N, M, M)
+    bi : array of float
+        right-hand side of every source, of shape (N, M)
+    '''
+
+    num = dRA.size
+    Jac1, Jac2 = JacMat[:num], JacMat[num:]
+
+    w11, w12, w22 = wgt_blk_calc(e_dRA, e_dDE, cov)
+
+    # W * J, computed block by block
+    WJac1 = w11[:, None] * Jac1 + w12[:, None] * Jac2
+    WJac2 = w12[:, None] * Jac1 + w22[:, None] * Jac2
+
+    Ai = (Jac1[:, :, None] * WJac1[:, None, :] +
+          Jac2[:, :, None] * WJac2[:, None, :])
+    bi = WJac1 * dRA[:, None] + WJac2 * dDE[:, None]
+
+    return Ai, bi
+
+
+def normal_eqn_update(A, b, JacMat, dRA, dDE, e_dRA, e_dDE, cov,
+                      ind_old, ind_new):
+    '''Update the normal equation for a new set of good sources.
+
+    Contributions of sources in ind_old but not in ind_new are subtracted
+    and those of sources only in ind_new are added back, so the cost only
+    depends on the number of sources that change.
+
+    Parameters
+    ----------
+    A : matrix
+        normal matrix built on sources of ind_old
+    b : array of float
+        right-hand side of the normal equation built on sources of ind_old
+    JacMat, dRA, dDE, e_dRA, e_dDE, cov :
+        see function 'normal_eqn_subset'
+    ind_old/ind_new : array of int
+        index of old/new good sources
+
+    Returns
+    ----------
+    A : matrix
+        normal matrix built on sources of ind_new
+    b : array of float
+        right-hand side of the normal equation built on sources of ind_new
+    '''
+
+    ind_rej = np.setdiff1d(ind_old, ind_new)
+    ind_acc = np.setdiff1d(ind_new, ind_old)
+
+    if ind_rej.size:
+        Ai, bi = normal_eqn_subset(JacMat, dRA, dDE, e_dRA, e_dDE, cov,
+                                   ind_rej)
+        A, b = A - Ai, b - bi
+
+    if ind_acc.size:
+        Ai, bi = normal_eqn_subset(JacMat, dRA, dDE, e_dRA, e_dDE, cov,
+                                   ind_acc)
+        A, b = A + Ai, b + bi
+
+    return A, b
+
+
+def normal_eqn_accum(chunks, jac_func):
+    '''Accumulate the normal equation over chunks of data.
+
+    Only one chunk is kept in memory at a time, so catalogs larger than
+    the RAM can be fitted.
+
+    Parameters
+    ----------
+    chunks : iterable
+        every item is a tuple of (dRA, dDE, e_dRA, e_dDE, cov, RA, DE),
+        in the same order as returned by 'find_good_obs'; cov may be None
+    jac_func : function
+        jac_func(RA, DE) returns the Jacobian matrix and its transpose
+
+    Returns
+    ----------
+    A : matrix
+        normal matrix
+    b : array of float
+        right-hand side of the normal equation
+    num : int
+        number of sources used
+    '''
+
+    A, b, num = 0, 0, 0
+
+    for dRA, dDE, e_dRA, e_dDE, cov, RA, DE in chunks:
+        JacMat, _ = jac_func(RA, DE)
+        Ai, bi = normal_eqn_calc(JacMat, dRA, dDE, e_dRA, e_dDE, cov)
+
+        A, b, num = A + Ai, b + bi, num + dRA.size
+
+    if not num:
+        print("ERROR: no data in the chunks!")
+        exit()
+
+    return A, b, num
+
+
+def corr_mat_calc(pcov):
+    '''Calculate the uncertainties and correlation matrix from covariance.
+
+    Parameters
+    ----------
+    pcov : matrix
+        covariance matrix of the parameters
+
+    Returns
+    ----------
+    sig : array of float
+        uncertainty of the parameters
+    corrmat : matrix
+        matrix of correlation coefficient.
+    '''
+
+    sig = np.sqrt(np.diagonal(pcov))
+    corrmat = pcov / np.outer(sig, sig)
+
+    return sig, corrmat
+
+
+def normal_eqn_solve(A, b):
+    '''Solve the normal equation A * x = b.
+
+    A is factorized by Cholesky decomposition A = L * L^T, which is used
+    both for x and for the covariance matrix A^-1 = L^-T * L^-1, so A is
+    never inverted directly. If A is not positive definite (numerically),
+    the pseudo-inverse is used instead.
+
+    Parameters
+    ----------
+    A : matrix
+        normal matrix
+    b : array of float
+        right-hand side of the normal equation
+
+    Returns
+    ----------
+    x : array of float
+        estimation of the parameters
+    sig : array of float
+        uncertainty of x
+    corrmat : matrix
+        matrix of correlation coefficient.
+    '''
+
+    A = np.asarray(A)
+    b = np.asarray(b)
+
+    try:
+        L = cholesky(A, lower=True)
+    except LinAlgError:
+        print("Warning: the normal matrix is not positive definite, "
+              "the pseudo-inverse is used.")
+        pcov = np.linalg.pinv(A, hermitian=True)
+        x = np.dot(pcov, b)
+    else:
+        x = cho_solve((L, True), b)
+
+        # Covariance.
+        Linv = solve_triangular(L, np.eye(A.shape[0]), lower=True)
+        pcov = np.dot(Linv.T, Linv)
+
+    # Correlation coefficient.
+    sig, corrmat = corr_mat_calc(pcov)
+
+    return x, sig, corrmat
+
+
+def normal_eqn_solve_batch(A, b):
+    '''Solve a batch of normal equations A[i] * x[i] = b[i].
+
+    The normal matrices are factorized by Cholesky decomposition at once,
+    as in function 'normal_eqn_solve' but without the covariance matrices.
+    If any of them is not positive definite (numerically), they are
+    solved one by one by 'normal_eqn_solve'.
+
+    Parameters
+    ----------
+    A : array of float
+        normal matrices, of shape (R, M, M)
+    b : array of float
+        right-hand sides of the normal equations, of shape (R, M)
+
+    Returns
+    ----------
+    x : array of float
+        estimation of the parameters, of shape (R, M)
+    '''
+
+    try:
+        L = np.linalg.cholesky(A)
+    except LinAlgError:
+        return np.array([normal_eqn_solve(Ai, bi)[0]
+                         for Ai, bi in zip(A, b)])
+
+    return np.array([cho_solve((Li, True), bi) for Li, bi in zip(L, b)])
+
+
+def lsq_solve(JacMat, y, err):
+    '''Weighted least squares fitting of uncorrelated data with QR.
+
+    The weighted Jacobian matrix J / err = Q * R is decomposed and the
+    normal matrix J^T * W * J = R^T * R is never formed, which is more
+    stable for ill-conditioned problems.
+
+    Parameters
+    ----------
+    JacMat : matrix
+        Jacobian matrix of shape (N, M)
+    y : array of float
+        observations
+    err : array of float
+        formal uncertainty of y
+
+    Returns
+    ----------
+    x : array of float
+        estimation of the parameters
+    sig : array of float
+        uncertainty of x
+    corrmat : matrix
+        matrix of correlation coefficient.
+    '''
+
+    Q, R = np.linalg.qr(JacMat / err[:, None])
+    x = solve_triangular(R, np.dot(Q.T, y / err))
+
+    # Covariance (R^T * R)^-1 = R^-1 * R^-T
+    Rinv = solve_triangular(R, np.eye(R.shape[0]))
+    pcov = np.dot(Rinv, Rinv.T)
+
+    # Correlation coefficient.
+    sig, corrmat = corr_mat_calc(pcov)
+
+    return x, sig, corrmat
+
+
+def normal_eqn_elim(JacMat, dRA, dDE, e_dRA, e_dDE, cov, elim_func,
+                    flog=None, max_iter=100):
+    '''Least squares fitting with iterative outlier elimination.
+
+    The normal equation of all sources is built only once. At each
+    iteration only the contributions of newly rejected (or re-accepted)
+    sources are subtracted from (or added to) it.
+
+    The iteration stops when the number of outliers does not change, or
+    after max_iter iterations since the set of outliers may oscillate.
+
+    Parameters
+    ----------
+    JacMat, dRA, dDE, e_dRA, e_dDE, cov :
+        see function 'normal_eqn_subset'
+    elim_func : function
+        elim_func(rRA, rDE) returns the index of good sources based on
+        the residuals rRA/rDE
+    flog :
+        handlings of output file, default is None (no output).
+    max_iter : int
+        maximum number of iterations, default is 100
+
+    Returns
+    ----------
+    x : array of float
+        estimation of the parameters
+    sig : array of float
+        uncertainty of x
+    corrmat : matrix
+        matrix of correlation coefficient.
+    ind_go : array of int
+        index of good sources
+    '''
+
+    num = dRA.size
+    dPos = np.hstack((dRA, dDE))
+
+    A, b = normal_eqn_calc(JacMat, dRA, dDE, e_dRA, e_dDE, cov)
+    x, sig, corrmat = normal_eqn_solve(A, b)
+    ind_go = np.arange(num)
+
+    # Iteration.
+    num1 = 1
+    num2 = 0
+    niter = 0
+    while(num1 != num2):
+        if niter == max_iter:
+            print("Warning: the outlier elimination does not converge "
+                  "after %d iterations." % max_iter)
+            break
+
+        niter += 1
+        num1 = num2
+
+        # Calculate the residual. ( O - C )
+        rRA, rDE = np.resize(dPos - np.dot(JacMat, x), (2, num))
+        ind_new = elim_func(rRA, rDE)
+        num2 = num - ind_new.size
+
+        A, b = normal_eqn_update(A, b, JacMat, dRA, dDE, e_dRA, e_dDE, cov,
+                                 ind_go, ind_new)
+        ind_go = ind_new
+
+        x, sig, corrmat = normal_eqn_solve(A, b)
+
+        if flog is not None:
+            print('# Number of sample: %d' % (num - num2), file=flog)
+
+    return x, sig, corrmat, ind_go
+
+
+def robust_wgt_calc(X, loss="huber", c=None):
+    '''Calculate the robust weights of the normalized residuals.
+
+    Parameters
+    ----------
+    X : array of float
+        normalized residual of every source, unit-less
+    loss : string
+        "huber" for w = min(1, c / X),
+        "cauchy" for w = 1 / (1 + (X / c)^2)
+    c : float
+        tuning constant, default is ROBUST_C[loss]
+
+    Returns
+    ----------
+    wgt : array of float
+        weight of every source, between 0 and 1
+    '''
+
+    if loss not in ROBUST_C:
+        print("ERROR: loss can only be huber or cauchy!")
+        exit()
+
+    if c is None:
+        c = ROBUST_C[loss]
+
+    if loss == "huber":
+        wgt = c / np.maximum(X, c)
+    else:
+        wgt = 1. / (1 + (X / c)**2)
+
+    return wgt
+
+
+def normal_eqn_irls(JacMat, dRA, dDE, e_dRA, e_dDE, cov=None, loss="huber",
+                    c=None, max_iter=30, tol=1.e-4, flog=None):
+    '''Least squares fitting with iteratively reweighted least squares.
+
+    Instead of removing outliers, the weight block of every source is
+    scaled by a robust weight computed from its normalized residual
+        X^2 = r^T * W * r,
+    where r = (rRA, rDE) and W is the 2x2 weight block. The weight blocks
+    are computed only once, so each iteration only costs the building of
+    the normal equation, and the number of iterations is bounded.
+
+    The iteration stops when the change of every parameter is smaller
+    than tol times its uncertainty, or after max_iter iterations.
+
+    Parameters
+    ----------
+    JacMat, dRA, dDE, e_dRA, e_dDE, cov :
+        see function 'normal_eqn_calc'
+    loss/c :
+        loss function and tuning constant, see function 'robust_wgt_calc'
+    max_iter : int
+        maximum number of iterations, default 30
+    tol : float
+        tolerance of the change of parameters, in unit of uncertainty
+    flog :
+        handlings of output file, default is None (no output).
+
+    Returns
+    ----------
+    x : array of float
+        estimation of the parameters
+    sig : array of float
+        uncertainty of x
+    corrmat : matrix
+        matrix of correlation coefficient.
+    wgt : array of float
+        final robust weight of every source
+    X : array of float
+        normalized residual of every source for x
+    '''
+
+    if max_iter < 1:
+        print("ERROR: max_iter should be at least 1!")
+        exit()
+
+    num = dRA.size
+    dPos = np.hstack((dRA, dDE))
+
+    w11, w12, w22 = wgt_blk_calc(e_dRA, e_dDE, cov)
+
+    A, b = normal_eqn_wgt(JacMat, dRA, dDE, w11, w12, w22)
+    x, sig, corrmat = normal_eqn_solve(A, b)
+
+    for niter in range(1, max_iter + 1):
+        # Normalized residuals
+        rRA, rDE = np.resize(dPos - np.dot(JacMat, x), (2, num))
+        X = np.sqrt(w11 * rRA**2 + 2 * w12 * rRA * rDE + w22 * rDE**2)
+        wgt = robust_wgt_calc(X, loss, c)
+
+        A, b = normal_eqn_wgt(JacMat, dRA, dDE,
+                              wgt * w11, wgt * w12, wgt * w22)
+        x_old = x
+        x, sig, corrmat = normal_eqn_solve(A, b)
+
+        if np.all(np.fabs(x - x_old) <= tol * sig):
+            break
+
+    # Normalized residuals of the final estimation
+    rRA, rDE = np.resize(dPos - np.dot(JacMat, x), (2, num))
+    X = np.sqrt(w11 * rRA**2 + 2 * w12 * rRA * rDE + w22 * rDE**2)
+
+    if flog is not None:
+        print("# Robust fitting (%s): %d iterations, sum of weights %.1f"
+              " for %d sources" % (loss, niter, np.sum(wgt), num),
+              file=flog)
+
+    return x, sig, corrmat, wgt, X
+# --------------------------------- END --------------------------------
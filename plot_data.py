@@ -4,13 +4,79 @@
 Created on Mon Dec  4 10:26:18 2017
 
 @author: Neo
-"""
 
+History
+N. Liu, 18 Oct 2026: the figure of each layout is created once and reused
+                     (see 'FIG_REUSE'); the worker processes use the
+                     non-interactive backend Agg (see 'plot_worker_init'),
+                     and the backend of the caller is not changed.
+"""
 
+import matplotlib
+import matplotlib.pyplot as plt
 from ensure_dir import ensure_dir
 
 
+# Set it to False to create a new figure for every plot
+FIG_REUSE = True
+
+# Number of rows -> (figure, axes) reused by this process
+_figs = {}
+
+
 # ------------------------------  FUNCTIONS  ---------------------------
+def plot_worker_init():
+    '''Initialize a worker process which only saves figures into files.
+
+    The non-interactive backend Agg is used, so that no window (or
+    display) is needed by the workers of a process pool.
+    '''
+
+    matplotlib.use("Agg")
+
+
+def get_fig(nrows):
+    '''Get a figure of nrows sub-plots sharing the x-axis.
+
+    If FIG_REUSE is True, the figure created for the same number of rows
+    is cleared and returned, instead of creating a new one.
+
+    Parameters
+    ----------
+    nrows : int
+        number of sub-plots
+
+    Returns
+    ----------
+    fig : Figure
+        figure
+    axes : array of Axes
+        sub-plots
+    '''
+
+    if not FIG_REUSE:
+        return plt.subplots(nrows=nrows, sharex=True)
+
+    if nrows not in _figs:
+        _figs[nrows] = plt.subplots(nrows=nrows, sharex=True)
+    else:
+        for ax in _figs[nrows][1]:
+            ax.cla()
+
+    return _figs[nrows]
+
+
+def save_fig(fig, figname):
+    '''Save the figure, and close it unless it is reused.
+    '''
+
+    ensure_dir(figname)
+    fig.savefig(figname)
+
+    if not FIG_REUSE:
+        plt.close(fig)
+
+
 def plot_sta_pv(staname, ident, eposta,
                 Xsta, Ysta, Zsta, Xsta_err, Ysta_err, Zsta_err, pv='P'):
     '''Plot the Position/Velocity of stations.
@@ -51,7 +117,7 @@ def plot_sta_pv(staname, ident, eposta,
         print("pv can only be set one of 'PVpv'")
         exit()
 
-    fig, (ax0, ax1, ax2) = plt.subplots(nrows=3, sharex=True)
+    fig, (ax0, ax1, ax2) = get_fig(3)
     ax0.errorbar(eposta, Xsta, yerr=Xsta_err, fmt='.')
     ax0.set_title("%s (%s)" % (ident[0], unit))
     # ax0.set_ylim([-500, 500])
@@ -63,10 +129,7 @@ def plot_sta_pv(staname, ident, eposta,
     ax2.set_xlabel("Epoch (year)")
     ax2.set_xlim([1979.0, 2018.0])
 
-    figname = "figures/ts_sta/%s_%s.eps" % (staname, ident)
-    ensure_dir(figname)
-    plt.savefig(figname)
-    plt.close()
+    save_fig(fig, "figures/ts_sta/%s_%s.eps" % (staname, ident))
 
 
 def plot_sou_pv(souname, eposou,
@@ -104,7 +167,7 @@ def plot_sou_pv(souname, eposou,
         print("pv can only be set one of 'PVpv'")
         exit()
 
-    fig, (ax0, ax1) = plt.subplots(nrows=2, sharex=True)
+    fig, (ax0, ax1) = get_fig(2)
     ax0.errorbar(eposou, RAsou * 1000, yerr=RAsou_err, fmt='.')
     ax0.set_title("R.A. (%s)" % unit)
     ax1.errorbar(eposou, DCsou * 1000, yerr=DCsou_err, fmt='.')
@@ -112,8 +175,5 @@ def plot_sou_pv(souname, eposou,
     ax1.set_xlabel("Epoch (year)")
     ax1.set_xlim([1979.0, 2018.0])
 
-    figname = "figures/ts_%s/%s.eps" % (lab, souname)
-    ensure_dir(figname)
-    plt.savefig(figname)
-    plt.close()
+    save_fig(fig, "figures/ts_%s/%s.eps" % (lab, souname))
 # ------------------------------ END -----------------------------------
@@ -7,14 +7,28 @@ Created on Mon Dec  4 10:14:30 2017
 
 Convert the string of RA/DEC into float.
 
+History
+N. Liu, 18 Oct 2026: functions 'RA_conv' and 'DC_conv' also accept str;
+                     add functions 'RA_conv_arr' and 'DC_conv_arr' to
+                     convert an array of strings at once;
+N. Liu, 18 Oct 2026: function 'sexages_split' checks the layout of every
+                     string, falls back to splitting the strings one by
+                     one if they are not of the same layout, accepts
+                     empty arrays and raises ValueError for malformed
+                     strings.
 """
 
+import numpy as np
+
 
 # ------------------------------  FUNCTIONS  ---------------------------
 def RA_conv(RAbyt):
     '''Convert right ascesion string of HH_MM_SS.ssssssss into float.
     '''
-    RAstr = str(RAbyt, encoding="utf8")
+    if isinstance(RAbyt, bytes):
+        RAstr = str(RAbyt, encoding="utf8")
+    else:
+        RAstr = RAbyt
     hours, mins, secs = RAstr.split('_')
     RAs = (float(hours) * 60 + float(mins)) * 60 + float(secs)
     # second -> arcsec
@@ -24,11 +38,118 @@ def RA_conv(RAbyt):
 def DC_conv(DCbyt):
     '''Convert declination string of +DD_AM_AS.ssssssss into float.
     '''
-    DCstr = str(DCbyt, encoding="utf8")
+    if isinstance(DCbyt, bytes):
+        DCstr = str(DCbyt, encoding="utf8")
+    else:
+        DCstr = DCbyt
     degs, ams, ass = DCstr.split('_')
     # Determine the sign
-    if DCstr[0] is '+':
+    if DCstr[0] == '+':
         return (float(degs) * 60 + float(ams)) * 60 + float(ass)
     else:
         return (float(degs) * 60 - float(ams)) * 60 - float(ass)
+
+
+def sexages_split(strs):
+    '''Split an array of strings of XX_MM_SS.sss into three fields.
+
+    The fields are taken from fixed columns if all the strings have the
+    separators at the same positions, as in the outputs of getpar;
+    otherwise the strings are split one by one.
+
+    Parameters
+    ----------
+    strs : array of string or bytes
+        strings of XX_MM_SS.sss
+
+    Returns
+    ----------
+    block : array of uint8
+        characters of every string
+    fld1/fld2/fld3 : array of float
+        values of the three fields
+    '''
+
+    strs = np.ravel(strs)
+    if strs.size == 0:
+        return (np.zeros((0, 0), dtype=np.uint8),
+                np.zeros(0), np.zeros(0), np.zeros(0))
+
+    strs = np.char.strip(strs)
+    if strs.dtype.kind == "U":
+        strs = np.char.encode(strs, "ascii")
+
+    width = strs.dtype.itemsize
+    if width == 0:
+        raise ValueError("empty strings of XX_MM_SS.sss")
+
+    block = np.frombuffer(strs.tobytes(), dtype=np.uint8).reshape(-1, width)
+
+    # Position of the two separators, which should be the same for all
+    # the strings
+    issep = block == ord('_')
+    sep = np.nonzero(issep[0])[0]
+
+    if sep.size == 2 and (issep == issep[0]).all():
+        flds = [np.ascontiguousarray(block[:, beg:end])
+                for beg, end in ((0, sep[0]), (sep[0]+1, sep[1]),
+                                 (sep[1]+1, width))]
+        fld1, fld2, fld3 = [
+            fld.view('S%d' % fld.shape[1]).ravel().astype(float)
+            for fld in flds]
+
+        return block, fld1, fld2, fld3
+
+    # Strings of different layouts
+    flds = [strb.split(b'_') for strb in strs]
+    for strb, fld in zip(strs, flds):
+        if len(fld) != 3:
+            raise ValueError("'%s' is not of XX_MM_SS.sss" %
+                             strb.decode())
+
+    fld1, fld2, fld3 = np.array(flds, dtype=float).T
+
+    return block, fld1, fld2, fld3
+
+
+def RA_conv_arr(RAstrs):
+    '''Convert an array of right ascesion strings into float.
+
+    Parameters
+    ----------
+    RAstrs : array of string or bytes
+        strings of HH_MM_SS.ssssssss
+
+    Returns
+    ----------
+    RA : array of float
+        right ascension in arc-sec
+    '''
+
+    _, hours, mins, secs = sexages_split(RAstrs)
+    RAs = (hours * 60 + mins) * 60 + secs
+    # second -> arcsec
+    return RAs * 15
+
+
+def DC_conv_arr(DCstrs):
+    '''Convert an array of declination strings into float.
+
+    The sign is taken from the first character, so that '-00_MM_SS.sss'
+    gives a negative value.
+
+    Parameters
+    ----------
+    DCstrs : array of string or bytes
+        strings of +DD_AM_AS.ssssssss
+
+    Returns
+    ----------
+    DC : array of float
+        declination in arc-sec
+    '''
+
+    block, degs, ams, ass = sexages_split(DCstrs)
+    sign = np.where(block[:, :1].ravel() == ord('-'), -1, 1)
+    return sign * ((np.fabs(degs) * 60 + ams) * 60 + ass)
 # ------------------------------ END -----------------------------------
@@ -6,9 +6,16 @@ Created on Sun Jul  2 16:00:08 2017
 Positional transformation.
 
 @author: Neo
+
+History
+N. Liu, 18 Oct 2026: functions 'tranXX' build the normal equation from the
+                     2x2 weight blocks and solve it with 'normal_eqn_solve'
+                     instead of the dense weight matrix and its inverse.
 """
 
 import numpy as np
+from normal_eqn import normal_eqn_calc, normal_eqn_solve, normal_eqn_elim
+from jac_cache import jac_mat_cache
 sin = np.sin
 cos = np.cos
 pi = np.pi
@@ -48,6 +55,20 @@ def wgt_mat(e_dRA, e_dDE, Cor):
 # Return the matrix.
     return wgt
 # ---------------------------------------------------
+def tran_fitting(dRA, dDE, e_dRA, e_dDE, cor, RA, DE, Jac_mat_func,
+                 JacMat=None):
+    # Fitting with iterative outlier elimination.
+    # The normal equation is built once and then updated with the
+    # contributions of newly rejected/re-accepted points only.
+    # The Jacobian matrix is taken from the cache unless given, e.g.,
+    # as rows of the cached matrix of the whole catalog.
+    if JacMat is None:
+        JacMat, _ = jac_mat_cache(Jac_mat_func, RA, DE)
+    w, sig, cof, indice = normal_eqn_elim(JacMat, dRA, dDE, e_dRA, e_dDE,
+                                          cor, elimination)
+    ind_outl = np.setxor1d(np.arange(dRA.size), indice)
+    return w, sig, cof, ind_outl
+# ---------------------------------------------------
 #######################  Tran-01-01 ###################################
 
 
@@ -101,50 +122,20 @@ def tran01_01(dRA, dDE, e_dRA, e_dDE, cor, RA, DE):
     ## DE0 = 0.0
     # Jacobian matrix and its transpose.
     JacMat, JacMatT = Jac_mat_tran01_01(RA, DE)
-# Weighted matrix.
-    WgtMat = wgt_mat(e_dRA, e_dDE, cor)
 # Calculate matrix A and b of matrix equation:
-# A * w = b.
-    A = np.dot(np.dot(JacMatT, WgtMat), JacMat)
-    dPos = np.hstack((dRA, dDE))
-    b = np.dot(np.dot(JacMatT, WgtMat),  dPos)
+# A * w = b, with the 2x2 weight blocks of each source.
+    A, b = normal_eqn_calc(JacMat, dRA, dDE, e_dRA, e_dDE, cor)
 # Solve the equations.
 ##  w = (r_x, r_y, r_z, D_1, D_2, B_2)
-    w = np.linalg.solve(A, b)
-# Covariance.
-    cov = np.linalg.inv(A)
-    sig = np.sqrt(cov.diagonal())
-# Correlation coefficient.
-    corrcoef = np.array([cov[i, j]/sig[i]/sig[j]
-                         for j in range(len(w)) for i in range(len(w))])
-    corrcoef.resize((len(w), len(w)))
+    w, sig, corrcoef = normal_eqn_solve(A, b)
 # Return the result.
     return w, sig, corrcoef
 # ----------------------------------------------------
 
 
-def tran01_01_fitting(dRA, dDE, e_dRA, e_dDE, cor, RA, DE):
-    w, sig, cof = tran01_01(dRA, dDE, e_dRA, e_dDE, cor, RA, DE)
-# Iteration.
-    num1 = 1
-    num2 = 0
-    while(num1 != num2):
-        num1 = num2
-# Calculate the residual. ( O - C )
-        rRA, rDE = res_arr01_01(dRA, dDE, RA, DE, w)
-        indice = elimination(rRA, rDE)
-        num2 = dRA.size - indice.size
-        dRAn, dDEn, e_dRAn, e_dDEn = \
-            np.take(  dRA, indice), np.take(  dDE, indice),\
-            np.take(e_dRA, indice), np.take(e_dDE, indice)
-        corn = np.take(cor, indice)
-        RAn, DEn = np.take(RA, indice), np.take(DE, indice)
-        wn, sign, cofn = tran01_01(dRAn, dDEn, e_dRAn, e_dDEn, corn, RAn, DEn)
-        w = wn
-        # print('# Number of sample: %d  %d' % (dRA.size-num1, dRA.size-num2),\
-        #     file = flog)
-    ind_outl = np.setxor1d(np.arange(dRA.size), indice)
-    return wn, sign, cofn, ind_outl
+def tran01_01_fitting(dRA, dDE, e_dRA, e_dDE, cor, RA, DE, JacMat=None):
+    return tran_fitting(dRA, dDE, e_dRA, e_dDE, cor, RA, DE,
+                        Jac_mat_tran01_01, JacMat)
 #######################  Tran-01-01 ###################################
 # ---------------------------------------------------
 #######################  Tran-01-02 ###################################
@@ -201,50 +192,20 @@ def tran01_02(dRA, dDE, e_dRA, e_dDE, cor, RA, DE):
     # unit for D_1 / D_2: mas/deg
     # Jacobian matrix and its transpose.
     JacMat, JacMatT = Jac_mat_tran01_02(RA, DE)
-# Weighted matrix.
-    WgtMat = wgt_mat(e_dRA, e_dDE, cor)
 # Calculate matrix A and b of matrix equation:
-# A * w = b.
-    A = np.dot(np.dot(JacMatT, WgtMat), JacMat)
-    dPos = np.hstack((dRA, dDE))
-    b = np.dot(np.dot(JacMatT, WgtMat),  dPos)
+# A * w = b, with the 2x2 weight blocks of each source.
+    A, b = normal_eqn_calc(JacMat, dRA, dDE, e_dRA, e_dDE, cor)
 # Solve the equations.
 ##  w = (r_x, r_y, r_z, D_1, D_2, B_2)
-    w = np.linalg.solve(A, b)
-# Covariance.
-    cov = np.linalg.inv(A)
-    sig = np.sqrt(cov.diagonal())
-# Correlation coefficient.
-    corrcoef = np.array([cov[i, j]/sig[i]/sig[j]
-                         for j in range(len(w)) for i in range(len(w))])
-    corrcoef.resize((len(w), len(w)))
+    w, sig, corrcoef = normal_eqn_solve(A, b)
 # Return the result.
     return w, sig, corrcoef
 # ---------------------------------------------------
 
 
-def tran01_02_fitting(dRA, dDE, e_dRA, e_dDE, cor, RA, DE):
-    w, sig, cof = tran01_01(dRA, dDE, e_dRA, e_dDE, cor, RA, DE)
-# Iteration.
-    num1 = 1
-    num2 = 0
-    while(num1 != num2):
-        num1 = num2
-# Calculate the residual. ( O - C )
-        rRA, rDE = res_arr01_02(dRA, dDE, RA, DE, w)
-        indice = elimination(rRA, rDE)
-        num2 = dRA.size - indice.size
-        dRAn, dDEn, e_dRAn, e_dDEn = \
-            np.take(  dRA, indice), np.take(  dDE, indice),\
-            np.take(e_dRA, indice), np.take(e_dDE, indice)
-        corn = np.take(cor, indice)
-        RAn, DEn = np.take(RA, indice), np.take(DE, indice)
-        wn, sign, cofn = tran01_02(dRAn, dDEn, e_dRAn, e_dDEn, corn, RAn, DEn)
-        w = wn
-        # print('# Number of sample: %d  %d' % (dRA.size-num1, dRA.size-num2),\
-        #     file = flog)
-    ind_outl = np.setxor1d(np.arange(dRA.size), indice)
-    return wn, sign, cofn, ind_outl
+def tran01_02_fitting(dRA, dDE, e_dRA, e_dDE, cor, RA, DE, JacMat=None):
+    return tran_fitting(dRA, dDE, e_dRA, e_dDE, cor, RA, DE,
+                        Jac_mat_tran01_02, JacMat)
 #######################  Tran-01-02 ###################################
 # ---------------------------------------------------
 #######################  Tran-01-03 ###################################
@@ -297,50 +258,20 @@ def tran01_03(dRA, dDE, e_dRA, e_dDE, cor, RA, DE):
     ## DE0 = 0.0
     # Jacobian matrix and its transpose.
     JacMat, JacMatT = Jac_mat_tran01_03(RA, DE)
-# Weighted matrix.
-    WgtMat = wgt_mat(e_dRA, e_dDE, cor)
 # Calculate matrix A and b of matrix equation:
-# A * w = b.
-    A = np.dot(np.dot(JacMatT, WgtMat), JacMat)
-    dPos = np.hstack((dRA, dDE))
-    b = np.dot(np.dot(JacMatT, WgtMat),  dPos)
+# A * w = b, with the 2x2 weight blocks of each source.
+    A, b = normal_eqn_calc(JacMat, dRA, dDE, e_dRA, e_dDE, cor)
 # Solve the equations.
 ##  w = (r_x, r_y, r_z, D_1, D_2, B_2)
-    w = np.linalg.solve(A, b)
-# Covariance.
-    cov = np.linalg.inv(A)
-    sig = np.sqrt(cov.diagonal())
-# Correlation coefficient.
-    corrcoef = np.array([cov[i, j]/sig[i]/sig[j]
-                         for j in range(len(w)) for i in range(len(w))])
-    corrcoef.resize((len(w), len(w)))
+    w, sig, corrcoef = normal_eqn_solve(A, b)
 # Return the result.
     return w, sig, corrcoef
 # ----------------------------------------------------
 
 
-def tran01_03_fitting(dRA, dDE, e_dRA, e_dDE, cor, RA, DE):
-    w, sig, cof = tran01_03(dRA, dDE, e_dRA, e_dDE, cor, RA, DE)
-# Iteration.
-    num1 = 1
-    num2 = 0
-    while(num1 != num2):
-        num1 = num2
-# Calculate the residual. ( O - C )
-        rRA, rDE = res_arr01_03(dRA, dDE, RA, DE, w)
-        indice = elimination(rRA, rDE)
-        num2 = dRA.size - indice.size
-        dRAn, dDEn, e_dRAn, e_dDEn = \
-            np.take(  dRA, indice), np.take(  dDE, indice),\
-            np.take(e_dRA, indice), np.take(e_dDE, indice)
-        corn = np.take(cor, indice)
-        RAn, DEn = np.take(RA, indice), np.take(DE, indice)
-        wn, sign, cofn = tran01_03(dRAn, dDEn, e_dRAn, e_dDEn, corn, RAn, DEn)
-        w = wn
-        # print('# Number of sample: %d  %d' % (dRA.size-num1, dRA.size-num2),\
-        #     file = flog)
-    ind_outl = np.setxor1d(np.arange(dRA.size), indice)
-    return wn, sign, cofn, ind_outl
+def tran01_03_fitting(dRA, dDE, e_dRA, e_dDE, cor, RA, DE, JacMat=None):
+    return tran_fitting(dRA, dDE, e_dRA, e_dDE, cor, RA, DE,
+                        Jac_mat_tran01_03, JacMat)
 #######################  Tran-01-03 ###################################
 # ---------------------------------------------------
 #######################  Tran-02    ###################################
@@ -387,50 +318,20 @@ def tran02(dRA, dDE, e_dRA, e_dDE, cor, RA, DE):
     ##     d_DE   = +r_x*sin(RA)         - r_y*cos(RA) + dz
     # Jacobian matrix and its transpose.
     JacMat, JacMatT = Jac_mat_tran02(RA, DE)
-# Weighted matrix.
-    WgtMat = wgt_mat(e_dRA, e_dDE, cor)
 # Calculate matrix A and b of matrix equation:
-# A * w = b.
-    A = np.dot(np.dot(JacMatT, WgtMat), JacMat)
-    dPos = np.hstack((dRA, dDE))
-    b = np.dot(np.dot(JacMatT, WgtMat),  dPos)
+# A * w = b, with the 2x2 weight blocks of each source.
+    A, b = normal_eqn_calc(JacMat, dRA, dDE, e_dRA, e_dDE, cor)
 # Solve the equations.
 ##  w = (r_x, r_y, r_z, dz)
-    w = np.linalg.solve(A, b)
-# Covariance.
-    cov = np.linalg.inv(A)
-    sig = np.sqrt(cov.diagonal())
-# Correlation coefficient.
-    corrcoef = np.array([cov[i, j]/sig[i]/sig[j]
-                         for j in range(len(w)) for i in range(len(w))])
-    corrcoef.resize((len(w), len(w)))
+    w, sig, corrcoef = normal_eqn_solve(A, b)
 # Return the result.
     return w, sig, corrcoef
 # ---------------------------------------------------
 
 
-def tran02_fitting(dRA, dDE, e_dRA, e_dDE, cor, RA, DE):
-    w, sig, cof = tran02(dRA, dDE, e_dRA, e_dDE, cor, RA, DE)
-# Iteration.
-    num1 = 1
-    num2 = 0
-    while(num1 != num2):
-        num1 = num2
-# Calculate the residual. ( O - C )
-        rRA, rDE = res_arr02(dRA, dDE, RA, DE, w)
-        indice = elimination(rRA, rDE)
-        num2 = dRA.size - indice.size
-        dRAn, dDEn, e_dRAn, e_dDEn = \
-            np.take(  dRA, indice), np.take(  dDE, indice),\
-            np.take(e_dRA, indice), np.take(e_dDE, indice)
-        corn = np.take(cor, indice)
-        RAn, DEn = np.take(RA, indice), np.take(DE, indice)
-        wn, sign, cofn = tran02(dRAn, dDEn, e_dRAn, e_dDEn, corn, RAn, DEn)
-        w = wn
-        # print('# Number of sample: %d  %d' % (dRA.size-num1, dRA.size-num2),\
-        #     file = flog)
-    ind_outl = np.setxor1d(np.arange(dRA.size), indice)
-    return wn, sign, cofn, ind_outl
+def tran02_fitting(dRA, dDE, e_dRA, e_dDE, cor, RA, DE, JacMat=None):
+    return tran_fitting(dRA, dDE, e_dRA, e_dDE, cor, RA, DE,
+                        Jac_mat_tran02, JacMat)
 #######################  Tran-02    ###################################
 # ---------------------------------------------------
 #######################  Tran-03    ###################################
@@ -474,54 +375,20 @@ def tran03(dRA, dDE, e_dRA, e_dDE, cor, RA, DE):
     ##     d_DE   = +r_x*sin(RA)         - r_y*cos(RA)
     # Jacobian matrix and its transpose.
     JacMat, JacMatT = Jac_mat_tran03(RA, DE)
-# Weighted matrix.
-    WgtMat = wgt_mat(e_dRA, e_dDE, cor)
-    # print(WgtMat)
 # Calculate matrix A and b of matrix equation:
-# A * w = b.
-    A = np.dot(np.dot(JacMatT, WgtMat), JacMat)
-    dPos = np.hstack((dRA, dDE))
-    b = np.dot(np.dot(JacMatT, WgtMat),  dPos)
+# A * w = b, with the 2x2 weight blocks of each source.
+    A, b = normal_eqn_calc(JacMat, dRA, dDE, e_dRA, e_dDE, cor)
 # Solve the equations.
 ##  w = (r_x, r_y, r_z)
-    w = np.linalg.solve(A, b)
-# Covariance.
-    cov = np.linalg.inv(A)
-    # print(cov)
-    sig = np.sqrt(cov.diagonal())
-# Correlation coefficient.
-    corrcoef = np.array([cov[i, j]/sig[i]/sig[j]
-                         for j in range(len(w)) for i in range(len(w))])
-    corrcoef.resize((len(w), len(w)))
+    w, sig, corrcoef = normal_eqn_solve(A, b)
 # Return the result.
     return w, sig, corrcoef
 # ---------------------------------------------------
 
 
-def tran03_fitting(dRA, dDE, e_dRA, e_dDE, cor, RA, DE):
-    w, sig, cof = tran03(dRA, dDE, e_dRA, e_dDE, cor, RA, DE)
-# Iteration.
-    num1 = 1
-    num2 = 0
-    while(num1 != num2):
-        num1 = num2
-# Calculate the residual. ( O - C )
-        rRA, rDE = res_arr03(dRA, dDE, RA, DE, w)
-        # print(rRA, rDE)
-        indice = elimination(rRA, rDE)
-        num2 = dRA.size - indice.size
-        dRAn, dDEn, e_dRAn, e_dDEn = \
-            np.take(  dRA, indice), np.take(  dDE, indice),\
-            np.take(e_dRA, indice), np.take(e_dDE, indice)
-        corn = np.take(cor, indice)
-        RAn, DEn = np.take(RA, indice), np.take(DE, indice)
-        wn, sign, cofn = tran03(dRAn, dDEn, e_dRAn, e_dDEn, corn, RAn, DEn)
-        w = wn
-        # print('# Number of sample: %d  %d' % (dRA.size-num1, dRA.size-num2),\
-        #     file = flog)
-        # print('# Number of sample: %d  %d' % (dRA.size-num1, indice.size))
-    ind_outl = np.setxor1d(np.arange(dRA.size), indice)
-    return wn, sign, cofn, ind_outl
+def tran03_fitting(dRA, dDE, e_dRA, e_dDE, cor, RA, DE, JacMat=None):
+    return tran_fitting(dRA, dDE, e_dRA, e_dDE, cor, RA, DE,
+                        Jac_mat_tran03, JacMat)
 #######################  Tran-02    ###################################
 # -------------------- MAIN ----------------------------------
 # sampleNum = 1000
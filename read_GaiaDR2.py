@@ -6,11 +6,23 @@ Created on Thu Apr 26 17:32:24 2018
 
 @author: Neo(liuniu@smail.nju.edu.cn)
 
+History
+N. Liu, 18 Oct 2026: add a row predicate (function 'gaiadr2_cut') and
+                     memmapped views to function 'read_gaiadr2_chunk';
+                     add function 'read_gaiadr2_cols' to read only some
+                     columns (and rows) of the file;
+N. Liu, 18 Oct 2026: the file is closed after reading (also when a chunk
+                     generator is not exhausted) and the columns are
+                     copied out of the memmapped file.
 """
 
 import numpy as np
 from astropy.io import fits
 
+__all__ = ["read_gaiadr2_fits", "gaiadr2_cut", "read_gaiadr2_chunk",
+           "read_gaiadr2_cols", "read_gaiadr2_iers_position",
+           "read_gaiadr2_ascii"]
+
 
 # -----------------------------  FUNCTIONS -----------------------------
 def read_gaiadr2_fits(datafile):
@@ -72,6 +84,130 @@ def read_gaiadr2_fits(datafile):
             frame_rotator_object_type, matched_observations]
 
 
+def gaiadr2_cut(obj_type=None, g_max=None, pm_err_max=None):
+    '''Build a row predicate for the selection of Gaia DR2 sources.
+
+    Parameters
+    ----------
+    obj_type : int
+        required value of 'frame_rotator_object_type', e.g., 3 for the
+        sources matched to the ICRF3 prototype, default None (no cut)
+    g_max : float
+        upper limit of 'phot_g_mean_mag', default None (no cut)
+    pm_err_max : float
+        upper limit of 'pmra_error' and 'pmdec_error' in mas/yr,
+        default None (no cut)
+
+    Returns
+    ----------
+    predicate : function
+        predicate(tbdat) returns a boolean array of the rows which pass
+        all the cuts, only the columns needed are read from tbdat
+    '''
+
+    def predicate(tbdat):
+        mask = np.ones(tbdat.size, dtype=bool)
+
+        if obj_type is not None:
+            mask &= tbdat.field("frame_rotator_object_type") == obj_type
+
+        if g_max is not None:
+            mask &= tbdat.field("phot_g_mean_mag") < g_max
+
+        if pm_err_max is not None:
+            mask &= (tbdat.field("pmra_error") < pm_err_max) & (
+                tbdat.field("pmdec_error") < pm_err_max)
+
+        return mask
+
+    return predicate
+
+
+def read_gaiadr2_chunk(datafile, fields, chunk_size=100000, predicate=None,
+                       copy=True):
+    '''Read Gaia DR2 data file chunk by chunk.
+
+    The file is opened with memmap, so only the rows of the current chunk
+    are loaded into memory and only the required columns (and those used
+    by the predicate) are touched.
+
+    Parameters
+    ----------
+    datafile : string
+        Gaia DR2 file with the full path. The format is FITS.
+    fields : list of string
+        names of the columns to read, e.g., ["ra", "dec", "pmra"]
+    chunk_size : int
+        number of rows of each chunk, default 100000
+    predicate : function
+        predicate(tbdat) returns a boolean array of the rows to keep for
+        the rows of tbdat, e.g., built by 'gaiadr2_cut'; default None to
+        keep all rows
+    copy : Boolean
+        True to copy the arrays into memory. If False and no predicate is
+        given, the arrays are views of the memmapped file, which are only
+        valid before the next chunk is read (or the generator is closed).
+
+    Returns
+    ----------
+    A generator, every item is a list of arrays of the required columns
+    for the (selected) rows in the current chunk.
+    '''
+
+    # The file is also closed if the generator is closed before the end.
+    with fits.open(datafile, memmap=True) as hdulist:
+        tbdat = hdulist[1].data
+
+        for beg in range(0, tbdat.size, chunk_size):
+            end = min(beg + chunk_size, tbdat.size)
+            chunk = tbdat[beg:end]
+
+            if predicate is not None:
+                mask = predicate(chunk)
+                # Fancy indexing gives a copy of the selected rows
+                yield [chunk.field(field)[mask] for field in fields]
+            elif copy:
+                yield [np.array(chunk.field(field)) for field in fields]
+            else:
+                yield [chunk.field(field) for field in fields]
+
+
+def read_gaiadr2_cols(datafile, fields, predicate=None, chunk_size=1000000):
+    '''Read some columns of Gaia DR2 data file.
+
+    Parameters
+    ----------
+    datafile : string
+        Gaia DR2 file with the full path. The format is FITS.
+    fields : list of string
+        names of the columns to read, e.g., ["ra", "dec", "pmra"]
+    predicate : function
+        see function 'read_gaiadr2_chunk', default None to keep all rows
+    chunk_size : int
+        number of rows to evaluate the predicate at a time, default 1000000
+
+    Returns
+    ----------
+    list of arrays of the required columns. Only these columns (and the
+    selected rows if predicate is given) are copied into memory, and the
+    file is closed.
+    '''
+
+    if predicate is None:
+        with fits.open(datafile, memmap=True) as hdulist:
+            tbdat = hdulist[1].data
+
+            return [np.array(tbdat.field(field)) for field in fields]
+
+    chunks = list(read_gaiadr2_chunk(datafile, fields, chunk_size, predicate))
+
+    if not chunks:
+        print("ERROR: no data in %s!" % datafile)
+        exit()
+
+    return [np.concatenate(cols) for cols in zip(*chunks)]
+
+
 def read_gaiadr2_iers_position(datafile):
     '''Read Gaia DR2 data file.
 
@@ -85,17 +221,18 @@ def read_gaiadr2_iers_position(datafile):
 
     '''
 
-    hdulist = fits.open(datafile, memmap=True)
-    tbdat = hdulist[1].data
+    # The columns are copied, so the file can be closed.
+    with fits.open(datafile, memmap=True) as hdulist:
+        tbdat = hdulist[1].data
 
-    # source_id = tbdat.field("source_id")
-    # ref_epoch = tbdat.field("ref_epoch")
-    iers_name = tbdat.field("iers_name")
-    ra = tbdat.field("ra")
-    ra_error = tbdat.field("ra_error")
-    dec = tbdat.field("dec")
-    dec_error = tbdat.field("dec_error")
-    ra_dec_corr = tbdat.field("ra_dec_corr")
+        # source_id = tbdat.field("source_id")
+        # ref_epoch = tbdat.field("ref_epoch")
+        iers_name = np.array(tbdat.field("iers_name"))
+        ra = np.array(tbdat.field("ra"))
+        ra_error = np.array(tbdat.field("ra_error"))
+        dec = np.array(tbdat.field("dec"))
+        dec_error = np.array(tbdat.field("dec_error"))
+        ra_dec_corr = np.array(tbdat.field("ra_dec_corr"))
 
     # Test
     # print(source_id)
@@ -261,6 +398,29 @@ def test_code():
      [-0.33383656 -0.19061228  1.        ]]
     '''
 
+    # Same fit with the data read chunk by chunk
+    from vsh_deg1_cor import VSH_deg01_chunk
+
+    def pm_chunks():
+        for ra, dec, pmra, pmdec, pmra_error, pmdec_error, pmra_pmdec_corr \
+            in read_gaiadr2_chunk(
+                "/Users/Neo/Astronomy/Data/catalogs/Gaia_DR2/"
+                "gaiadr2_qso_all.fits",
+                ["ra", "dec", "pmra", "pmdec", "pmra_error", "pmdec_error",
+                 "pmra_pmdec_corr"]):
+            yield (pmra, pmdec, pmra_error, pmdec_error,
+                   pmra_pmdec_corr * pmra_error * pmdec_error,
+                   np.deg2rad(ra), np.deg2rad(dec))
+
+    print('VSH deg01 (chunk by chunk):')
+    w, sig, corrcoef, num = VSH_deg01_chunk(pm_chunks())
+    print("Estimations: ")
+    print("Dipole:   ", w[:3])
+    print("          ", sig[:3])
+    print("Rotation: ", w[3:])
+    print("          ", sig[3:])
+    # Should be the same as the first one.
+
     flog.close()
     print("Done!")
 
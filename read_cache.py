@@ -0,0 +1,348 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+# File name: read_cache.py
+"""
+Created on Sun Oct 18 21:36:15 2026
+
+@author: Neo(liuniu@smail.nju.edu.cn)
+
+A binary cache of the data parsed from the ASCII outputs of getpar,
+i.e., .sou/.eob/.eops/.crl/.lso/.lst files.
+
+The arrays returned by a reader are saved into a .npz file in the
+sub-directory '.npcache' next to the data file. The cache is keyed by
+the absolute path, modification time and size of the data file, as well
+as the name and arguments of the reader. A later call with the same key
+only loads the arrays, without parsing the text. Any change of the data
+file makes the cache out of date, so it is parsed and saved again.
+
+The total size of the caches in one directory is bounded by CACHE_SIZE.
+The least recently used ones are removed first.
+
+The cache is off by default, since it writes files into the data
+directories; set CACHE_ON to True to use it. The type of the result
+(an array or a list/tuple of arrays, masked arrays, lists and scalars) is
+kept, so a hit returns the same as the reader. Results that can not be
+saved without pickle, e.g., arrays of objects, are never cached.
+
+"""
+
+import os
+import hashlib
+from functools import wraps
+import numpy as np
+
+__all__ = ["cached_read", "cache_file_name", "cache_key", "cache_save",
+           "cache_load", "cache_evict", "cache_clear", "cache_supported"]
+
+
+# Set it to True to use the cache, otherwise the ASCII files are always
+# parsed
+CACHE_ON = False
+
+# Sub-directory, next to the data file, to keep the caches
+CACHE_DIR = ".npcache"
+
+# Maximum size of the caches in one directory, in bytes
+CACHE_SIZE = 2 * 1024**3
+
+# It should be increased if the format of the cache changes
+CACHE_VERSION = 2
+
+
+# -----------------------------  FUNCTIONS -----------------------------
+def cache_file_name(datafile, reader_name, args=()):
+    '''Name of the cache file of a data file.
+
+    Parameters
+    ----------
+    datafile : string
+        name of data file
+    reader_name : string
+        name of the reader
+    args : tuple
+        other arguments of the reader
+
+    Returns
+    ----------
+    cachefile : string
+        name of the cache file with full path
+    '''
+
+    datadir, basename = os.path.split(os.path.abspath(datafile))
+    arghash = hashlib.sha1(repr(args).encode()).hexdigest()[:8]
+
+    return os.path.join(datadir, CACHE_DIR, "%s.%s.%s.npz" %
+                        (basename, reader_name, arghash))
+
+
+def cache_key(datafile, reader_name, args=()):
+    '''Key of the cache, which changes with the data file.
+
+    Parameters
+    ----------
+    datafile, reader_name, args :
+        see function 'cache_file_name'
+
+    Returns
+    ----------
+    key : array of string
+        absolute path, modification time and size of the data file,
+        name and arguments of the reader, and the version of the cache
+    '''
+
+    stat = os.stat(datafile)
+
+    return np.array([os.path.abspath(datafile), str(stat.st_mtime_ns),
+                     str(stat.st_size), reader_name, repr(args),
+                     str(CACHE_VERSION)])
+
+
+def _elem_split(elem):
+    '''Split an element of the result into an array and its type.
+    '''
+
+    if np.ma.isMaskedArray(elem):
+        return np.ma.getdata(elem), "masked"
+    elif isinstance(elem, np.ndarray):
+        return elem, "ndarray"
+    elif isinstance(elem, (list, tuple)):
+        return np.asarray(elem), type(elem).__name__
+    else:
+        return np.asarray(elem), "scalar"
+
+
+def _elem_join(arr, elemtype, mask=None):
+    '''Rebuild an element of the result from an array and its type.
+    '''
+
+    if elemtype == "masked":
+        return np.ma.array(arr, mask=mask)
+    elif elemtype == "list":
+        return arr.tolist()
+    elif elemtype == "tuple":
+        return tuple(arr.tolist())
+    elif elemtype == "scalar":
+        return arr.item()
+    else:
+        return arr
+
+
+def cache_supported(data):
+    '''Check if the result of a reader can be cached.
+
+    Parameters
+    ----------
+    data : array, list/tuple of arrays, or other
+        result of the reader
+
+    Returns
+    ----------
+    flag : boolean
+        True if all the elements can be saved into a .npz file and loaded
+        without pickle
+    '''
+
+    if isinstance(data, (list, tuple)):
+        elems = data
+    elif isinstance(data, np.ndarray):
+        elems = [data]
+    else:
+        return False
+
+    for elem in elems:
+        try:
+            arr, _ = _elem_split(elem)
+        except ValueError:
+            # e.g., ragged lists
+            return False
+
+        if arr.dtype.hasobject:
+            return False
+
+    return True
+
+
+def cache_save(cachefile, key, data):
+    '''Save the result of a reader into the cache file.
+
+    Parameters
+    ----------
+    cachefile : string
+        name of the cache file
+    key : array of string
+        see function 'cache_key'
+    data : array or list/tuple of arrays
+        result of the reader, which should pass 'cache_supported'; the
+        mask of masked arrays and the type of every element are also
+        saved
+    '''
+
+    if isinstance(data, (list, tuple)):
+        kind, elems = type(data).__name__, data
+    else:
+        kind, elems = "array", [data]
+
+    arrdict = {"key": key, "kind": np.array(kind)}
+
+    for i, elem in enumerate(elems):
+        arr, elemtype = _elem_split(elem)
+        arrdict["arr_%d" % i] = arr
+        arrdict["type_%d" % i] = np.array(elemtype)
+        if elemtype == "masked":
+            arrdict["mask_%d" % i] = np.ma.getmaskarray(elem)
+
+    os.makedirs(os.path.dirname(cachefile), exist_ok=True)
+
+    # Write into a temporary file first, so that a broken cache is never
+    # seen by other processes.
+    tmpfile = "%s.%d.tmp" % (cachefile, os.getpid())
+    with open(tmpfile, "wb") as fcache:
+        np.savez(fcache, **arrdict)
+    os.replace(tmpfile, cachefile)
+
+
+def cache_load(cachefile, key):
+    '''Load the result of a reader from the cache file.
+
+    Parameters
+    ----------
+    cachefile : string
+        name of the cache file
+    key : array of string
+        see function 'cache_key'
+
+    Returns
+    ----------
+    data : array or list/tuple of arrays
+        result of the reader, None if the cache is missing or out of date
+    '''
+
+    if not os.path.exists(cachefile):
+        return None
+
+    with np.load(cachefile, allow_pickle=False) as fcache:
+        if not np.array_equal(fcache["key"], key):
+            return None
+
+        elems = []
+        for i in range(len(fcache.files)):
+            if "arr_%d" % i not in fcache.files:
+                break
+
+            mask = None
+            if "mask_%d" % i in fcache.files:
+                mask = fcache["mask_%d" % i]
+            elems.append(_elem_join(fcache["arr_%d" % i],
+                                    str(fcache["type_%d" % i]), mask))
+
+        kind = str(fcache["kind"])
+
+    # Mark it as recently used
+    os.utime(cachefile)
+
+    if kind == "list":
+        return elems
+    elif kind == "tuple":
+        return tuple(elems)
+    else:
+        return elems[0]
+
+
+def cache_evict(cachedir, max_size=None):
+    '''Remove the least recently used caches beyond the size limit.
+
+    Parameters
+    ----------
+    cachedir : string
+        directory of the caches
+    max_size : int
+        maximum size of the caches in bytes, default is CACHE_SIZE
+    '''
+
+    if max_size is None:
+        max_size = CACHE_SIZE
+
+    if not os.path.isdir(cachedir):
+        return
+
+    caches = [os.path.join(cachedir, fname) for fname in os.listdir(cachedir)
+              if fname.endswith(".npz")]
+    caches = [(os.stat(fname).st_mtime, os.stat(fname).st_size, fname)
+              for fname in caches]
+
+    # The most recently used first
+    caches.sort(reverse=True)
+
+    tot_size = 0
+    for _, size, fname in caches:
+        tot_size += size
+        if tot_size > max_size:
+            os.remove(fname)
+
+
+def cache_clear(datadir):
+    '''Remove all caches of data files in a directory.
+
+    Parameters
+    ----------
+    datadir : string
+        directory of the data files
+    '''
+
+    cache_evict(os.path.join(datadir, CACHE_DIR), max_size=0)
+
+
+def cached_read(reader):
+    '''Wrap a reader so that its result is cached.
+
+    The reader should be called as reader(datafile, *args, **kwargs) and
+    return an array or a list/tuple of arrays (or lists and scalars). The
+    cache is only used if CACHE_ON is True.
+
+    Parameters
+    ----------
+    reader : function
+        function to parse a data file
+
+    Returns
+    ----------
+    wrapper : function
+        the reader with the cache
+    '''
+
+    @wraps(reader)
+    def wrapper(datafile, *args, **kwargs):
+
+        if not CACHE_ON:
+            return reader(datafile, *args, **kwargs)
+
+        args_all = (args, sorted(kwargs.items()))
+        cachefile = cache_file_name(datafile, reader.__name__, args_all)
+        key = cache_key(datafile, reader.__name__, args_all)
+
+        try:
+            data = cache_load(cachefile, key)
+        except (OSError, ValueError, KeyError):
+            data = None
+
+        if data is not None:
+            return data
+
+        data = reader(datafile, *args, **kwargs)
+
+        # e.g., arrays of objects, which can not be loaded without pickle
+        if not cache_supported(data):
+            return data
+
+        # Data in a read-only directory are just not cached.
+        try:
+            cache_save(cachefile, key, data)
+            cache_evict(os.path.dirname(cachefile))
+        except OSError:
+            pass
+
+        return data
+
+    return wrapper
+# --------------------------------- END --------------------------------
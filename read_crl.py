@@ -55,12 +55,18 @@ Nutation in obliquity
    211-216 F6.4   d/l       correlation between Nutation Eps and UT1 rate
    218-223 F6.4   d/l       correlation between Nutation Eps and Nutation Psi
 
+History
+N. Liu, 18 Oct 2026: the result of 'read_crl' is cached (see 'read_cache');
+                     return 'corXXR' which was wrongly named 'corXX'.
+
 """
 
 import numpy as np
+from read_cache import cached_read
 
 
 # ------------------------------  FUNCTIONS  ---------------------------
+@cached_read
 def read_crl(datafile):
     '''Retrieve the result from .crl file.
 
@@ -142,7 +148,7 @@ def read_crl(datafile):
         filling_values=0.)
 
     return [dbname,
-            corXX,
+            corXXR,
             corXY, corXRY,
             corXYR, corXRYR, corYYR,
             corXU, corXRU, corYU, corYRU,
@@ -13,6 +13,18 @@ Dec 8, N. Liu : modify the bugs in Sect. 3.10 of the help document of getpar_02
 
 11 Jan 2018, N. Liu : set the zero-formal-uncertainty to 0.999999
 
+18 Oct 2026, N. Liu : add new functions 'read_eob_rec' and 'read_eops_rec'
+                      which read the file only once into a structured
+                      array, '$$$$$$' fillers being masked;
+                      'read_eob' and 'read_eops' are now wrappers of them;
+                      fix the zero-error check of YR_err in 'read_eob';
+                      results of 'read_eob_rec' and 'read_eops_rec' are
+                      cached (see 'read_cache')
+
+18 Oct 2026, N. Liu : 'read_eops_rec' also masks the '$$$$$$' fillers,
+                      which were read as NaN, and returns a masked
+                      structured array as 'read_eob_rec'
+
 
 Retrieve the estimates of X pole coordinate, Y pole coordinate, UT1-TAI
 angle, UT1 rate, daily offsets of nutation angles as well as their formal
@@ -91,9 +103,63 @@ takes entire field.
 
 import numpy as np
 import matplotlib.pyplot as plt
-
-
-__all__ = {"zero_err", "read_eob"}
+from read_sou import fixed_col_read, fixed_col_field
+from read_cache import cached_read
+
+
+__all__ = ["zero_err", "read_eob_rec", "read_eob", "read_eops_rec",
+           "read_eops"]
+
+
+# Fields of .eob file: name, first and last columns, type, unit factor
+# (as -> mas or sec -> msec) and value of the filler
+eob_fields = [
+    ("tag_eop", 3, 14, float, 1, 0.),
+    ("dbname", 16, 25, "U10", None, ""),
+    ("sescode", 27, 32, "U6", None, ""),
+    ("X", 34, 41, float, 1000., 0.),
+    ("Y", 43, 50, float, 1000., 0.),
+    ("U", 52, 62, float, 1000., 0.),
+    ("P", 64, 71, float, 1, 0.),
+    ("E", 73, 80, float, 1, 0.),
+    ("XR", 82, 90, float, 1000., 0.),
+    ("YR", 92, 100, float, 1000., 0.),
+    ("UR", 102, 108, float, 1, 0.),
+    ("X_err", 110, 117, float, 1000., 1.0e6),
+    ("Y_err", 119, 126, float, 1000., 1.0e6),
+    ("U_err", 128, 136, float, 1000., 1.0e6),
+    ("P_err", 138, 144, float, 1, 1.0e6),
+    ("E_err", 146, 152, float, 1, 1.0e6),
+    ("XR_err", 154, 162, float, 1000., 1.0e6),
+    ("YR_err", 164, 172, float, 1000., 1.0e6),
+    ("UR_err", 174, 180, float, 1000., 1.0e6),
+    ("corXY", 182, 187, float, 1, 0.),
+    ("corXU", 189, 194, float, 1, 0.),
+    ("corYU", 196, 201, float, 1, 0.),
+    ("corPE", 203, 208, float, 1, 0.),
+    ("corUUR", 210, 215, float, 1, 0.),
+    ("corXUR", 217, 222, float, 1, 0.),
+    ("corYUR", 224, 229, float, 1, 0.),
+    ("sess_len", 231, 235, float, 1, 0.),
+    ("rms", 237, 243, float, 1, 0.),
+    ("obsnum", 245, 250, int, 1, 0),
+    ("tag_nut", 252, 263, float, 1, 0.)]
+
+# Fields of .eops file: name, column (counting from 0), type and value of
+# the filler
+eops_fields = [
+    ("mjd", 0, float, 0.), ("xp", 1, float, 0.), ("yp", 2, float, 0.),
+    ("ut", 3, float, 0.), ("dx", 4, float, 0.), ("dy", 5, float, 0.),
+    ("xp_err", 6, float, 1.0e6), ("yp_err", 7, float, 1.0e6),
+    ("ut_err", 8, float, 1.0e6), ("dx_err", 9, float, 1.0e6),
+    ("dy_err", 10, float, 1.0e6),
+    ("db_name", 11, "U10", None),
+    ("xp_yp_corr", 12, float, 0.), ("xp_ut_corr", 13, float, 0.),
+    ("yp_ut_corr", 14, float, 0.), ("dx_dy_corr", 15, float, 0.),
+    ("obs_num", 16, int, 0), ("sess_len", 18, float, 0.),
+    ("xpr", 19, float, 0.), ("ypr", 20, float, 0.), ("utr", 21, float, 0.),
+    ("xpr_err", 24, float, 1.0e6), ("ypr_err", 25, float, 1.0e6),
+    ("utr_err", 26, float, 1.0e6), ("rms", 29, float, 0.)]
 
 
 # ------------------------------  FUNCTIONS  ---------------------------
@@ -104,6 +170,58 @@ def zero_err(err):
     return np.where(err == 0, 0.999999, err)
 
 
+@cached_read
+def read_eob_rec(datafile):
+    '''Retrieve the result from .eob file into a structured array.
+
+    The file is read only once and the fields are taken from the fixed
+    columns listed above.
+
+    Parameters
+    ----------
+    datafile : string
+        name of data file
+
+    Returns
+    ----------
+    eob : masked structured array
+        fields are given in 'eob_fields', in the units of function
+        'read_eob'; the filler '$$$$$$' (or '****') is masked and
+        its value is set to 0 (1.0e6 for formal uncertainties before
+        the unit conversion)
+    '''
+
+    block = fixed_col_read(datafile, 263)
+
+    # Only lines beginning with a MJD are estimates
+    tag = block[:, 2:14]
+    est = (((tag >= ord('0')) & (tag <= ord('9'))) |
+           (tag == ord('.')) | (tag == ord(' '))).all(axis=1)
+    est &= ((tag >= ord('0')) & (tag <= ord('9'))).any(axis=1)
+    block = block[est]
+
+    dtype = [(name, typ) for name, _, _, typ, _, _ in eob_fields]
+    eob = np.ma.zeros(block.shape[0], dtype=dtype)
+
+    for name, beg, end, typ, fac, filler in eob_fields:
+        if fac is None:
+            eob[name] = np.char.strip(
+                fixed_col_field(block, beg, end).astype(str))
+            continue
+
+        field, mask = fixed_col_field(block, beg, end, typ, filler,
+                                      return_mask=True)
+
+        # Avoid zero-error, 0.0 -> 0.999999
+        if name.endswith("_err"):
+            field = zero_err(field)
+
+        eob[name] = field * fac
+        eob[name][mask] = np.ma.masked
+
+    return eob
+
+
 def read_eob(datafile):
     '''Retrieve the result from .eob file.
 
@@ -170,56 +288,73 @@ def read_eob(datafile):
         correlation between U and UR
     '''
 
-    dbname = np.genfromtxt(datafile, dtype=str, usecols=(1,))
+    eob = read_eob_rec(datafile).data
 
-    tag_eop, tag_nut = np.genfromtxt(datafile, usecols=(0, 28), unpack=True)
+    [dbname, obsnum, tag_eop, tag_nut] = [
+        eob[name] for name in ["dbname", "obsnum", "tag_eop", "tag_nut"]]
+    [X, Y, U, P, E, XR, YR, UR] = [
+        eob[name] for name in ["X", "Y", "U", "P", "E", "XR", "YR", "UR"]]
+    [X_err, Y_err, U_err, P_err, E_err, XR_err, YR_err, UR_err] = [
+        eob[name] for name in ["X_err", "Y_err", "U_err", "P_err", "E_err",
+                               "XR_err", "YR_err", "UR_err"]]
+    [corXY, corXU, corYU, corPE, corUUR, corXUR, corYUR] = [
+        eob[name] for name in ["corXY", "corXU", "corYU", "corPE",
+                               "corUUR", "corXUR", "corYUR"]]
 
-    obsnum = np.genfromtxt(datafile, dtype=int, usecols=(27,))
+    return [dbname, obsnum, tag_eop, X, X_err, Y, Y_err, U, U_err,
+            XR, XR_err, YR, YR_err, UR, UR_err,
+            corXY, corXU, corYU, corXUR, corYUR, corUUR,
+            tag_nut, P, P_err, E, E_err, corPE]
 
-    X, Y, U, P, E, XR, YR, UR = np.genfromtxt(datafile,
-                                              usecols=np.arange(2, 10),
-                                              missing_values='*'*7,
-                                              filling_values=0.0,
-                                              unpack=True)
 
-    [X_err, Y_err, U_err,
-     P_err, E_err,
-     XR_err, YR_err, UR_err] = np.genfromtxt(datafile,
-                                             usecols=np.arange(10, 18),
-                                             missing_values='*'*7,
-                                             filling_values=1.0e6,
-                                             unpack=True)
+@cached_read
+def read_eops_rec(eops_file):
+    """Read data from .eops file into a structured array.
 
-    # Avoid zero-error, 0.0 -> 0.999999
-    X_err = zero_err(X_err)
-    Y_err = zero_err(Y_err)
-    U_err = zero_err(U_err)
-    P_err = zero_err(P_err)
-    E_err = zero_err(E_err)
-    XR_err = zero_err(XR_err)
-    YR_err = zero_err(XR_err)
-    UR_err = zero_err(UR_err)
+    The file is read only once. The fields are separated by blanks and
+    a filler '$$$$$$' (or '****') takes an entire field, so the fields are
+    taken from the columns listed above.
 
-    [corXY, corXU, corYU, corPE, corUUR, corXUR, corYUR
-     ] = np.genfromtxt(datafile, usecols=np.arange(18, 25), unpack=True)
+    Parameters
+    ----------
+    datafile : string
+        name of data file
 
-    # as -> mas or sec -> msec
-    X, Y, U = X * 1000.0, Y * 1000.0, U * 1000.0
-    X_err, Y_err, U_err = X_err * 1000.0, Y_err * 1000.0, U_err * 1000.0
+    Returns
+    ----------
+    eops : masked structured array
+        fields are given in 'eops_fields', which are those returned by
+        function 'read_eops'; the filler '$$$$$$' (or '****') is masked
+        and its value is set to 0 (1.0e6 for formal uncertainties)
+    """
 
-    # as/day -> mas/day or sec/day -> msec/day
-    XR, YR = XR * 1000, YR * 1000
-    XR_err, YR_err, UR_err = XR_err * 1000, YR_err * 1000, UR_err * 1000
+    ncol = max(col for _, col, _, _ in eops_fields) + 1
+    block = np.loadtxt(eops_file, dtype=str, comments="#",
+                       usecols=range(ncol), ndmin=2)
 
-    return [dbname, obsnum, tag_eop, X, X_err, Y, Y_err, U, U_err,
-            XR, XR_err, YR, YR_err, UR, UR_err,
-            corXY, corXU, corYU, corXUR, corYUR, corUUR,
-            tag_nut, P, P_err, E, E_err, corPE]
+    dtype = [(name, typ) for name, _, typ, _ in eops_fields]
+    eops = np.ma.zeros(block.shape[0], dtype=dtype)
+
+    for name, col, typ, filler in eops_fields:
+        if filler is None:
+            eops[name] = block[:, col]
+            continue
+
+        mask = ((np.char.find(block[:, col], "$") >= 0) |
+                (np.char.find(block[:, col], "*") >= 0))
+
+        eops[name] = np.where(mask, str(filler), block[:, col]).astype(typ)
+        eops[name][mask] = np.ma.masked
+
+    return eops
 
 
 def read_eops(eops_file):
     """Read data from .eops file.
 
+    The filler '$$$$$$' is replaced by 0 (1.0e6 for formal uncertainties),
+    see function 'read_eops_rec' for the mask.
+
     Parameters
     ----------
     datafile : string
@@ -279,29 +414,19 @@ def read_eops(eops_file):
         correlation between dx and dy
     """
 
-    db_name = np.genfromtxt(eops_file, usecols=(11,), dtype=str)
-
-    mjd, sess_len, rms = np.genfromtxt(
-        eops_file, usecols=(0, 18, 29), unpack=True)
-
-    obs_num = np.genfromtxt(
-        eops_file, usecols=(16,), dtype=int, unpack=True)
-
-    # Earth orientation parameters
-    xp, yp, ut, dx, dy = np.genfromtxt(
-        eops_file, usecols=range(1, 6), unpack=True)
-    xp_err, yp_err, ut_err, dx_err, dy_err = np.genfromtxt(
-        eops_file, usecols=range(6, 11), unpack=True)
-
-    # Correlation
-    xp_yp_corr, xp_ut_corr, yp_ut_corr, dx_dy_corr = np.genfromtxt(
-        eops_file, usecols=range(12, 16), unpack=True)
-
-    # EOP rate
-    xpr, ypr, utr = np.genfromtxt(
-        eops_file, usecols=range(19, 22), unpack=True)
-    xpr_err, ypr_err, utr_err = np.genfromtxt(
-        eops_file, usecols=range(24, 27), unpack=True)
+    eops = read_eops_rec(eops_file).data
+
+    [db_name, mjd, obs_num, sess_len, rms,
+     xp, yp, ut, dx, dy,
+     xp_err, yp_err, ut_err, dx_err, dy_err,
+     xp_yp_corr, xp_ut_corr, yp_ut_corr, dx_dy_corr,
+     xpr, ypr, utr, xpr_err, ypr_err, utr_err] = [
+        eops[name] for name in [
+            "db_name", "mjd", "obs_num", "sess_len", "rms",
+            "xp", "yp", "ut", "dx", "dy",
+            "xp_err", "yp_err", "ut_err", "dx_err", "dy_err",
+            "xp_yp_corr", "xp_ut_corr", "yp_ut_corr", "dx_dy_corr",
+            "xpr", "ypr", "utr", "xpr_err", "ypr_err", "utr_err"]]
 
     return [db_name, mjd, obs_num, sess_len, rms,
             xp, yp, ut, dx, dy,
@@ -45,61 +45,69 @@ order of sessions and in order of appearance of local sources in the session.
    151-154 I4     --     Number of used observations of this source
    158-161 I4     --     Total number of observations of this source
 
+History
+N. Liu, 18 Oct 2026: parse the file in a new function 'read_lso_dat' whose
+                     result is cached (see 'read_cache');
+N. Liu, 18 Oct 2026: convert RA/Dec. strings with 'RA_conv_arr' and
+                     'DC_conv_arr' instead of per-value converters;
+N. Liu, 18 Oct 2026: split the data of all sources in one pass with
+                     'get_pv.group_by';
+N. Liu, 18 Oct 2026: add a parameter 'nproc' to function 'read_lso' to
+                     write and plot the sources with a process pool, whose
+                     workers use the backend Agg.
+
 """
 
 import numpy as np
 import sys
-from pos_conv import RA_conv, DC_conv
-from get_pv import get_dat, get_sou_pv
+from multiprocessing import Pool
+from pos_conv import RA_conv_arr, DC_conv_arr
+from get_pv import group_by
 from write_pv import write_sou_pv
-from plot_data import plot_sou_pv
+from plot_data import plot_sou_pv, plot_worker_init
+from read_cache import cached_read
+
+
+# Number of sources sent to a worker at a time
+POOL_CHUNK = 8
 
 
 # ------------------------------  FUNCTIONS  ---------------------------
-def wp_sou_pos(souname, soulist, epo, dbname,
-               RA, DC, RA_err, DC_err, cor):
+def wp_sou_pos(souname, eposou, RAsou, DCsou, RAsou_err, DCsou_err, corsou):
     '''write and plot the positions/proper-motions of each sources.
 
     Parameters
     ----------
-    datafile : string
-        name of data file
-    souname : array, string
+    souname : string
         IVS source name
-    soulist : array, string
-        list of all source names in all sessions
-    epo : array, float
-        time lag, year
-    dbname : array, string
-        database name with leading dollar sign
-    RA : array, float
+    eposou : array, float
+        time lag of this source, year
+    RAsou : array, float
         Right ascension, degree
-    RA_err : array, float
-        formal uncertainty of RA, mas
-    DC : array, float
+    DCsou : array, float
         Declination, degree
-    DC_err : array, float
+    RAsou_err : array, float
+        formal uncertainty of RA, mas
+    DCsou_err : array, float
         formal uncertainty of DC, mas
-    Cor : array, float
+    corsou : array, float
         correlation between RA and DC
 
     Returns
     ----------
       None.
     '''
-    eposou = get_dat(souname, soulist, epo)
 
     # For geocentric position
-    [RAsou, DCsou, RAsou_err, DCsou_err, corsou] = get_sou_pv(
-        souname, soulist, RA, DC, RA_err, DC_err, cor)
     write_sou_pv(souname, eposou,
                  RAsou, DCsou, RAsou_err, DCsou_err, corsou, 'P')
     plot_sou_pv(souname, eposou,
                 RAsou, DCsou, RAsou_err, DCsou_err, 'P')
 
 
-def read_lso(datafile):
-    '''Retrieve the result from .lso file.
+@cached_read
+def read_lso_dat(datafile):
+    '''Retrieve the data from .lso file.
 
     Parameters
     ----------
@@ -108,15 +116,30 @@ def read_lso(datafile):
 
     Returns
     ----------
-    None
+    soulist : array, string
+        list of all source names in all sessions
+    dbname : array, string
+        database name with leading dollar sign
+    epo : array, float
+        time lag, year
+    RA/DC : array, float
+        Right ascension/Declination, arc-sec
+    RA_err/DC_err : array, float
+        formal uncertainty of RA/DC, mas
+    cor : array, float
+        correlation between RA and DC
+    NOUsed/NOTotal : array, int
+        number of used/total observations of this source
     '''
 
     soulist, dbname = np.genfromtxt(datafile,
                                     dtype=str, usecols=(1, 2), unpack=True)
     epo = np.genfromtxt(datafile, usecols=(5,))
-    RA, RA_err, DC, DC_err, cor = np.genfromtxt(
-        datafile, usecols=np.arange(7, 16, 2),
-        converters={7: RA_conv, 11: DC_conv},
+    RAstr, DCstr = np.genfromtxt(datafile,
+                                 dtype=str, usecols=(7, 11), unpack=True)
+    RA, DC = RA_conv_arr(RAstr), DC_conv_arr(DCstr)
+    RA_err, DC_err, cor = np.genfromtxt(
+        datafile, usecols=(9, 13, 15),
         missing_values='*'*8,
         filling_values=0.,
         unpack=True)
@@ -124,10 +147,41 @@ def read_lso(datafile):
     NOUsed, NOTotal = np.genfromtxt(
         datafile, usecols=(17, 19), dtype=int, unpack=True)
 
-    souset = set(soulist)
-    for souname in souset:
-        wp_sou_pos(souname, soulist, epo, dbname,
-                   RA, DC, RA_err, DC_err, cor)
+    return [soulist, dbname, epo, RA, RA_err, DC, DC_err, cor,
+            NOUsed, NOTotal]
+
+
+def read_lso(datafile, nproc=1):
+    '''Retrieve the result from .lso file.
+
+    Parameters
+    ----------
+    datafile: string
+        name of data file
+    nproc : int
+        number of processes to write and plot the time series of every
+        source, None for the number of CPUs, default 1 (no pool)
+
+    Returns
+    ----------
+    None
+    '''
+
+    [soulist, dbname, epo, RA, RA_err, DC, DC_err, cor,
+     NOUsed, NOTotal] = read_lso_dat(datafile)
+
+    groups = group_by(soulist, epo,
+                      RA, DC, RA_err, DC_err, cor)
+
+    if nproc == 1:
+        for souname, soudat in groups:
+            wp_sou_pos(souname, *soudat)
+    else:
+        # Every source is written and plotted by a worker
+        with Pool(nproc, initializer=plot_worker_init) as pool:
+            pool.starmap(wp_sou_pos,
+                         ((souname, *soudat) for souname, soudat in groups),
+                         chunksize=POOL_CHUNK)
 
 
 # Retrieve estimates.
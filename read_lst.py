@@ -56,28 +56,43 @@ File contains lines of three types:
    130-144 F15.2  mm    value of N-component of station position.
    149-158 F10.3  mm    formal uncertainty of N-component of station position.
 
+History
+N. Liu, 18 Oct 2026: parse the file in a new function 'read_lst_dat' whose
+                     result is cached (see 'read_cache');
+N. Liu, 18 Oct 2026: split the data of all stations in one pass with
+                     'get_pv.group_by';
+N. Liu, 18 Oct 2026: add a parameter 'nproc' to function 'read_lst' to
+                     write and plot the stations with a process pool, whose
+                     workers use the backend Agg; the number of processes
+                     is the 2nd optional argument.
 
 """
 
 import numpy as np
 import sys
-from get_pv import get_dat, get_sta_pv
+from multiprocessing import Pool
+from get_pv import group_by
 from write_pv import write_sta_pv
-from plot_data import plot_sta_pv
+from plot_data import plot_sta_pv, plot_worker_init
+from read_cache import cached_read
+
+
+# Number of stations sent to a worker at a time
+POOL_CHUNK = 8
+
 
 # ------------------------------  FUNCTIONS  ---------------------------
 
 
-def wp_sta_pos(staname, stalist, epo, X, Y, Z, X_err, Y_err, Z_err,
-               U, E, N, U_err, E_err, N_err):
+def wp_sta_pos(staname, eposta, Xsta, Ysta, Zsta,
+               Xsta_err, Ysta_err, Zsta_err,
+               Usta, Esta, Nsta, U_errsta, E_errsta, N_errsta):
     '''Write and plot geocentric and topocentric positions for each station.
+
+    The data are those of this station only, see 'get_pv.group_by'.
     '''
-    eposta = get_dat(staname, stalist, epo)
 
     # For geocentric position
-    [Xsta, Ysta, Zsta,
-     Xsta_err, Ysta_err, Zsta_err] = get_sta_pv(
-        staname, stalist, X, Y, Z, X_err, Y_err, Z_err)
     write_sta_pv(staname, "XYZ", eposta,
                  Xsta, Ysta, Zsta,
                  Xsta_err, Ysta_err, Zsta_err)
@@ -86,9 +101,6 @@ def wp_sta_pos(staname, stalist, epo, X, Y, Z, X_err, Y_err, Z_err,
                 Xsta_err, Ysta_err, Zsta_err, 'p')
 
     # For topocentric position
-    [Usta, Esta, Nsta,
-     U_errsta, E_errsta, N_errsta] = get_sta_pv(
-        staname, stalist, U, E, N, U_err, E_err, N_err)
     write_sta_pv(staname, "UEN", eposta,
                  Usta, Esta, Nsta,
                  U_errsta, E_errsta, N_errsta)
@@ -103,8 +115,9 @@ def strl2flta(X):
     return np.array(X).astype(float)
 
 
-def read_lst(datafile):
-    '''Retrieve the result from .lso file.
+@cached_read
+def read_lst_dat(datafile):
+    '''Retrieve the data from .lst file.
 
     Parameters
     ----------
@@ -113,7 +126,16 @@ def read_lst(datafile):
 
     Returns
     ----------
-    None.
+    dbname : array, string
+        database name with leading dollar sign
+    stalist : array, string
+        list of all station names in all sessions
+    epo : array, float
+        time lag
+    X/Y/Z, X_err/Y_err/Z_err : array, float
+        XYZ-components of station positions and formal uncertainties, mm
+    U/E/N, U_err/E_err/N_err : array, float
+        UEN-components of station positions and formal uncertainties, mm
     '''
 
     # empty list for store data
@@ -172,17 +194,59 @@ def read_lst(datafile):
     N = strl2flta(N)
     N_err = strl2flta(N_err)
 
-    staset = set(stalist)
-    for staname in staset:
-        wp_sta_pos(staname, stalist, epo,
-                   X, Y, Z, X_err, Y_err, Z_err,
-                   U, E, N, U_err, E_err, N_err)
+    return [dbname, stalist, epo,
+            X, X_err, Y, Y_err, Z, Z_err,
+            U, U_err, E, E_err, N, N_err]
+
+
+def read_lst(datafile, nproc=1):
+    '''Retrieve the result from .lso file.
+
+    Parameters
+    ----------
+    datafile : string
+        name of data file
+    nproc : int
+        number of processes to write and plot the time series of every
+        station, None for the number of CPUs, default 1 (no pool)
+
+    Returns
+    ----------
+    None.
+    '''
+
+    [dbname, stalist, epo,
+     X, X_err, Y, Y_err, Z, Z_err,
+     U, U_err, E, E_err, N, N_err] = read_lst_dat(datafile)
+
+    groups = group_by(stalist, epo,
+                      X, Y, Z, X_err, Y_err, Z_err,
+                      U, E, N, U_err, E_err, N_err)
+
+    if nproc == 1:
+        for staname, stadat in groups:
+            wp_sta_pos(staname, *stadat)
+    else:
+        # Every station is written and plotted by a worker
+        with Pool(nproc, initializer=plot_worker_init) as pool:
+            pool.starmap(wp_sta_pos,
+                         ((staname, *stadat) for staname, stadat in groups),
+                         chunksize=POOL_CHUNK)
 
 
 # Retrieve estimates.
-if len(sys.argv) == 1:
-    datafile = 'result/test.lst'
-else:
-    datafile = sys.argv[1]
-read_lst(datafile)
+# The guard is needed by the workers which import this module.
+if __name__ == "__main__":
+    if len(sys.argv) == 1:
+        datafile = 'result/test.lst'
+    else:
+        datafile = sys.argv[1]
+
+    # Number of processes
+    if len(sys.argv) > 2:
+        nproc = int(sys.argv[2])
+    else:
+        nproc = 1
+
+    read_lst(datafile, nproc)
 # ------------------------------ END -----------------------------------
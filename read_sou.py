@@ -53,18 +53,113 @@ right ascension and declination of the same source.
 History
 N. Liu, 09 Apr 2018: Add new parameters 'arcerr' and 'unit_deg'
                      to functions 'read_sou' and 'read_sou_pos';
+N. Liu, 18 Oct 2026: function 'read_sou' reads the file only once and
+                     converts the fixed columns listed above with numpy;
+                     add new functions 'fixed_col_read', 'fixed_col_field'
+                     and 'sou_date_conv', which are also used in 'read_eob';
+                     the result of 'read_sou' is cached (see 'read_cache');
+N. Liu, 18 Oct 2026: function 'sou_date_conv' calls 'time_conv.date2year_arr'.
 
 """
 
 import numpy as np
 import sys
-from pos_conv import RA_conv, DC_conv
-from time_conv import date2year
+from read_cache import cached_read
+from time_conv import date2year_arr
 
-__all__ = ['read_sou', 'read_sou_pos', "read_cat"]
+__all__ = ['read_sou', 'read_sou_pos', "read_cat", "fixed_col_read",
+           "fixed_col_field", "sou_date_conv"]
 
 
 # ------------------------------  FUNCTIONS  ---------------------------
+def fixed_col_read(datafile, width=0):
+    '''Read the non-comment lines of a file into an array of bytes.
+
+    Parameters
+    ----------
+    datafile : string
+        name of data file
+    width : int
+        minimum number of columns, shorter lines are padded with blanks
+
+    Returns
+    ----------
+    block : array of uint8, shape (number of lines, number of columns)
+        characters of every line
+    '''
+
+    lines = [line for line in open(datafile, 'rb').read().splitlines()
+             if line.strip() and line[:1] != b'#']
+
+    if lines:
+        width = max(width, max(len(line) for line in lines))
+
+    block = np.frombuffer(b''.join(line.ljust(width) for line in lines),
+                          dtype=np.uint8)
+
+    return block.reshape(len(lines), width)
+
+
+def fixed_col_field(block, beg, end, dtype=None, missing=0,
+                    return_mask=False):
+    '''Get a field of fixed columns.
+
+    Parameters
+    ----------
+    block : array of uint8
+        characters of every line, see function 'fixed_col_read'
+    beg/end : int
+        first/last column of the field, counting from 1 as in the notes
+    dtype :
+        type of the field, default is None to keep it as bytes
+    missing :
+        value of the missing field, i.e., blank or filled with '*'/'$'
+    return_mask : boolean
+        True to also return the mask of missing fields
+
+    Returns
+    ----------
+    field : array
+        values of the field
+    mask : array of boolean
+        True for missing fields, only if return_mask is True
+    '''
+
+    field = np.ascontiguousarray(block[:, beg-1:end])
+
+    if dtype is None:
+        return field.view('S%d' % (end - beg + 1)).ravel()
+
+    # Fields of '********', '$$$$$$' or blank are missing
+    mask = ((field == ord('*')) | (field == ord('$'))).any(axis=1)
+    mask |= (field == ord(' ')).all(axis=1)
+    field = field.view('S%d' % (end - beg + 1)).ravel().copy()
+    field[mask] = str(missing).encode()
+
+    if return_mask:
+        return field.astype(dtype), mask
+
+    return field.astype(dtype)
+
+
+def sou_date_conv(date):
+    '''Convert dates of 'yyyy.mm.dd' into years, blank for 0.
+
+    Parameters
+    ----------
+    date : array of bytes
+        date strings of 'yyyy.mm.dd'
+
+    Returns
+    ----------
+    year : array of float
+        epoch in years
+    '''
+
+    return date2year_arr(date)
+
+
+@cached_read
 def read_sou(datafile, unit_deg=True, arcerr=True):
     '''Retrieve the result from .sou file.
 
@@ -106,13 +201,26 @@ def read_sou(datafile, unit_deg=True, arcerr=True):
         Epoch of the last observation
     '''
 
-    sou = np.genfromtxt(datafile, dtype=str, usecols=(1,), unpack=True)
-    RA, RA_err, DC, DC_err, cor = np.genfromtxt(
-        datafile, usecols=np.arange(3, 12, 2),
-        converters={3: RA_conv, 7: DC_conv},
-        missing_values='*'*8,
-        filling_values=0.,
-        unpack=True)
+    # Read the file only once, and then take the fixed columns.
+    block = fixed_col_read(datafile, 212)
+
+    sou = np.char.strip(fixed_col_field(block, 11, 18).astype(str))
+
+    # HH_MM_SS.ssssssss -> arcsec
+    RA = (fixed_col_field(block, 25, 26, float) * 3600 +
+          fixed_col_field(block, 28, 29, float) * 60 +
+          fixed_col_field(block, 31, 41, float)) * 15
+
+    # +DD_AM_AS.ssssssss -> arcsec, the sign is also needed for '-00'
+    sign = np.where((block[:, 61:64] == ord('-')).any(axis=1), -1, 1)
+    DC = sign * (np.fabs(fixed_col_field(block, 62, 64, float)) * 3600 +
+                 fixed_col_field(block, 66, 67, float) * 60 +
+                 fixed_col_field(block, 69, 78, float))
+
+    RA_err = fixed_col_field(block, 46, 55, float)
+    DC_err = fixed_col_field(block, 83, 92, float)
+    cor = fixed_col_field(block, 99, 104, float)
+
     if unit_deg:
         RA = RA / 3.6e3
         DC = DC / 3.6e3
@@ -121,19 +229,13 @@ def read_sou(datafile, unit_deg=True, arcerr=True):
     elif arcerr:
         RA_err = RA_err * np.cos(np.deg2rad(DC/3.6e3))
 
-    ObsUsed, ObsTot, SesUsed, SesTot = np.genfromtxt(
-        datafile, usecols=np.arange(13, 20, 2), dtype=int, unpack=True)
-
-    # empty list for store data
-    DateBeg, DateEnd = [], []
-
-    for line in open(datafile, 'r'):
-        if line[0] != '#':
-            DateBeg.append(date2year(line[181:191]))
-            DateEnd.append(date2year(line[202:212]))
+    ObsUsed = fixed_col_field(block, 116, 122, int)
+    ObsTot = fixed_col_field(block, 133, 139, int)
+    SesUsed = fixed_col_field(block, 151, 155, int)
+    SesTot = fixed_col_field(block, 166, 170, int)
 
-    DateBeg = np.array(DateBeg)
-    DateEnd = np.array(DateEnd)
+    DateBeg = sou_date_conv(fixed_col_field(block, 182, 191))
+    DateEnd = sou_date_conv(fixed_col_field(block, 203, 212))
 
     return [sou, RA, RA_err, DC, DC_err, cor,
             ObsUsed, ObsTot, SesUsed, SesTot, DateBeg, DateEnd]
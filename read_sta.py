@@ -101,11 +101,14 @@ velocities are also written.
    122-127 F6.3   d/l   Correlation between X-velocity and Z-velocity
    129-134 F6.3   d/l   Correlation between Y-velocity and Z-velocity
 
+History
+N. Liu, 18 Oct 2026: convert the dates of all stations at once with
+                     'time_conv.date2year_arr';
 """
 
 import numpy as np
 import sys
-from time_conv import date2year
+from time_conv import date2year_arr
 
 
 # ------------------------------  FUNCTIONS  ---------------------------
@@ -213,8 +216,8 @@ def read_sta(dataflea):
                 ObsTot.append(int(line[155:162]))
                 SesUse.append(int(line[173:178]))
                 SesTot.append(int(line[188:193]))
-                DateBeg.append(date2year(line[204:214]))
-                DateEnd.append(date2year(line[225:235]))
+                DateBeg.append(line[204:214])
+                DateEnd.append(line[225:235])
             elif line[:7] == 'STA_GCU':
                 U.append(float(line[30:45]))
                 U_err.append(float(line[49:59]))
@@ -263,8 +266,8 @@ def read_sta(dataflea):
     ObsTot = np.array(ObsTot)
     SesUse = np.array(SesUse)
     SesTot = np.array(SesTot)
-    DateBeg = np.array(DateBeg)
-    DateEnd = np.array(DateEnd)
+    DateBeg = date2year_arr(DateBeg)
+    DateEnd = date2year_arr(DateEnd)
     # Correlation
     XpYp = np.array(XpYp)
     XpZp = np.array(XpZp)
@@ -11,9 +11,16 @@ Fitting Equation:
     d_pmRA = -w_x*sin(DE)*cos(RA) - w_y*sin(DE)*sin(RA) + w_z*cos(DE)
     d_pmDE = +w_x*sin(RA)         - w_y*cos(RA)
 
+History
+N. Liu, 18 Oct 2026: the normal equations are built from the weights of
+                     each source and solved by 'normal_eqn.normal_eqn_solve',
+                     instead of the N x N diagonal weight matrices and the
+                     inverse of the normal matrix; 'RotationFit3' is now
+                     an alias of this module.
 """
 
 import numpy as np
+from normal_eqn import normal_eqn_wgt, normal_eqn_calc, normal_eqn_solve
 sin = np.sin
 cos = np.cos
 pi = np.pi
@@ -43,23 +50,13 @@ def RotCal(dalp, ddet, erra, errd, alp, det):
     b3 = np.sum( cos(det)*dalp/erra**2) + \
         0.0
 
-    A = np.mat([[A11, A12, A13],
-                [A12, A22, A23],
-                [A13, A23, A33]])
+    A = np.array([[A11, A12, A13],
+                  [A12, A22, A23],
+                  [A13, A23, A33]])
 
     b = np.array([b1, b2, b3])
 
-    w = np.linalg.solve(A, b)
-
-    cov = np.linalg.inv(A)
-    sig = np.sqrt(cov.diagonal())
-    sig = np.array(sig).reshape(3,)
-
-    corrcoef = np.array([ cov[i,j]/sig[i]/sig[j] \
-                for j in range(len(w)) for i in range(len(w))])
-    corrcoef.resize((len(w), len(w)))
-
-    return w, sig, corrcoef
+    return normal_eqn_solve(A, b)
 
 
 def RotationFit(pmRA,pmDE,e_pmRA,e_pmDE,RA,DE):
@@ -74,34 +71,14 @@ def RotationFit(pmRA,pmDE,e_pmRA,e_pmDE,RA,DE):
     parz1 =  cos(DE)
     parz2 =  np.zeros(N)
 
-    wei1 = np.diag(e_pmRA**-2)
-    wei2 = np.diag(e_pmDE**-2)
-
+## Jacobian matrix, rows of pmRA before rows of pmDE
     F1T = np.vstack((parx1, pary1, parz1))
-    F1  = np.transpose(F1T)
-
     F2T = np.vstack((parx2, pary2, parz2))
-    F2  = np.transpose(F2T)
-
-    a1 = np.dot(np.dot(F1T, wei1), F1)
-    b1 = np.dot(np.dot(F1T, wei1), pmRA)
-
-    a2 = np.dot(np.dot(F2T, wei2), F2)
-    b2= np.dot(np.dot(F2T, wei2), pmDE)
+    JacMat = np.transpose(np.hstack((F1T, F2T)))
 
-    A = a1 + a2
-    b = b1 + b2
+    A, b = normal_eqn_calc(JacMat, pmRA, pmDE, e_pmRA, e_pmDE)
 
-    w = np.linalg.solve(A, b)
-
-    cov = np.linalg.inv(A)
-    sig = np.sqrt(cov.diagonal())
-
-    corrcoef = np.array([ cov[i,j]/sig[i]/sig[j] \
-                for j in range(len(w)) for i in range(len(w))])
-    corrcoef.resize((len(w), len(w)))
-
-    return w, sig, corrcoef
+    return normal_eqn_solve(A, b)
 
 def RotationFitB(pmRA,pmDE,e_pmRA,e_pmDE,RA,DE):
 ## A bias in decclination is considered.
@@ -116,34 +93,14 @@ def RotationFitB(pmRA,pmDE,e_pmRA,e_pmDE,RA,DE):
     parb1 =  np.zeros(N)
     parb2 =  np.ones(N)
 
-    wei1 = np.diag(e_pmRA**-2)
-    wei2 = np.diag(e_pmDE**-2)
-
+## Jacobian matrix, rows of pmRA before rows of pmDE
     F1T = np.vstack((parx1, pary1, parz1, parb1))
-    F1  = np.transpose(F1T)
-
     F2T = np.vstack((parx2, pary2, parz2, parb2))
-    F2  = np.transpose(F2T)
-
-    a1 = np.dot(np.dot(F1T, wei1), F1)
-    b1 = np.dot(np.dot(F1T, wei1), pmRA)
+    JacMat = np.transpose(np.hstack((F1T, F2T)))
 
-    a2 = np.dot(np.dot(F2T, wei2), F2)
-    b2= np.dot(np.dot(F2T, wei2), pmDE)
+    A, b = normal_eqn_calc(JacMat, pmRA, pmDE, e_pmRA, e_pmDE)
 
-    A = a1 + a2
-    b = b1 + b2
-
-    w = np.linalg.solve(A, b)
-
-    cov = np.linalg.inv(A)
-    sig = np.sqrt(cov.diagonal())
-
-    corrcoef = np.array([ cov[i,j]/sig[i]/sig[j] \
-                for j in range(len(w)) for i in range(len(w))])
-    corrcoef.resize((len(w), len(w)))
-
-    return w, sig, corrcoef
+    return normal_eqn_solve(A, b)
 
 def RotationFitC(pmRA,pmDE,e_pmRA,e_pmDE,RA,DE,C):
 ## Notice !!!
@@ -156,43 +113,19 @@ def RotationFitC(pmRA,pmDE,e_pmRA,e_pmDE,RA,DE,C):
     parz1 =  cos(DE)
     parz2 =  np.zeros(N)
 
-    wei1 = np.diag(e_pmRA**-2)
-    wei2 = np.diag(e_pmDE**-2)
-
-    weic = np.diag(C/e_pmRA/e_pmDE)
-
+## Jacobian matrix, rows of pmRA before rows of pmDE
     F1T = np.vstack((parx1, pary1, parz1))
-    F1  = np.transpose(F1T)
-
     F2T = np.vstack((parx2, pary2, parz2))
-    F2  = np.transpose(F2T)
-
-    a1 = np.dot(np.dot(F1T, wei1), F1)
-    b1 = np.dot(np.dot(F1T, wei1), pmRA)
-
-    a2 = np.dot(np.dot(F2T, wei2), F2)
-    b2 = np.dot(np.dot(F2T, wei2), pmDE)
-
-## coupling terms
-    c1 = np.dot(np.dot(F1T, weic), F2)
-    d1 = np.dot(np.dot(F1T, weic), pmDE)
-
-    c2 = np.dot(np.dot(F2T, weic), F1)
-    d2 = np.dot(np.dot(F2T, weic), pmRA)
-
-    A = a1 + a2 + c1 + c2
-    b = b1 + b2 + d1 + d2
-
-    w = np.linalg.solve(A, b)
+    JacMat = np.transpose(np.hstack((F1T, F2T)))
 
-    cov = np.linalg.inv(A)
-    sig = np.sqrt(cov.diagonal())
+## weights of pmRA/pmDE and the coupling terms
+    wei1 = e_pmRA**-2
+    wei2 = e_pmDE**-2
+    weic = C/e_pmRA/e_pmDE
 
-    corrcoef = np.array([ cov[i,j]/sig[i]/sig[j] \
-                for j in range(len(w)) for i in range(len(w))])
-    corrcoef.resize((len(w), len(w)))
+    A, b = normal_eqn_wgt(JacMat, pmRA, pmDE, wei1, weic, wei2)
 
-    return w, sig, corrcoef
+    return normal_eqn_solve(A, b)
 
 def CalcRes(pmRA, pmDE, RA, DE, w, sig):
     '''
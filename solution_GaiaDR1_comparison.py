@@ -18,6 +18,8 @@ N. Liu, 06 Feb 2018: add a new function 'nor_sep_calc';
 N. Liu, 09 Apr 2018: minor changes in functions
                      'solution_Gaia_diff_analysis' and
                      'sol_Gaia_diff_calc'
+N. Liu, 18 Oct 2026: function 'Xmatch' uses 'list_crossmatch' instead of
+                     searching the second list for every source
 
 """
 
@@ -26,6 +28,7 @@ from os import path
 from functools import reduce
 import matplotlib.pyplot as plt
 from read_sou import read_sou_pos
+from list_crossmatch import list_crossmatch
 from nor_sep import nor_sep_calc
 from Transformation_cat import catalog_transfor
 from VSH_analysis import vsh_analysis
@@ -135,28 +138,14 @@ def Xmatch(sou1, RA1, RAc_err1, Dec1, Dec_err1, cor1,
         correlation coeffient between RA and Dec for common sources.
     '''
 
-    soucom = []
-    index1 = []
-    index2 = []
-    flgcom = []
-
-    for i, soui in enumerate(sou1):
-        indarr = np.where(sou2 == soui)[0]
-
-        if indarr:
-            soucom.append(soui)
-            index1.append(i)
-            j = indarr[0]
-            index2.append(j)
-            flgcom.append(flg[j])
+    soucom, index1, index2 = list_crossmatch(sou1, sou2)
+    flgcom = np.take(flg, index2)
 
     RA1n, RAc_err1n, Dec1n, Dec_err1n, cor1n = position_taken(
         index1, RA1, RAc_err1, Dec1, Dec_err1, cor1)
     RA2n, RAc_err2n, Dec2n, Dec_err2n, cor2n = position_taken(
         index2, RA2, RAc_err2, Dec2, Dec_err2, cor2)
 
-    flgcom = np.array(flgcom)
-
     return [soucom, flgcom,
             RA1n, RAc_err1n, Dec1n, Dec_err1n, cor1n,
             RA2n, RAc_err2n, Dec2n, Dec_err2n, cor2n]
@@ -7,6 +7,11 @@ Created on Thu Apr 26 15:55:00 2018
 @author: Neo(liuniu@smail.nju.edu.cn)
 
 Read radio source name from data list
+
+History
+N. Liu, 18 Oct 2026: function 'find_sou_designation' uses 'list_crossmatch'
+                     instead of searching the name list for every source;
+                     fix the check of 'nametype'.
 """
 
 from astropy.io import fits
@@ -189,32 +194,25 @@ def find_sou_designation(sou, nametype):
     #     print("ERROR! nametype can only be IVS, ICRF, or IERS!")
     #     exit()
 
-    if nametype is "IVS" or "ivs":
+    if nametype in ["IVS", "ivs"]:
         list0 = IVS
-    elif nametype is "ICRF" or "icrf":
+    elif nametype in ["ICRF", "icrf"]:
         list0 = ICRF
-    elif nametype is "IERS" or "iers":
+    elif nametype in ["IERS", "iers"]:
         list0 = IERS
     else:
         print("ERROR! nametype can only be IVS, ICRF, or IERS!")
         exit()
 
-    list1 = np.empty_like(sou, dtype='S8')
-    list2 = np.empty_like(sou, dtype='S16')
-    list3 = np.empty_like(sou, dtype='S8')
-
-    for i, soui in enumerate(sou):
-        indarr = np.where(list0 == soui)[0]
+    # Blank for sources not found
+    list1 = np.full_like(sou, " " * 8, dtype='S8')
+    list2 = np.full_like(sou, " " * 16, dtype='S16')
+    list3 = np.full_like(sou, " " * 8, dtype='S8')
 
-        if indarr:
-            j = indarr[0]
-            list1[i] = IVS[j]
-            list2[i] = ICRF[j]
-            list3[i] = IERS[j]
-        else:
-            list1[i] = " " * 8
-            list2[i] = " " * 16
-            list3[i] = " " * 8
+    _, index1, index2 = list_crossmatch(sou, list0)
+    list1[index1] = IVS[index2]
+    list2[index1] = ICRF[index2]
+    list3[index1] = IERS[index2]
 
     # print(list2)
 
@@ -5,11 +5,15 @@
 Created on Fri Dec 22 14:09:36 2017
 
 @author: Neo(liuniu@smail.nju.edu.cn)
+
+History
+N. Liu, 18/10/2026: function 'nor_sep_calc' calls the vectorized one of
+                    module 'nor_sep' instead of looping over sources.
 """
 
 import numpy as np
 import matplotlib.pyplot as plt
-from functools import reduce
+import nor_sep
 from read_sou import read_sou_pos
 from Transformation_cat import catalog_transfor
 from VSH_analysis import vsh_analysis
@@ -126,26 +130,12 @@ def nor_sep_calc(RA1, DC1, RA1_err, DC1_err, Cor1,
     dDC = (DC1 - DC2) * 1.e6
     dDC_err = np.sqrt(DC1_err**2 + DC2_err**2)
 
-    pos_seps = np.sqrt(dRA**2 + dDC**2)
-
-    # Normalised coordinate difference
-    X_a = dRA / np.sqrt(RA1_err**2 + RA2_err**2)
-    X_d = dDC / np.sqrt(DC1_err**2 + DC2_err**2)
-
     # Correlation coefficient of combined errors
     C = (RA1_err * DC1_err * Cor1 +
          RA2_err * DC2_err * Cor2) / (dRA_err * dDC_err)
 
     # Normalised separation
-    X = np.zeros_like(X_a)
-
-    for i, (X_ai, X_di, Ci) in enumerate(zip(X_a, X_d, C)):
-
-        wgt = np.linalg.inv(np.mat([[1, Ci],
-                                    [Ci, 1]]))
-        Xmat = np.array([X_ai, X_di])
-        # Xi = np.sqrt(reduce(np.dot, (Xmat, wgt, Xmat)))
-        X[i] = np.sqrt(reduce(np.dot, (Xmat, wgt, Xmat)))
+    _, X_a, X_d, X, _ = nor_sep.nor_sep_calc(dRA, dRA_err, dDC, dDC_err, C)
 
     return X_a, X_d, X
 
@@ -0,0 +1,160 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+# File name: test_normal_eqn.py
+"""
+Created on Sun Oct 18 23:58:10 2026
+
+@author: Neo(liuniu@smail.nju.edu.cn)
+
+Tests of the least squares core 'normal_eqn', compared with the dense
+solution using the full 2N x 2N weight matrix and the inverse of the
+normal matrix.
+
+Usage:
+    python -m pytest test_normal_eqn.py
+
+"""
+
+import numpy as np
+from normal_eqn import normal_eqn_calc, normal_eqn_solve, \
+    normal_eqn_solve_batch, lsq_solve, normal_eqn_elim
+
+
+# -----------------------------  FUNCTIONS -----------------------------
+def sim_data(num=200, npar=6, seed=0):
+    '''Simulate the Jacobian matrix and the (dRA, dDE) data.
+    '''
+
+    rng = np.random.default_rng(seed)
+
+    JacMat = rng.normal(size=(2 * num, npar))
+    x = rng.normal(size=npar)
+    e_dRA = rng.uniform(0.5, 2, num)
+    e_dDE = rng.uniform(0.5, 2, num)
+    cov = rng.uniform(-0.5, 0.5, num) * e_dRA * e_dDE
+
+    dRA, dDE = np.resize(np.dot(JacMat, x), (2, num))
+    dRA = dRA + rng.normal(size=num) * e_dRA
+    dDE = dDE + rng.normal(size=num) * e_dDE
+
+    return JacMat, dRA, dDE, e_dRA, e_dDE, cov
+
+
+def dense_solve(JacMat, dRA, dDE, e_dRA, e_dDE, cov):
+    '''Solution with the full weight matrix and the inverse normal matrix.
+    '''
+
+    num = dRA.size
+
+    covmat = np.diag(np.hstack((e_dRA**2, e_dDE**2)))
+    covmat[np.arange(num), np.arange(num) + num] = cov
+    covmat[np.arange(num) + num, np.arange(num)] = cov
+    wgt = np.linalg.inv(covmat)
+
+    A = np.dot(np.dot(JacMat.T, wgt), JacMat)
+    b = np.dot(np.dot(JacMat.T, wgt), np.hstack((dRA, dDE)))
+
+    pcov = np.linalg.inv(A)
+    x = np.dot(pcov, b)
+    sig = np.sqrt(np.diagonal(pcov))
+
+    return x, sig, pcov / np.outer(sig, sig)
+
+
+def test_normal_eqn_solve():
+    '''Normal equation of the 2 x 2 blocks solved by Cholesky.
+    '''
+
+    data = sim_data()
+
+    A, b = normal_eqn_calc(*data)
+    x, sig, corrmat = normal_eqn_solve(A, b)
+    x0, sig0, corrmat0 = dense_solve(*data)
+
+    np.testing.assert_allclose(x, x0, rtol=0, atol=1e-14)
+    np.testing.assert_allclose(sig, sig0, rtol=0, atol=1e-14)
+    np.testing.assert_allclose(corrmat, corrmat0, rtol=0, atol=1e-13)
+
+
+def test_normal_eqn_solve_batch():
+    '''A batch of normal equations gives the same as one by one.
+    '''
+
+    rng = np.random.default_rng(1)
+
+    JacMat = rng.normal(size=(5, 40, 6))
+    A = np.matmul(np.transpose(JacMat, (0, 2, 1)), JacMat)
+    b = rng.normal(size=(5, 6))
+
+    x = normal_eqn_solve_batch(A, b)
+    x0 = np.array([np.dot(np.linalg.inv(Ai), bi) for Ai, bi in zip(A, b)])
+
+    np.testing.assert_allclose(x, x0, rtol=0, atol=1e-13)
+
+
+def test_lsq_solve():
+    '''QR solution of uncorrelated data.
+    '''
+
+    JacMat, dRA, dDE, e_dRA, e_dDE, _ = sim_data()
+    zero = np.zeros_like(dRA)
+
+    x, sig, corrmat = lsq_solve(JacMat, np.hstack((dRA, dDE)),
+                                np.hstack((e_dRA, e_dDE)))
+    x0, sig0, corrmat0 = dense_solve(JacMat, dRA, dDE, e_dRA, e_dDE, zero)
+
+    np.testing.assert_allclose(x, x0, rtol=0, atol=1e-14)
+    np.testing.assert_allclose(sig, sig0, rtol=0, atol=1e-14)
+    np.testing.assert_allclose(corrmat, corrmat0, rtol=0, atol=1e-13)
+
+
+def test_normal_eqn_elim():
+    '''Outlier elimination compared with refitting the good sources.
+    '''
+
+    JacMat, dRA, dDE, e_dRA, e_dDE, cov = sim_data(seed=2)
+    num = dRA.size
+
+    # Some outliers
+    dRA[:10] += 20.
+    dDE[5:15] -= 20.
+
+    def elim_func(rRA, rDE):
+        return np.where(np.hypot(rRA / e_dRA, rDE / e_dDE) <= 3.)[0]
+
+    x, sig, corrmat, ind_go = normal_eqn_elim(
+        JacMat, dRA, dDE, e_dRA, e_dDE, cov, elim_func)
+
+    # Refit the good sources
+    ind = np.hstack((ind_go, ind_go + num))
+    x0, sig0, corrmat0 = dense_solve(
+        JacMat[ind], dRA[ind_go], dDE[ind_go], e_dRA[ind_go],
+        e_dDE[ind_go], cov[ind_go])
+
+    assert np.all(ind_go >= 15)
+    np.testing.assert_allclose(x, x0, rtol=0, atol=1e-13)
+    np.testing.assert_allclose(sig, sig0, rtol=0, atol=1e-13)
+
+    # The good sources of the final solution are the same
+    rRA, rDE = np.resize(np.hstack((dRA, dDE)) - np.dot(JacMat, x),
+                         (2, num))
+    np.testing.assert_array_equal(elim_func(rRA, rDE), ind_go)
+
+
+def test_normal_eqn_elim_max_iter():
+    '''The iteration stops if the outliers oscillate.
+    '''
+
+    data = sim_data(seed=3)
+    num = data[1].size
+    niter = []
+
+    def elim_func(rRA, rDE):
+        # Reject the first one or two sources alternately
+        niter.append(1)
+        return np.arange(1 + len(niter) % 2, num)
+
+    normal_eqn_elim(*data, elim_func, max_iter=10)
+
+    assert len(niter) == 10
+# --------------------------------- END --------------------------------
@@ -0,0 +1,48 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+# File name: test_time_conv.py
+"""
+Created on Mon Oct 19 09:12:30 2026
+
+@author: Neo(liuniu@smail.nju.edu.cn)
+
+Tests of function 'time_conv.date2year_arr', compared with the per-value
+function 'date2year'.
+
+Usage:
+    python -m pytest test_time_conv.py
+
+"""
+
+import numpy as np
+from time_conv import date2year, date2year_arr
+
+
+# -----------------------------  FUNCTIONS -----------------------------
+def test_date2year_arr():
+    '''Same as 'date2year' for every date, blank ones being 0.
+    '''
+
+    dates = ["2018.01.01", "2016.12.31", " " * 10, "2000.02.29"]
+
+    np.testing.assert_allclose(date2year_arr(dates),
+                               [date2year(date) for date in dates],
+                               rtol=0, atol=1e-12)
+
+
+def test_date2year_arr_empty():
+    '''Empty array.
+    '''
+
+    year = date2year_arr([])
+
+    assert year.shape == (0,)
+
+
+def test_date2year_arr_blank():
+    '''All dates are blank, e.g., sources never observed.
+    '''
+
+    np.testing.assert_array_equal(date2year_arr(["   ", "  "]), [0, 0])
+    np.testing.assert_array_equal(date2year_arr(np.array([b" " * 10])), [0])
+# --------------------------------- END --------------------------------
@@ -4,9 +4,16 @@
 Created on Mon Dec  4 15:36:25 2017
 
 @author: Neo
+
+History
+N. Liu, 18 Oct 2026: add function 'date2year_arr' to convert an array of
+                     dates at once using numpy.datetime64;
+N. Liu, 18 Oct 2026: function 'date2year_arr' returns zeros for an empty
+                     array or all blank dates.
 """
 
 from datetime import datetime
+import numpy as np
 
 
 # ------------------------------  FUNCTIONS  ---------------------------
@@ -26,4 +33,42 @@ def date2year(s):
         dateno = count_date_num(Y, M, D, Y, 1, 1)
         dateyr = count_date_num(Y + 1, 1, 1, Y, 1, 1)
         return Y + dateno * 1.0 / dateyr
+
+
+def date2year_arr(s):
+    '''Turn an array of date strings 'yyyy.mm.dd' into years.
+
+    Same as function 'date2year' but for all elements at once.
+
+    Parameters
+    ----------
+    s : array of string or bytes
+        dates of 'yyyy.mm.dd', blank ones are taken as 0
+
+    Returns
+    ----------
+    year : array of float
+        epoch in years
+    '''
+
+    s = np.char.strip(np.asarray(s).astype(str))
+
+    year = np.zeros(s.shape)
+    valid = s != ''
+
+    # Empty input or all dates blank
+    if not valid.any():
+        return year
+
+    date = np.char.replace(s[valid], '.', '-').astype('datetime64[D]')
+    Y = date.astype('datetime64[Y]')
+
+    # Days since the first day of the year and the days of the year
+    dateno = (date - Y).astype(float)
+    dateyr = ((Y + 1).astype('datetime64[D]') -
+              Y.astype('datetime64[D]')).astype(float)
+
+    year[valid] = Y.astype(int) + 1970 + dateno / dateyr
+
+    return year
 # ------------------------------ END -----------------------------------
@@ -29,6 +29,27 @@ N.Liu, 04/04/2018 : add a new input parameter 'wgt' to function
 N.Liu, 30/04/2018 : divide this code into two files "vsh_deg1_cor" and
                     "vsh_deg2_cor";
 N.Liu, 03/05/2018 : add "fit_type" parameter to function "VSHdeg01_fitting"
+N.Liu, 18/10/2026 : function 'VSH_deg01' now accumulates the normal equation
+                    from the 2x2 weight blocks (see 'normal_eqn')
+                    instead of the full 2N x 2N weight matrix;
+N.Liu, 18/10/2026 : add a new function 'VSH_deg01_chunk' to fit the data
+                    read chunk by chunk;
+N.Liu, 18/10/2026 : the iteration of n-sigma elimination in function
+                    'VSHdeg01_fitting' now updates the normal equation
+                    with the change of outliers instead of refitting;
+N.Liu, 18/10/2026 : the Jacobian matrix used in function 'VSHdeg01_fitting'
+                    is taken from the cache (see 'jac_cache') or
+                    given by a new parameter 'JacMat';
+N.Liu, 18/10/2026 : fix the call of 'nor_sep_calc' in 'VSHdeg01_fitting', which
+                    takes the correlation coefficient instead of the
+                    covariance, in the order of (dRA, e_dRA, dDE, e_dDE);
+N.Liu, 18/10/2026 : function 'vsh_func01' takes the parameters in the order
+                    of (g1, g2, g3, r1, r2, r3) as the estimation; the
+                    residuals of 'VSHdeg01_fitting' are computed with the
+                    Jacobian matrix, the same as those for the elimination;
+N.Liu, 18/10/2026 : add robust fitting "huber" and "cauchy" to 'elim_flag' and
+                    a new parameter 'return_wgt' of 'VSHdeg01_fitting' for
+                    the weight of every source;
 
 """
 
@@ -36,11 +57,15 @@ import numpy as np
 from numpy import sin, cos, pi, concatenate
 from wrms_calc import calc_wrms, calc_2Dchi2
 from nor_sep import nor_sep_calc
+from normal_eqn import normal_eqn_calc, normal_eqn_accum, normal_eqn_solve, \
+    normal_eqn_elim, normal_eqn_subset, normal_eqn_irls
+from jac_cache import jac_mat_cache
 
 
 __all__ = ["elim_nsigma", "elim_angsep", "elim_norsep", "find_good_obs",
            "wgt_mat",
-           "Jac_mat_deg01", "res_arr01", "VSH_deg01", "VSHdeg01_fitting",
+           "Jac_mat_deg01", "res_arr01", "VSH_deg01", "VSH_deg01_chunk",
+           "VSHdeg01_fitting",
            "test_code"]
 
 
@@ -335,7 +360,7 @@ def res_arr01(dRA, dDE, RA, DE, W):
 
 # ---------------------------------------------------
 def vsh_func01(ra, dec, X, fit_type="full"):
-               # r1, r2, r3, g1, g2, g3):
+               # g1, g2, g3, r1, r2, r3):
     '''VSH function of the first degree.
 
     Parameters
@@ -343,10 +368,11 @@ def vsh_func01(ra, dec, X, fit_type="full"):
     ra/dec : array of float
         Right ascension/Declination in radian
     X :
-        r1, r2, r3 : float
-            rotation parameters
         g1, g2, g3 : float
             glide parameters
+        r1, r2, r3 : float
+            rotation parameters
+        in the same order as the estimation of 'VSHdeg01_fitting'
     fit_type : string
         flag to determine which parameters to be fitted
         "full" for full 6 parameters
@@ -360,7 +386,7 @@ def vsh_func01(ra, dec, X, fit_type="full"):
     '''
 
     if fit_type is "full":
-        r1, r2, r3, g1, g2, g3 = X
+        g1, g2, g3, r1, r2, r3 = X
         dra = [-r1 * cos(ra) * sin(dec) - r2 * sin(ra) * sin(dec)
                + r3 * cos(dec)
                - g1 * sin(ra) + g2 * cos(ra)][0]
@@ -448,14 +474,11 @@ def VSH_deg01(dRA, dDE, e_dRA, e_dDE, RA, DE, cov=None, fit_type="full"):
 
     # Jacobian matrix and its transpose.
     JacMat, JacMatT = Jac_mat_deg01(RA, DE, fit_type)
-    # Weighted matrix.
-    WgtMat = wgt_mat(e_dRA, e_dDE, cov)
 
     # Calculate matrix A and b of matrix equation:
     # A * x = b.
-    A = np.dot(np.dot(JacMatT, WgtMat), JacMat)
-    dPos = np.hstack((dRA, dDE))
-    b = np.dot(np.dot(JacMatT, WgtMat),  dPos)
+    # The weight matrix is block-diagonal so it is used block by block.
+    A, b = normal_eqn_calc(JacMat, dRA, dDE, e_dRA, e_dDE, cov)
 
     # Solve the equations.
     '''Components of estimation
@@ -464,27 +487,56 @@ def VSH_deg01(dRA, dDE, e_dRA, e_dDE, RA, DE, cov=None, fit_type="full"):
     "rotation"   |      (r1, r2, r3)
     "glide"      |      (d1, d2, d3)
     '''
-    x = np.linalg.solve(A, b)
-
-    # Covariance.
-    pcov = np.linalg.inv(A)
-    sig = np.sqrt(pcov.diagonal())
-
-    # Correlation coefficient.
-    corrmat = np.array([pcov[i, j] / sig[i] / sig[j]
-                        for j in range(len(x)) for i in range(len(x))])
-    corrmat.resize((len(x), len(x)))
+    x, sig, corrmat = normal_eqn_solve(A, b)
 
     # Return the result.
     return x, sig, corrmat
 
 
+# ---------------------------------------------------
+def VSH_deg01_chunk(chunks, fit_type="full"):
+    '''The 1st degree of VSH function fitted on data read chunk by chunk.
+
+    The normal equation is accumulated chunk by chunk, so only one chunk
+    needs to be in memory at a time. No outlier is eliminated.
+
+    Parameters
+    ----------
+    chunks : iterable
+        every item is a tuple of (dRA, dDE, e_dRA, e_dDE, cov, RA, DE),
+        see function 'VSH_deg01' for the meaning; cov may be None
+    fit_type : string
+        flag to determine which parameters to be fitted
+        "full" for full 6 parameters
+        "rotation" for only 3 rotation parameters
+        "glide" for only 3 glide parameters
+
+    Returns
+    ----------
+    x : array of float
+        estimaation of (d1, d2, d3, r1, r2, r3) in uas
+    sig : array of float
+        uncertainty of x in uas
+    corrmat : matrix
+        matrix of correlation coefficient.
+    num : int
+        number of sources used
+    '''
+
+    A, b, num = normal_eqn_accum(
+        chunks, lambda RA, DE: Jac_mat_deg01(RA, DE, fit_type))
+
+    x, sig, corrmat = normal_eqn_solve(A, b)
+
+    return x, sig, corrmat, num
+
+
 # ----------------------------------------------------
 # def VSHdeg01_fitting(dRA, dDE, e_dRA, e_dDE, cor, RA, DE):
 # def VSHdeg01_fitting(dRA, dDE, e_dRA, e_dDE, cov, RA, DE, flog):
 def VSHdeg01_fitting(dRA, dDE, e_dRA, e_dDE, RA, DE, flog, cov=None,
                      elim_flag="sigma", N=3.0, ang_sep=None, X=None,
-                     fit_type="full"):
+                     fit_type="full", JacMat=None, return_wgt=False):
     '''1st-degree vsh fitting.
 
     Parameters
@@ -505,6 +557,10 @@ def VSHdeg01_fitting(dRA, dDE, e_dRA, e_dDE, RA, DE, flog, cov=None,
         "norsep" uses normalized seperation as the criteria
         "nor_ang" uses both normalized and angular seperation as the criteria
         "None" or "none" doesn't use any criteria
+        "huber" or "cauchy" doesn't remove any source but downweights them
+            by iteratively reweighted least squares with the loss function
+            (see 'normal_eqn.normal_eqn_irls'); sources whose normalized
+            residuals are larger than N are reported as outliers
     N : float
         N-sigma principle for eliminating the outliers
         or
@@ -514,6 +570,12 @@ def VSHdeg01_fitting(dRA, dDE, e_dRA, e_dDE, RA, DE, flog, cov=None,
         "full" for full 6 parameters
         "rotation" for only 3 rotation parameters
         "glide" for only 3 glide parameters
+    JacMat : matrix
+        Jacobian matrix of (RA, DE), default is None to take it from
+        the cache (see 'jac_cache'); for a subset of a catalog it could
+        be the rows of the cached matrix of the whole catalog
+    return_wgt : Boolean
+        True to also return the weight of every source, default False
 
     Returns
     ----------
@@ -527,6 +589,9 @@ def VSHdeg01_fitting(dRA, dDE, e_dRA, e_dDE, RA, DE, flog, cov=None,
         index of outliers
     dRAres/dDEres: array of float
         residual array of dRA(*cos(Dec))/dDec in uas.
+    wgt : array of float
+        weight of every source (0 for eliminated ones), only returned
+        if return_wgt is True
     '''
 
     # Calculate the apriori wrms
@@ -558,43 +623,34 @@ def VSHdeg01_fitting(dRA, dDE, e_dRA, e_dDE, RA, DE, flog, cov=None,
     #       calc_2Dchi2(dRA, e_dRA, dDE, e_dDE, cov, reduced=True),
     #       file=flog)
 
+    # Jacobian matrix, reused if the same sources were fitted before.
+    if JacMat is None:
+        JacMat, _ = jac_mat_cache(Jac_mat_deg01, RA, DE, fit_type)
+
     # Now we can use different criteria of elimination.
     if elim_flag is "None" or elim_flag is "none":
-        x, sig, cofmat = VSH_deg01(dRA, dDE, e_dRA, e_dDE, cov, RA, DE)
+        A, b = normal_eqn_calc(JacMat, dRA, dDE, e_dRA, e_dDE, cov)
+        x, sig, cofmat = normal_eqn_solve(A, b)
         ind_go = np.arange(dRA.size)
 
     elif elim_flag is "sigma":
-        x, sig, corrmat = VSH_deg01(dRA, dDE, e_dRA, e_dDE, RA, DE,
-                                    cov, fit_type)
-        # Iteration.
-        num1 = 1
-        num2 = 0
-        while(num1 != num2):
-            num1 = num2
-
-            # Calculate the residual. ( O - C )
-            # rRA, rDE = res_arr01(dRA, dDE, RA, DE, x)
-            rRA, rDE = residual_calc01(dRA, dDE, RA, DE, x, fit_type)
-            ind_go = elim_nsigma(rRA, rDE, N)
-            num2 = dRA.size - ind_go.size
-
-            dRAn, dDEn, e_dRAn, e_dDEn, covn, RAn, DEn = find_good_obs(
-                dRA, dDE, e_dRA, e_dDE, cov, RA, DE, ind_go)
-            # [dRAn, dDEn, e_dRAn, e_dDEn] = [np.take(dRA, ind_go),
-            #                                 np.take(dDE, ind_go),
-            #                                 np.take(e_dRA, ind_go),
-            #                                 np.take(e_dDE, ind_go)]
-            # covn = np.take(cov, ind_go)
-            # RAn, DEn = np.take(RA, ind_go), np.take(DE, ind_go)
-
-            xn, sign, cofmatn = VSH_deg01(dRAn, dDEn, e_dRAn, e_dDEn, RAn, DEn,
-                                          covn, fit_type)
-
-            x, sig, cofmat = xn, sign, cofmatn
-            print('# Number of sample: %d' % (dRA.size-num2),
-                  file=flog)
+        # The normal equation is updated by the change of outliers,
+        # instead of being rebuilt at each iteration.
+        x, sig, cofmat, ind_go = normal_eqn_elim(
+            JacMat, dRA, dDE, e_dRA, e_dDE, cov,
+            lambda rRA, rDE: elim_nsigma(rRA, rDE, N), flog)
+    elif elim_flag in ["huber", "cauchy"]:
+        # No source is removed, so there is no oscillation of outliers.
+        x, sig, cofmat, wgt, Xres = normal_eqn_irls(
+            JacMat, dRA, dDE, e_dRA, e_dDE, cov, elim_flag, flog=flog)
+        ind_go = np.where(Xres <= N)[0]
     else:
-        ang_sep, X_a, X_d, X = nor_sep_calc(dRA, dDE, e_dRA, e_dDE, cov)
+        if cov is None:
+            C = np.zeros_like(dRA)
+        else:
+            C = cov / e_dRA / e_dDE
+
+        ang_sep, X_a, X_d, X, _ = nor_sep_calc(dRA, e_dRA, dDE, e_dDE, C)
 
         if elim_flag is "angsep":
             ind_go = elim_angsep(ang_sep)
@@ -609,16 +665,18 @@ def VSHdeg01_fitting(dRA, dDE, e_dRA, e_dDE, RA, DE, flog, cov=None,
             exit()
 
         # Find all good observations
-        dRAn, dDEn, e_dRAn, e_dDEn, covn, RAn, DEn = find_good_obs(
-            dRA, dDE, e_dRA, e_dDE, cov, RA, DE, ind_go)
-        x, sig, cofmat = VSH_deg01(dRAn, dDEn, e_dRAn, e_dDEn, RAn, DEn,
-                                   covn, fit_type)
-        print('# Number of sample: %d' % (dRA.size-num2),
+        ind_go = np.ravel(ind_go)
+        A, b = normal_eqn_subset(JacMat, dRA, dDE, e_dRA, e_dDE, cov,
+                                 ind_go)
+        x, sig, cofmat = normal_eqn_solve(A, b)
+        print('# Number of sample: %d' % ind_go.size,
               file=flog)
 
     ind_outl = np.setxor1d(np.arange(dRA.size), ind_go)
     # dRAres, dDEres = res_arr01(dRA, dDE, RA, DE, xn)
-    dRAres, dDEres = residual_calc01(dRA, dDE, RA, DE, x, fit_type)
+    # The same residuals as those used for the elimination
+    dRAres, dDEres = np.resize(np.hstack((dRA, dDE)) - np.dot(JacMat, x),
+                               (2, dRA.size))
 
     # # Calculate the posteriori wrms
     # meanRA, wrmsRA, stdRA = calc_wrms(dRAres, e_dRA)
@@ -649,6 +707,12 @@ def VSHdeg01_fitting(dRA, dDE, e_dRA, e_dDE, RA, DE, flog, cov=None,
     #       calc_2Dchi2(dRAres, e_dRA, dDEres, e_dDE, cov, reduced=True),
     #       file=flog)
 
+    if return_wgt:
+        if elim_flag not in ["huber", "cauchy"]:
+            wgt = np.zeros(dRA.size)
+            wgt[ind_go] = 1
+        return x, sig, cofmat, ind_outl, dRAres, dDEres, wgt
+
     return x, sig, cofmat, ind_outl, dRAres, dDEres
 
 
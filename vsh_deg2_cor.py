@@ -11,6 +11,16 @@ The full covariance matrix is used.
 # Notice !!!
 # unit for RA and DE are rad.
 
+# Notice !!!
+# The partials of the quadrupole terms of order m = 1 and 2 in
+# 'Jac_mat_deg02' are not true VSH fields (Re and Im parts are mixed in
+# the dDE component), and the partials of the zonal terms E_{2,0}/M_{2,0}
+# are 0.894 times the normalized ones. So the degree-2 results of
+# 'VSH_deg02' and 'VSHdeg02_fitting' (used by 'VSH_analysis') are not
+# comparable with those of 'vsh_degl_cor.vsh_fit' with degree=2 (used by
+# 'multi_solution_comparison'), for the quadrupole and, through their
+# correlations, the dipole terms. Only the degree-1 fitting agrees.
+
 History
 
 N.Liu, 22/02/2018 : add some comments;
@@ -28,6 +38,30 @@ N.Liu, 04/04/2018 : add a new input parameter 'wgt' to function
                       now can use different outlier elimination algorithm;
 N.Liu, 04/04/2018 : divide this code into two files "vsh_deg1_cor" and
                     "vsh_deg2_cor";
+N.Liu, 18/10/2026 : function 'VSH_deg02' now accumulates the normal equation
+                    from the 2x2 weight blocks (see 'normal_eqn')
+                    instead of the full 2N x 2N weight matrix;
+N.Liu, 18/10/2026 : add a new function 'VSH_deg02_chunk' to fit the data
+                    read chunk by chunk;
+N.Liu, 18/10/2026 : the iteration of n-sigma elimination in function
+                    'VSHdeg02_fitting' now updates the normal equation
+                    with the change of outliers instead of refitting;
+N.Liu, 18/10/2026 : the Jacobian matrix used in function 'VSHdeg02_fitting'
+                    is taken from the cache (see 'jac_cache') or
+                    given by a new parameter 'JacMat';
+N.Liu, 18/10/2026 : fix the call of 'nor_sep_calc' in 'VSHdeg02_fitting', which
+                    takes the correlation coefficient instead of the
+                    covariance, in the order of (dRA, e_dRA, dDE, e_dDE);
+N.Liu, 18/10/2026 : functions 'vsh_func01' and 'vsh_func02' now agree with
+                    'Jac_mat_deg02', i.e., glide before rotation and the
+                    same partials of dDE; the residuals of
+                    'VSHdeg02_fitting' are computed with the Jacobian matrix,
+                    the same as those for the elimination;
+N.Liu, 18/10/2026 : add robust fitting "huber" and "cauchy" to 'elim_flag' and
+                    a new parameter 'return_wgt' of 'VSHdeg02_fitting' for
+                    the weight of every source;
+N.Liu, 18/10/2026 : note that the degree-2 partials differ from the VSH
+                    basis of 'vsh_degl_cor'.
 
 """
 
@@ -35,11 +69,15 @@ import numpy as np
 from numpy import sin, cos, pi, concatenate
 from wrms_calc import calc_wrms, calc_2Dchi2
 from nor_sep import nor_sep_calc
+from normal_eqn import normal_eqn_calc, normal_eqn_accum, normal_eqn_solve, \
+    normal_eqn_elim, normal_eqn_subset, normal_eqn_irls
+from jac_cache import jac_mat_cache
 
 
 __all__ = ["elim_nsigma", "elim_angsep", "elim_norsep", "find_good_obs",
            "wgt_mat",
-           "Jac_mat_deg02", "residual_calc02", "VSH_deg02", "VSHdeg02_fitting",
+           "Jac_mat_deg02", "residual_calc02", "VSH_deg02", "VSH_deg02_chunk",
+           "VSHdeg02_fitting",
            "test_code"]
 
 
@@ -374,17 +412,17 @@ def Jac_mat_deg02(RA, DE):
 
 # ---------------------------------------------------
 def vsh_func01(ra, dec,
-               r1, r2, r3, g1, g2, g3):
+               g1, g2, g3, r1, r2, r3):
     '''VSH function of the first degree.
 
     Parameters
     ----------
     ra/dec : array of float
         Right ascension/Declination in radian
-    r1, r2, r3 : float
-        rotation parameters
     g1, g2, g3 : float
         glide parameters
+    r1, r2, r3 : float
+        rotation parameters
 
     Returns
     ----------
@@ -428,11 +466,12 @@ def vsh_func02(ra, dec,
            + (ER_21 * sin(ra) + EI_21 * cos(ra)) * sin(dec)
            - (MR_22 * cos(2*ra) - MI_22 * sin(2*ra)) * sin(2*dec)
            - 2*(ER_22 * sin(2*ra) + EI_22 * cos(2*ra)) * cos(dec)][0]
+    # The same partials as in 'Jac_mat_deg02'
     ddec = [+E_20 * sin(2 * dec)
-            - (MR_21 * sin(ra) + MI_21 * cos(ra)) * sin(dec)
-            - (ER_21 * cos(ra) - EI_21 * sin(ra)) * cos(2*dec)
-            + 2*(MR_22*sin(2*ra) + MI_22 * cos(2*ra)) * cos(dec)
-            - (ER_22 * cos(2*ra) - EI_22 * sin(2*ra)) * sin(2*dec)][0]
+            - (MR_21 * cos(ra) + MI_21 * sin(ra)) * sin(dec)
+            + (ER_21 * sin(ra) - EI_21 * cos(ra)) * cos(2*dec)
+            + 2*(MR_22 * cos(2*ra) + MI_22 * sin(2*ra)) * cos(dec)
+            + (ER_22 * sin(2*ra) - EI_22 * cos(2*ra)) * sin(2*dec)][0]
 
     return dra, ddec
 
@@ -521,43 +560,68 @@ def VSH_deg02(dRA, dDE, e_dRA, e_dDE, cov, RA, DE):
     # Jacobian matrix and its transpose.
     JacMat, JacMatT = Jac_mat_deg02(RA, DE)
 
-    # Weighted matrix.
-    WgtMat = wgt_mat(e_dRA, e_dDE, cov)
-
     # Calculate matrix A and b of matrix equation:
     # A * x = b.
-    A = np.dot(np.dot(JacMatT, WgtMat), JacMat)
-    dPos = np.hstack((dRA, dDE))
-    b = np.dot(np.dot(JacMatT, WgtMat),  dPos)
+    # The weight matrix is block-diagonal so it is used block by block.
+    A, b = normal_eqn_calc(JacMat, dRA, dDE, e_dRA, e_dDE, cov)
 
     # Solve the equations.
     # x = (d1, d2, d3,
     # r1, r2, r3,
     # ER_22, EI_22, ER_21, EI_21, E_20,
     # MR_22, MI_22, MR_21, MI_21, M_20)
-    x = np.linalg.solve(A, b)
-
-    # Covariance.
-    cov = np.linalg.inv(A)
-    sig = np.sqrt(cov.diagonal())
-
-    # Correlation coefficient.
-    corrmat = np.array([cov[i, j] / sig[i] / sig[j]
-                        for j in range(len(x))
-                        for i in range(len(x))])
-    corrmat.resize((len(x), len(x)))
+    x, sig, corrmat = normal_eqn_solve(A, b)
 
     # Return the result.
     return x, sig, corrmat
 
 
+# ---------------------------------------------------
+def VSH_deg02_chunk(chunks):
+    '''The 2nd degree of VSH function fitted on data read chunk by chunk.
+
+    The normal equation is accumulated chunk by chunk, so only one chunk
+    needs to be in memory at a time. No outlier is eliminated.
+
+    Parameters
+    ----------
+    chunks : iterable
+        every item is a tuple of (dRA, dDE, e_dRA, e_dDE, cov, RA, DE),
+        see function 'VSH_deg02' for the meaning; cov may be None
+
+    Returns
+    ----------
+    x : array of float
+        estimaation of (d1, d2, d3,
+                        r1, r2, r3,
+                        ER_22, EI_22, ER_21, EI_21, E_20,
+                        MR_22, MI_22, MR_21, MI_21, M_20) in uas
+    sig : array of float
+        uncertainty of x in uas
+    corrmat : matrix
+        matrix of correlation coefficient.
+    num : int
+        number of sources used
+    '''
+
+    A, b, num = normal_eqn_accum(chunks, Jac_mat_deg02)
+
+    x, sig, corrmat = normal_eqn_solve(A, b)
+
+    return x, sig, corrmat, num
+
+
 # ----------------------------------------------------
 # def VSHdeg02_fitting(dRA, dDE, e_dRA, e_dDE, cor, RA, DE):
 # def VSHdeg02_fitting(dRA, dDE, e_dRA, e_dDE, cor, RA, DE, flog):
 def VSHdeg02_fitting(dRA, dDE, e_dRA, e_dDE, cov, RA, DE, flog,
-                     elim_flag="sigma", N=3.0):
+                     elim_flag="sigma", N=3.0, JacMat=None,
+                     return_wgt=False):
     '''2rd-degree vsh fitting.
 
+    The quadrupole terms are those of 'Jac_mat_deg02', which differ from
+    'vsh_degl_cor.vsh_fit' (see the notice above).
+
     Parameters
     ----------
     dRA/dDE : array of float
@@ -576,10 +640,20 @@ def VSHdeg02_fitting(dRA, dDE, e_dRA, e_dDE, cov, RA, DE, flog,
         "norsep" uses normalized seperation as the criteria
         "nor_ang" uses both normalized and angular seperation as the criteria
         "None" or "none" doesn't use any criteria
+        "huber" or "cauchy" doesn't remove any source but downweights them
+            by iteratively reweighted least squares with the loss function
+            (see 'normal_eqn.normal_eqn_irls'); sources whose normalized
+            residuals are larger than N are reported as outliers
     N : float
         N-sigma principle for eliminating the outliers
         or
         the maximum seperation (uas)
+    JacMat : matrix
+        Jacobian matrix of (RA, DE), default is None to take it from
+        the cache (see 'jac_cache'); for a subset of a catalog it could
+        be the rows of the cached matrix of the whole catalog
+    return_wgt : Boolean
+        True to also return the weight of every source, default False
 
     Returns
     ----------
@@ -593,6 +667,9 @@ def VSHdeg02_fitting(dRA, dDE, e_dRA, e_dDE, cov, RA, DE, flog,
         index of outliers
     dRAres/dDEres: array of float
         residual array of dRA(*cos(Dec))/dDec in uas.
+    wgt : array of float
+        weight of every source (0 for eliminated ones), only returned
+        if return_wgt is True
     '''
 
     # # Calculate the apriori wrms
@@ -625,38 +702,36 @@ def VSHdeg02_fitting(dRA, dDE, e_dRA, e_dDE, cov, RA, DE, flog,
     #       calc_2Dchi2(dRA, e_dRA, dDE, e_dDE, cov, reduced=True),
     #       file=flog)
 
+    # Jacobian matrix, reused if the same sources were fitted before.
+    if JacMat is None:
+        JacMat, _ = jac_mat_cache(Jac_mat_deg02, RA, DE)
+
     # Now we can use different criteria of elimination.
     if elim_flag is "None" or elim_flag is "none":
-        x, sig, corrmat = VSH_deg02(dRA, dDE, e_dRA, e_dDE, cov, RA, DE)
+        A, b = normal_eqn_calc(JacMat, dRA, dDE, e_dRA, e_dDE, cov)
+        x, sig, corrmat = normal_eqn_solve(A, b)
         ind_go = np.arange(dRA.size)
 
     elif elim_flag is "sigma":
-        x, sig, corrmat = VSH_deg02(dRA, dDE, e_dRA, e_dDE, cov, RA, DE)
-        # Iteration.
-        num1 = 1
-        num2 = 0
-        while(num1 != num2):
-            num1 = num2
-
-            # Calculate the residual. ( O - C )
-            rRA, rDE = residual_calc02(dRA, dDE, RA, DE, x)
-            ind_go = elim_nsigma(rRA, rDE, N, wgt_flag=True,
-                                 y1_err=e_dRA, y2_err=e_dDE)
-            # ind_go = elim_nsigma(rRA, rDE, N)
-            num2 = dRA.size - ind_go.size
-            # num2 = dRA.size - len(ind_go)
-
-            dRAn, dDEn, e_dRAn, e_dDEn, covn, RAn, DEn = find_good_obs(
-                dRA, dDE, e_dRA, e_dDE, cov, RA, DE, ind_go)
-
-            xn, sign, corrmatn = VSH_deg02(dRAn, dDEn, e_dRAn, e_dDEn,
-                                           covn, RAn, DEn)
-
-            x, sig, corrmat = xn, sign, corrmatn
-            print('# Number of sample: %d' % (dRA.size-num2),
-                  file=flog)
+        # The normal equation is updated by the change of outliers,
+        # instead of being rebuilt at each iteration.
+        x, sig, corrmat, ind_go = normal_eqn_elim(
+            JacMat, dRA, dDE, e_dRA, e_dDE, cov,
+            lambda rRA, rDE: elim_nsigma(rRA, rDE, N, wgt_flag=True,
+                                         y1_err=e_dRA, y2_err=e_dDE),
+            flog)
+    elif elim_flag in ["huber", "cauchy"]:
+        # No source is removed, so there is no oscillation of outliers.
+        x, sig, corrmat, wgt, Xres = normal_eqn_irls(
+            JacMat, dRA, dDE, e_dRA, e_dDE, cov, elim_flag, flog=flog)
+        ind_go = np.where(Xres <= N)[0]
     else:
-        ang_sep, X_a, X_d, X = nor_sep_calc(dRA, dDE, e_dRA, e_dDE, cov)
+        if cov is None:
+            C = np.zeros_like(dRA)
+        else:
+            C = cov / e_dRA / e_dDE
+
+        ang_sep, X_a, X_d, X, _ = nor_sep_calc(dRA, e_dRA, dDE, e_dDE, C)
 
         if elim_flag is "angsep":
             ind_go = elim_angsep(ang_sep, N)
@@ -672,15 +747,17 @@ def VSHdeg02_fitting(dRA, dDE, e_dRA, e_dDE, cov, RA, DE, flog,
             exit()
 
         # Find all good observations
-        dRAn, dDEn, e_dRAn, e_dDEn, covn, RAn, DEn = find_good_obs(
-            dRA, dDE, e_dRA, e_dDE, cov, RA, DE, ind_go)
-        x, sig, corrmat = VSH_deg02(dRAn, dDEn, e_dRAn, e_dDEn, covn,
-                                    RAn, DEn)
-        print('# Number of sample: %d' % (dRA.size-num2),
+        ind_go = np.ravel(ind_go)
+        A, b = normal_eqn_subset(JacMat, dRA, dDE, e_dRA, e_dDE, cov,
+                                 ind_go)
+        x, sig, corrmat = normal_eqn_solve(A, b)
+        print('# Number of sample: %d' % ind_go.size,
               file=flog)
 
     ind_outl = np.setxor1d(np.arange(dRA.size), ind_go)
-    dRAres, dDEres = residual_calc02(dRA, dDE, RA, DE, x)
+    # The same residuals as those used for the elimination
+    dRAres, dDEres = np.resize(np.hstack((dRA, dDE)) - np.dot(JacMat, x),
+                               (2, dRA.size))
 
     # # Calculate the posteriori wrms
     # meanRA, wrmsRA, stdRA = calc_wrms(dRAres, e_dRA)
@@ -713,6 +790,12 @@ def VSHdeg02_fitting(dRA, dDE, e_dRA, e_dDE, cov, RA, DE, flog,
     #       file=flog)
 
     # return x, sig, corrmat
+    if return_wgt:
+        if elim_flag not in ["huber", "cauchy"]:
+            wgt = np.zeros(dRA.size)
+            wgt[ind_go] = 1
+        return x, sig, corrmat, ind_outl, dRAres, dDEres, wgt
+
     return x, sig, corrmat, ind_outl, dRAres, dDEres
 
 
@@ -892,5 +975,5 @@ def test_code():
     '''
 
 
-test_code()
+# test_code()
 # -------------------- END -----------------------------------
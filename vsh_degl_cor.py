@@ -0,0 +1,471 @@
+# !/usr/bin/env python3
+# -*- coding: utf-8 -*-
+# File name: vsh_degl_cor.py
+"""
+Created on Sun Oct 18 15:20:47 2026
+
+@author: Neo(liuniu@smail.nju.edu.cn)
+
+VSH function of an arbitrary degree.
+The full covariance matrix is used.
+
+# Notice !!!
+# unit for RA and DE are rad.
+
+The basis of degree l and order m is built from the real spherical
+harmonics
+    Y_lm = sqrt(2 - delta_m0) * P_lm(sin(DE)) * (cos(m*RA) or sin(m*RA))
+where P_lm is the fully normalized associated Legendre function, as
+    toroidal (magnetic) : (dY/dDE, -dY/dRA / cos(DE))
+    spheroidal (electric): (dY/dRA / cos(DE), dY/dDE)
+scaled by sqrt(8 * pi / 3 / l / (l + 1)), so that all the vector fields
+share the same norm and those of degree 1 are exactly the glide and
+rotation used in "vsh_deg1_cor".
+
+P_lm / cos(DE) and dP_lm / dDE are computed with the stable recurrences
+on l, so the basis is well defined at the poles and for a high degree.
+
+For each degree l the parameters are ordered as
+    E_{l,l}^Re, E_{l,l}^Im, ..., E_{l,1}^Re, E_{l,1}^Im, E_{l,0},
+    M_{l,l}^Re, M_{l,l}^Im, ..., M_{l,1}^Re, M_{l,1}^Im, M_{l,0},
+so that degree 1 gives (g1, g2, g3, r1, r2, r3).
+
+The basis of degree 2 is not the same as 'vsh_deg2_cor.Jac_mat_deg02',
+whose quadrupole terms of order m = 1 and 2 are not true VSH fields and
+whose zonal terms are scaled differently. So the results of degree 2 (or
+higher) are not comparable with those of 'vsh_deg2_cor.VSHdeg02_fitting'
+or 'VSH_analysis'; those of degree 1 are the same.
+
+"""
+
+import numpy as np
+from numpy import sin, cos, pi
+from nor_sep import nor_sep_calc
+from normal_eqn import normal_eqn_calc, normal_eqn_accum, normal_eqn_solve, \
+    normal_eqn_elim, normal_eqn_subset, normal_eqn_irls
+from jac_cache import jac_mat_cache
+from vsh_deg2_cor import elim_nsigma, elim_angsep, elim_norsep
+
+
+__all__ = ["vsh_par_name", "vsh_par_num", "legendre_calc", "vsh_basis_calc",
+           "vsh_func_calc", "residual_calc", "vsh_fit", "vsh_fit_chunk"]
+
+
+# ------------------ FUNCTION --------------------------------
+def vsh_par_num(degree):
+    '''Number of VSH parameters up to a given degree.
+
+    Parameters
+    ----------
+    degree : int
+        maximum degree of the VSH functions
+
+    Returns
+    ----------
+    num : int
+        number of parameters
+    '''
+
+    return 2 * degree * (degree + 2)
+
+
+# ---------------------------------------------------
+def vsh_par_name(degree):
+    '''Name of VSH parameters up to a given degree.
+
+    Parameters
+    ----------
+    degree : int
+        maximum degree of the VSH functions
+
+    Returns
+    ----------
+    names : list of string
+        name of parameters, in the same order as the estimation
+    '''
+
+    names = []
+
+    for l in range(1, degree + 1):
+        for typ in ["E", "M"]:
+            for m in range(l, 0, -1):
+                names.append("%s_{%d,%d}^{\\rm Re}" % (typ, l, m))
+                names.append("%s_{%d,%d}^{\\rm Im}" % (typ, l, m))
+            names.append("%s_{%d,0}" % (typ, l))
+
+    return names
+
+
+# ---------------------------------------------------
+def legendre_calc(DE, degree):
+    '''Calculate P_lm / cos(DE) and dP_lm / dDE by recurrences.
+
+    Parameters
+    ----------
+    DE : array of float
+        declination in radian
+    degree : int
+        maximum degree of the VSH functions
+
+    Returns
+    ----------
+    fac1 : dict
+        fac1[l, m] is P_lm(sin(DE)) / cos(DE) for 1 <= m <= l
+    fac2 : dict
+        fac2[l, m] is dP_lm(sin(DE)) / dDE for 0 <= m <= l
+    '''
+
+    x, c = sin(DE), cos(DE)
+
+    # P_lm / cos(DE) for l >= m >= 1
+    fac1 = {}
+
+    for m in range(1, degree + 1):
+        # Sectorial term
+        if m == 1:
+            fac1[1, 1] = np.full_like(DE, np.sqrt(3. / 8 / pi))
+        else:
+            fac1[m, m] = fac1[m - 1, m - 1] * c * np.sqrt((2*m + 1) / 2. / m)
+
+        # Recurrence on l
+        for l in range(m + 1, degree + 1):
+            a = np.sqrt((4. * l**2 - 1) / (l**2 - m**2))
+            fac1[l, m] = a * x * fac1[l - 1, m]
+
+            if l > m + 1:
+                b = np.sqrt((2*l + 1.) * ((l - 1)**2 - m**2)
+                            / (2*l - 3) / (l**2 - m**2))
+                fac1[l, m] = fac1[l, m] - b * fac1[l - 2, m]
+
+    # dP_lm / dDE
+    fac2 = {}
+
+    for l in range(1, degree + 1):
+        fac2[l, 0] = np.sqrt(l * (l + 1.)) * c * fac1[l, 1]
+
+        for m in range(1, l + 1):
+            fac2[l, m] = - l * x * fac1[l, m]
+
+            if l > m:
+                fac2[l, m] = fac2[l, m] + np.sqrt(
+                    (2*l + 1.) / (2*l - 1) * (l - m) * (l + m)) \
+                    * fac1[l - 1, m]
+
+    return fac1, fac2
+
+
+# ---------------------------------------------------
+def vsh_basis_calc(RA, DE, degree):
+    '''Generate the Jacobian matrix of VSH functions up to a given degree.
+
+    Parameters
+    ----------
+    RA : array of float
+        right ascension in radian
+    DE : array of float
+        declination in radian
+    degree : int
+        maximum degree of the VSH functions
+
+    Returns
+    ----------
+    JacMat/JacMatT : matrix
+        Jacobian matrix and its transpose matrix
+    '''
+
+    fac1, fac2 = legendre_calc(DE, degree)
+
+    num = RA.size
+    JacMat = np.empty((2 * num, vsh_par_num(degree)))
+
+    # cos(m*RA) and sin(m*RA)
+    cosm = [cos(m * RA) for m in range(degree + 1)]
+    sinm = [sin(m * RA) for m in range(degree + 1)]
+
+    col = 0
+    for l in range(1, degree + 1):
+        scale = np.sqrt(8. * pi / 3 / l / (l + 1))
+
+        # Partial of dRA and dDE for each term (electric type)
+        parE = []
+        for m in range(l, 0, -1):
+            # d Y / d RA / cos(DE) and d Y / d DE
+            # real part
+            parE.append((-m * fac1[l, m] * sinm[m], fac2[l, m] * cosm[m]))
+            # imaginary part
+            parE.append((m * fac1[l, m] * cosm[m], fac2[l, m] * sinm[m]))
+
+        parE.append((np.zeros_like(RA), fac2[l, 0] / np.sqrt(2)))
+
+        # Spheroidal
+        for par1, par2 in parE:
+            JacMat[:num, col] = par1
+            JacMat[num:, col] = par2
+            col += 1
+
+        # Toroidal
+        for par1, par2 in parE:
+            JacMat[:num, col] = par2
+            JacMat[num:, col] = -par1
+            col += 1
+
+        JacMat[:, col - 2*(2*l + 1):col] *= scale * np.sqrt(2)
+
+    JacMatT = np.transpose(JacMat)
+
+    return JacMat, JacMatT
+
+
+# ---------------------------------------------------
+def vsh_func_calc(ra, dec, param, degree):
+    '''VSH function up to a given degree.
+
+    Parameters
+    ----------
+    ra/dec : array of float
+        Right ascension/Declination in radian
+    param : array of float
+        VSH parameters, see function 'vsh_par_name' for the order
+    degree : int
+        maximum degree of the VSH functions
+
+    Returns
+    ----------
+    dra/ddec : array of float
+        R.A.(*cos(Dec.))/Dec. differences in uas
+    '''
+
+    JacMat, _ = vsh_basis_calc(ra, dec, degree)
+    dra, ddec = np.resize(np.dot(JacMat, param), (2, ra.size))
+
+    return dra, ddec
+
+
+# ---------------------------------------------------
+def residual_calc(dRA, dDE, RA, DE, param, degree):
+    '''Calculate the residuals of RA/Dec
+
+    Parameters
+    ----------
+    dRA/dDE : array of float
+        R.A.(*cos(Dec.))/Dec. differences in uas
+    RA/DE : array of float
+        Right ascension/Declination in radian
+    param : array of float
+        VSH parameters, see function 'vsh_par_name' for the order
+    degree : int
+        maximum degree of the VSH functions
+
+    Returns
+    ----------
+    ResRA/ResDE : array of float
+        residual array of dRA(*cos(Dec))/dDec in uas.
+    '''
+
+    # Theoritical value
+    dra, ddec = vsh_func_calc(RA, DE, param, degree)
+
+    # Calculate the residual. ( O - C )
+    ResRA, ResDE = dRA - dra, dDE - ddec
+
+    return ResRA, ResDE
+
+
+# ----------------------------------------------------
+def vsh_fit(dRA, dDE, e_dRA, e_dDE, RA, DE, flog=None, cov=None, degree=2,
+            elim_flag="none", N=3.0, JacMat=None, return_wgt=False):
+    '''VSH fitting up to a given degree.
+
+    Parameters
+    ----------
+    dRA/dDE : array of float
+        R.A.(*cos(Dec.))/Dec. differences in uas
+    e_dRA/e_dDE : array of float
+        formal uncertainty of dRA(*cos(DE))/dDE in uas
+    RA/DE : array of float
+        Right ascension/Declination in radian
+    flog :
+        handlings of output file, default is None (no output).
+    cov : array of float
+        covariance between dRA and dDE in uas^2, default is None
+    degree : int
+        maximum degree of the VSH functions, default is 2
+    elim_flag : string
+        "sigma" uses n-sigma principle
+        "angsep" uses angular seperation as the criteria
+        "norsep" uses normalized seperation as the criteria
+        "nor_ang" uses both normalized and angular seperation as the criteria
+        "None" or "none" doesn't use any criteria
+        "huber" or "cauchy" doesn't remove any source but downweights them
+            by iteratively reweighted least squares with the loss function
+            (see 'normal_eqn.normal_eqn_irls'); sources whose normalized
+            residuals are larger than N are reported as outliers
+    N : float
+        N-sigma principle for eliminating the outliers
+        or
+        the maximum seperation (uas)
+    JacMat : matrix
+        Jacobian matrix of (RA, DE), default is None to take it from
+        the cache (see 'jac_cache')
+    return_wgt : Boolean
+        True to also return the weight of every source, default False
+
+    Returns
+    ----------
+    x : array of float
+        estimation of VSH parameters in uas,
+        see function 'vsh_par_name' for the order
+    sig : array of float
+        uncertainty of x in uas
+    corrmat : matrix
+        matrix of correlation coefficient.
+    ind_outl : array of int
+        index of outliers
+    dRAres/dDEres: array of float
+        residual array of dRA(*cos(Dec))/dDec in uas.
+    wgt : array of float
+        weight of every source (0 for eliminated ones), only returned
+        if return_wgt is True
+    '''
+
+    # Jacobian matrix, computed only once for the same sources.
+    if JacMat is None:
+        JacMat, _ = jac_mat_cache(vsh_basis_calc, RA, DE, degree)
+
+    # Now we can use different criteria of elimination.
+    if elim_flag in ["None", "none"]:
+        ind_go = np.arange(dRA.size)
+
+    elif elim_flag == "sigma":
+        x, sig, corrmat, ind_go = normal_eqn_elim(
+            JacMat, dRA, dDE, e_dRA, e_dDE, cov,
+            lambda rRA, rDE: elim_nsigma(rRA, rDE, N, wgt_flag=True,
+                                         y1_err=e_dRA, y2_err=e_dDE),
+            flog)
+
+    elif elim_flag in ["huber", "cauchy"]:
+        # No source is removed, so there is no oscillation of outliers.
+        x, sig, corrmat, wgt, Xres = normal_eqn_irls(
+            JacMat, dRA, dDE, e_dRA, e_dDE, cov, elim_flag, flog=flog)
+        ind_go = np.where(Xres <= N)[0]
+
+    else:
+        if cov is None:
+            C = np.zeros_like(dRA)
+        else:
+            C = cov / e_dRA / e_dDE
+
+        ang_sep, X_a, X_d, X, _ = nor_sep_calc(dRA, e_dRA, dDE, e_dDE, C)
+
+        if elim_flag == "angsep":
+            ind_go = elim_angsep(ang_sep, N)[0]
+        elif elim_flag == "norsep":
+            ind_go = elim_norsep(X, N)[0]
+        elif elim_flag == "nor_ang":
+            ind_go_nor = elim_norsep(X, N)
+            ind_go_ang = elim_angsep(ang_sep, N)
+            ind_go = np.intersect1d(ind_go_nor, ind_go_ang)
+        else:
+            print("ERROR: elim_flag can only be sigma, angsep, norsep,"
+                  " or nor_ang!")
+            exit()
+
+    if elim_flag not in ["sigma", "huber", "cauchy"]:
+        if ind_go.size == dRA.size:
+            A, b = normal_eqn_calc(JacMat, dRA, dDE, e_dRA, e_dDE, cov)
+        else:
+            A, b = normal_eqn_subset(JacMat, dRA, dDE, e_dRA, e_dDE, cov,
+                                     ind_go)
+
+        x, sig, corrmat = normal_eqn_solve(A, b)
+
+    if flog is not None:
+        print('# Number of sample: %d' % ind_go.size, file=flog)
+
+    ind_outl = np.setxor1d(np.arange(dRA.size), ind_go)
+    dRAres, dDEres = np.resize(np.hstack((dRA, dDE)) - np.dot(JacMat, x),
+                               (2, dRA.size))
+
+    if return_wgt:
+        if elim_flag not in ["huber", "cauchy"]:
+            wgt = np.zeros(dRA.size)
+            wgt[ind_go] = 1
+        return x, sig, corrmat, ind_outl, dRAres, dDEres, wgt
+
+    return x, sig, corrmat, ind_outl, dRAres, dDEres
+
+
+# ---------------------------------------------------
+def vsh_fit_chunk(chunks, degree=2):
+    '''VSH fitting up to a given degree on data read chunk by chunk.
+
+    The normal equation is accumulated chunk by chunk, so only one chunk
+    needs to be in memory at a time. No outlier is eliminated.
+
+    Parameters
+    ----------
+    chunks : iterable
+        every item is a tuple of (dRA, dDE, e_dRA, e_dDE, cov, RA, DE),
+        see function 'vsh_fit' for the meaning; cov may be None
+    degree : int
+        maximum degree of the VSH functions, default is 2
+
+    Returns
+    ----------
+    x : array of float
+        estimation of VSH parameters in uas,
+        see function 'vsh_par_name' for the order
+    sig : array of float
+        uncertainty of x in uas
+    corrmat : matrix
+        matrix of correlation coefficient.
+    num : int
+        number of sources used
+    '''
+
+    A, b, num = normal_eqn_accum(
+        chunks, lambda RA, DE: vsh_basis_calc(RA, DE, degree))
+
+    x, sig, corrmat = normal_eqn_solve(A, b)
+
+    return x, sig, corrmat, num
+
+
+# ----------------------------------------------------
+def test_code():
+    '''Code testing
+    '''
+
+    # Check with the 1st degree VSH functions.
+    from vsh_deg1_cor import Jac_mat_deg01, VSH_deg01
+
+    Num = 2000
+    np.random.seed(2382)
+    RA = np.random.uniform(0, 2 * pi, Num)
+    DE = np.arcsin(np.random.uniform(-1, 1, Num))
+
+    # Degree 1 is exactly the glide and rotation
+    JacMat1, _ = Jac_mat_deg01(RA, DE)
+    JacMat, _ = vsh_basis_calc(RA, DE, 1)
+    print("Max. difference for degree 1: ", np.max(np.fabs(JacMat - JacMat1)))
+
+    dRA = np.random.normal(0, 10, Num) + 5 * cos(DE)
+    dDE = np.random.normal(0, 10, Num)
+    err1, err2 = np.random.uniform(5, 10, (2, Num))
+    cov = np.random.uniform(-0.5, 0.5, Num) * err1 * err2
+    x1, sig1, _ = VSH_deg01(dRA, dDE, err1, err2, RA, DE, cov)
+    x, sig, _, _, _, _ = vsh_fit(dRA, dDE, err1, err2, RA, DE,
+                                 cov=cov, degree=1)
+    print("Glide and rotation (VSH_deg01): ", x1)
+    print("Glide and rotation (vsh_fit):   ", x)
+
+    # Orthogonality of the basis over an uniform sky
+    JacMat, _ = vsh_basis_calc(RA, DE, 10)
+    A = np.dot(JacMat.T, JacMat) / Num
+    print("Max. off-diagonal term for degree 10: ",
+          np.max(np.fabs(A - np.diag(A.diagonal()))),
+          "diagonal term: ", A.diagonal().mean())
+
+
+# test_code()
+# -------------------- END -----------------------------------
@@ -0,0 +1,298 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+# File name: vsh_resample.py
+"""
+Created on Sun Oct 18 23:12:40 2026
+
+@author: Neo(liuniu@smail.nju.edu.cn)
+
+Uncertainties of the VSH (or rotation) parameters from resampling the
+sources, as a complement to the formal errors.
+
+Three methods are supported:
+    "bootstrap" : draw N sources with replacement;
+    "jackknife" : delete d sources (all the N subsets for d = 1, or
+                  randomly chosen subsets for d > 1);
+    "halfsplit" : split the sources randomly into two halves and fit
+                  each of them, like the even/odd or decimation tests.
+
+The contributions of every source to the normal equation are computed
+only once (see 'normal_eqn.normal_eqn_src'). The normal equation of a
+replicate is the sum of these contributions weighted by the number of
+times each source is drawn, so a batch of replicates only costs one
+matrix product and a batch of M x M solutions. The batches are run on a
+process pool if nproc > 1.
+
+The outliers should be removed before, e.g., by 'VSHdeg01_fitting', since
+no elimination is done for the replicates.
+
+History
+N. Liu, 18 Oct 2026: the normal equations of the replicates are solved by
+                     Cholesky decomposition (see
+                     'normal_eqn.normal_eqn_solve_batch'); an unknown
+                     method raises ValueError before the pool is created.
+
+"""
+
+import numpy as np
+from multiprocessing import Pool
+from normal_eqn import normal_eqn_src, normal_eqn_solve, \
+    normal_eqn_solve_batch
+from jac_cache import jac_mat_cache
+from vsh_deg1_cor import Jac_mat_deg01
+from vsh_deg2_cor import Jac_mat_deg02
+from vsh_degl_cor import vsh_basis_calc
+
+
+__all__ = ["resample_weight", "resample_solve", "resample_fit",
+           "vsh_resample"]
+
+
+# Number of replicates computed at a time
+BATCH_SIZE = 256
+
+# Resampling methods
+METHODS = ("bootstrap", "jackknife", "halfsplit")
+
+# Contributions of every source, shared by the workers
+_src_eqn = {}
+
+
+# -----------------------------  FUNCTIONS -----------------------------
+def resample_weight(num, method, num_rep, rng, d=1):
+    '''Generate the number of times that each source is used.
+
+    Parameters
+    ----------
+    num : int
+        number of sources
+    method : string
+        "bootstrap", "jackknife" (randomly deleting d sources) or
+        "halfsplit"
+    num_rep : int
+        number of replicates
+    rng : numpy.random.Generator
+        random generator
+    d : int
+        number of deleted sources for "jackknife"
+
+    Returns
+    ----------
+    wgt : array of float
+        weight of each source, of shape (num_rep, num)
+    '''
+
+    if method == "bootstrap":
+        ind = rng.integers(0, num, size=(num_rep, num))
+        ind += np.arange(num_rep)[:, None] * num
+        wgt = np.bincount(ind.ravel(), minlength=num_rep*num).reshape(
+            num_rep, num).astype(float)
+
+    elif method == "jackknife":
+        wgt = np.ones((num_rep, num))
+        for i in range(num_rep):
+            wgt[i, rng.choice(num, d, replace=False)] = 0
+
+    elif method == "halfsplit":
+        wgt = np.zeros((num_rep, num))
+        for i in range(num_rep):
+            wgt[i, rng.permutation(num)[:num // 2]] = 1
+
+    else:
+        raise ValueError("method should be one of %s, not '%s'" %
+                         (", ".join(METHODS), method))
+
+    return wgt
+
+
+def resample_solve(Ai, bi, wgt):
+    '''Solve the normal equations of a batch of replicates.
+
+    Parameters
+    ----------
+    Ai/bi : array of float
+        contribution of every source, see 'normal_eqn.normal_eqn_src'
+    wgt : array of float
+        weight of each source of every replicate, of shape (R, N)
+
+    Returns
+    ----------
+    x : array of float
+        estimation of the parameters of every replicate, of shape (R, M)
+    '''
+
+    num, npar = bi.shape
+
+    A = np.dot(wgt, Ai.reshape(num, -1)).reshape(-1, npar, npar)
+    b = np.dot(wgt, bi)
+
+    return normal_eqn_solve_batch(A, b)
+
+
+def _init_worker(Ai, bi):
+    '''Keep the contributions of sources in a worker.
+    '''
+
+    _src_eqn["Ai"], _src_eqn["bi"] = Ai, bi
+
+
+def _batch_worker(args):
+    '''Fit a batch of replicates in a worker.
+    '''
+
+    method, num_rep, d, seed = args
+
+    Ai, bi = _src_eqn["Ai"], _src_eqn["bi"]
+    rng = np.random.default_rng(seed)
+    wgt = resample_weight(bi.shape[0], method, num_rep, rng, d)
+
+    x = resample_solve(Ai, bi, wgt)
+
+    if method == "halfsplit":
+        # The other half
+        return x, resample_solve(Ai, bi, 1 - wgt)
+
+    return x, None
+
+
+def resample_fit(JacMat, dRA, dDE, e_dRA, e_dDE, cov=None,
+                 method="bootstrap", num_rep=1000, d=1, nproc=1,
+                 seed=None, flog=None):
+    '''Estimate the uncertainties of the parameters by resampling.
+
+    Parameters
+    ----------
+    JacMat : matrix
+        Jacobian matrix of shape (2N, M), rows of dRA before rows of dDE
+    dRA/dDE : array of float
+        R.A.(*cos(Dec.))/Dec. differences in uas
+    e_dRA/e_dDE : array of float
+        formal uncertainty of dRA(*cos(DE))/dDE in uas
+    cov : array of float
+        covariance between dRA and dDE in uas^2, default is None
+    method : string
+        "bootstrap", "jackknife" or "halfsplit", default "bootstrap"
+    num_rep : int
+        number of replicates, default 1000; not used for the jackknife
+        with d = 1, where all the N subsets are used
+    d : int
+        number of sources deleted for the jackknife, default 1
+    nproc : int
+        number of processes, None for the number of CPUs, default 1
+    seed : int
+        seed of the random generator, default None
+    flog :
+        handlings of output file, default is None (no output).
+
+    Returns
+    ----------
+    x : array of float
+        estimation of the parameters using all sources
+    sig : array of float
+        uncertainty of x from the replicates
+    x_rep : array of float
+        estimation of every replicate, of shape (num_rep, M); for
+        "halfsplit" the differences between the two halves
+    '''
+
+    # Check it before the workers are created
+    if method not in METHODS:
+        raise ValueError("method should be one of %s, not '%s'" %
+                         (", ".join(METHODS), method))
+
+    num = dRA.size
+
+    Ai, bi = normal_eqn_src(JacMat, dRA, dDE, e_dRA, e_dDE, cov)
+    A, b = Ai.sum(axis=0), bi.sum(axis=0)
+    x, sig_f, _ = normal_eqn_solve(A, b)
+
+    if method == "jackknife" and d == 1:
+        # All the N subsets leaving one source out
+        x_rep = np.vstack([
+            normal_eqn_solve_batch(A - Ai[i:i+BATCH_SIZE],
+                                   b - bi[i:i+BATCH_SIZE])
+            for i in range(0, num, BATCH_SIZE)])
+        num_rep = num
+
+    else:
+        # Independent random streams for the batches, so that the result
+        # does not depend on the number of processes.
+        sizes = [min(BATCH_SIZE, num_rep - i)
+                 for i in range(0, num_rep, BATCH_SIZE)]
+        seeds = np.random.SeedSequence(seed).spawn(len(sizes))
+        tasks = [(method, size, d, seedi)
+                 for size, seedi in zip(sizes, seeds)]
+
+        if nproc == 1:
+            _init_worker(Ai, bi)
+            results = [_batch_worker(task) for task in tasks]
+        else:
+            with Pool(nproc, initializer=_init_worker,
+                      initargs=(Ai, bi)) as pool:
+                results = pool.map(_batch_worker, tasks)
+
+        x_rep = np.vstack([res[0] for res in results])
+        if method == "halfsplit":
+            x_rep = x_rep - np.vstack([res[1] for res in results])
+
+    x_dev = x_rep - x_rep.mean(axis=0)
+
+    if method == "bootstrap":
+        sig = np.sqrt(np.sum(x_dev**2, axis=0) / (num_rep - 1))
+    elif method == "jackknife":
+        # Delete-d jackknife variance (d = 1 for the classical one)
+        sig = np.sqrt((num - d) / d / num_rep * np.sum(x_dev**2, axis=0))
+    else:
+        # Each half has twice the variance of the full sample, so the
+        # difference between the two halves has four times.
+        sig = np.sqrt(np.sum(x_dev**2, axis=0) / (num_rep - 1)) / 2
+
+    if flog is not None:
+        print("# Resampling (%s) with %d replicates on %d sources" %
+              (method, num_rep, num), file=flog)
+        print("# Estimation  Formal error  Resampling error", file=flog)
+        for xi, sigfi, sigi in zip(x, sig_f, sig):
+            print("%+10.3f  %10.3f  %10.3f" % (xi, sigfi, sigi), file=flog)
+
+    return x, sig, x_rep
+
+
+def vsh_resample(dRA, dDE, e_dRA, e_dDE, RA, DE, cov=None, degree=1,
+                 fit_type="full", **kwargs):
+    '''Resampling for the VSH parameters.
+
+    The parameters are the same as those of 'VSHdeg01_fitting' (degree 1),
+    'VSHdeg02_fitting' (degree 2) or 'vsh_degl_cor.vsh_fit'.
+
+    Parameters
+    ----------
+    dRA/dDE : array of float
+        R.A.(*cos(Dec.))/Dec. differences in uas
+    e_dRA/e_dDE : array of float
+        formal uncertainty of dRA(*cos(DE))/dDE in uas
+    RA/DE : array of float
+        Right ascension/Declination in radian
+    cov : array of float
+        covariance between dRA and dDE in uas^2, default is None
+    degree : int
+        maximum degree of the VSH functions, default is 1
+    fit_type : string
+        "full", "rotation" or "glide", only for degree 1
+    kwargs :
+        method, num_rep, d, nproc, seed, flog, see 'resample_fit'
+
+    Returns
+    ----------
+    x, sig, x_rep :
+        see 'resample_fit'
+    '''
+
+    if degree == 1:
+        JacMat, _ = jac_mat_cache(Jac_mat_deg01, RA, DE, fit_type)
+    elif degree == 2:
+        JacMat, _ = jac_mat_cache(Jac_mat_deg02, RA, DE)
+    else:
+        JacMat, _ = jac_mat_cache(vsh_basis_calc, RA, DE, degree)
+
+    return resample_fit(JacMat, dRA, dDE, e_dRA, e_dDE, cov, **kwargs)
+# --------------------------------- END --------------------------------
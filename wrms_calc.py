@@ -11,13 +11,20 @@ post-fit wrms, reduced-chi square, and standard deviation.
 
 3 Mar 2018, Niu : now function 'calc_wrms' also computes the standard
                   deviation
+18 Oct 2026, Niu : function 'calc_2Dchi2' is vectorized; a new function
+                   'calc_2Dchi2_src' gives the contribution of every
+                   source and the mask of non-positive-definite
+                   covariance matrices
+18 Oct 2026, Niu : the sources with non-positive-definite covariance
+                   matrices are excluded from the chi-square of
+                   function 'calc_2Dchi2' and its number of degrees of
+                   freedom
 
 """
 
 import numpy as np
-from functools import reduce
 
-__all__ = ["calc_wrms", "calc_chi2", "calc_2Dchi2"]
+__all__ = ["calc_wrms", "calc_chi2", "calc_2Dchi2_src", "calc_2Dchi2"]
 
 
 # -----------------------------  FUNCTIONS -----------------------------
@@ -98,9 +105,13 @@ def calc_chi2(x, err, reduced=False, deg=0):
         return chi2
 
 
-def calc_2Dchi2(x, errx, y, erry, covxy, reduced=False):
-    '''Calculate the 2-Dimension (reduced) Chi-square.
+def calc_2Dchi2_src(x, errx, y, erry, covxy):
+    '''Calculate the 2-Dimension Chi-square of every source.
 
+    The quadratic form of the inverse of the 2x2 covariance matrix
+        | errx^2   covxy  |
+        | covxy   erry^2  |
+    is computed in the closed form for all sources at once.
 
     Parameters
     ----------
@@ -108,38 +119,89 @@ def calc_2Dchi2(x, errx, y, erry, covxy, reduced=False):
         residuals of x
     errx : array, float
         formal errors of x
+    y : array, float
+        residuals of y
+    erry : array, float
+        formal errors of y
+    covxy : array, float
+        summation of covariance between x and y, could be None
+
+    Returns
+    ----------
+    Qxy : array, float
+        chi-square of every source
+    npd : array, boolean
+        True for the sources whose covariance matrix is not
+        positive-definite
+    '''
+
+    varx, vary = errx**2, erry**2
+
+    if covxy is None:
+        covxy = np.zeros_like(x)
+
+    det = varx * vary - covxy**2
+    npd = (varx <= 0) | (det <= 0)
+
+    with np.errstate(divide="ignore", invalid="ignore"):
+        Qxy = (vary * x**2 - 2 * covxy * x * y + varx * y**2) / det
+
+    return Qxy, npd
+
+
+def calc_2Dchi2(x, errx, y, erry, covxy, reduced=False, full=False):
+    '''Calculate the 2-Dimension (reduced) Chi-square.
+
+
+    Parameters
+    ----------
     x : array, float
         residuals of x
     errx : array, float
         formal errors of x
+    y : array, float
+        residuals of y
+    erry : array, float
+        formal errors of y
     covxy : array, float
         summation of covariance between x and y
     reduced : boolean
         True for calculating the reduced chi-square
+    full : boolean
+        True to also return the results of function 'calc_2Dchi2_src'
 
     Returns
     ----------
     (reduced) chi-square
+        sum over the sources with positive-definite covariance matrices
+        only, NaN if there is none
+    Qxy : array, float
+        chi-square of every source, only if full is True
+    npd : array, boolean
+        mask of non-positive-definite covariance matrices, only if full
+        is True
     '''
 
-    Qxy = np.zeros_like(x)
+    Qxy, npd = calc_2Dchi2_src(x, errx, y, erry, covxy)
 
-    for i, (xi, errxi, yi, erryi, covxyi
-            ) in enumerate(zip(x, errx, y, erry, covxy)):
+    if npd.any():
+        print("# WARNING: covariance matrices of %d sources are not "
+              "positive-definite, which are excluded!" %
+              np.count_nonzero(npd))
 
-        wgt = np.linalg.inv(np.array([[errxi**2, covxyi],
-                                      [covxyi, erryi**2]]))
+    # Only the sources with positive-definite covariance matrices
+    num = np.count_nonzero(~npd)
 
-        Xmat = np.array([xi, yi])
-
-        Qxy[i] = reduce(np.dot, (Xmat, wgt, Xmat))
-
-        if Qxy[i] < 0:
-            print(Qxy[i])
+    if num == 0:
+        chi2 = np.nan
+    elif reduced:
+        chi2 = np.sum(Qxy[~npd]) / (num - 2)
+    else:
+        chi2 = np.sum(Qxy[~npd])
 
-    if reduced:
-        return np.sum(Qxy) / (x.size - 2)
+    if full:
+        return chi2, Qxy, npd
     else:
-        return np.sum(Qxy)
+        return chi2
 
 # --------------------------------- END --------------------------------